@@ -0,0 +1,6 @@
+"""
+Benchmarks of pygrl, run from the root of the repository, e.g.
+
+python -m benchmarks.bench_limiter --output before.json
+python -m benchmarks.compare before.json after.json
+"""
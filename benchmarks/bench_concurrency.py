@@ -0,0 +1,245 @@
+"""
+Throughput, wait time and event-loop stalls of the rate limiters under concurrency.
+
+python -m benchmarks.bench_concurrency --modes async,threads,processes --tasks 1,100,10000 --workers 1,16,64 \
+    --storages basic,sqlite3,shm --skews 0,1.1 --output results.json
+
+- async: `--tasks` coroutines share one `GeneralRateLimiter_with_Lock`, each awaits `asyncio.sleep(0)` between
+  checks as a handler awaiting I/O would. A heartbeat task measures how late the event loop wakes it up (stall).
+- threads: `--workers` threads, one `GeneralRateLimiter` each, over the same storage.
+- processes: `--workers` processes, one `GeneralRateLimiter` each, over a storage shared between processes.
+
+The total number of checks is the same whatever the concurrency, `--requests` split over the tasks or workers.
+`wait` is the time of a check spent outside the storage: waiting for the limiter's lock, the event loop or the GIL.
+`admitted` above `expected_admitted` means the storage lost updates under concurrency.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from pygrl import GeneralRateLimiter, GeneralRateLimiter_with_Lock, Storage, StorageWrapper
+from .common import (
+    SHARED_STORAGES, make_storage, release_storage, key_names, key_sequence, percentile,
+    write_results, print_table, parse_list
+)
+
+MODES = ("async", "threads", "processes")
+TIME_WINDOW = 3600
+
+
+class TimedStorage(StorageWrapper):
+    """
+    Forwards every call to `storage`, recording the duration of the last `check_and_increment`.
+    """
+
+    def __init__(self, storage: Storage):
+        super().__init__(storage)
+        self.last_ns = 0
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        start = time.perf_counter_ns()
+        item = super().check_and_increment(key, current_time, time_window, amount, limit)
+        self.last_ns = time.perf_counter_ns() - start
+        return item
+
+
+def _check_all(limiter: GeneralRateLimiter, timed: TimedStorage, keys: list) -> tuple[list, list, int]:
+    latencies, waits, admitted = [], [], 0
+    clock = time.perf_counter_ns
+    for key in keys:
+        start = clock()
+        allowed = limiter.check_limit(key)
+        latency = clock() - start
+        latencies.append(latency)
+        waits.append(latency - timed.last_ns)
+        admitted += allowed
+    return latencies, waits, admitted
+
+
+async def _run_async(storage: Storage, sequences: list, max_requests: int, stall_interval: float) -> dict:
+    timed = TimedStorage(storage)
+    limiter = GeneralRateLimiter_with_Lock(timed, max_requests, TIME_WINDOW, clock=time.time)
+    latencies, waits, lateness = [], [], []
+    admitted = 0
+    clock = time.perf_counter_ns
+
+    async def task(keys: list):
+        nonlocal admitted
+        for key in keys:
+            start = clock()
+            allowed = await limiter.check_limit(key)
+            latency = clock() - start
+            # Nothing else ran since the storage call, `check_limit` does not await after it
+            latencies.append(latency)
+            waits.append(latency - timed.last_ns)
+            admitted += allowed
+            await asyncio.sleep(0)
+
+    done = asyncio.Event()
+
+    async def heartbeat():
+        interval_ns = int(stall_interval * 1e9)
+        while not done.is_set():
+            start = clock()
+            await asyncio.sleep(stall_interval)
+            lateness.append(max(0, clock() - start - interval_ns))
+
+    monitor = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    begin = clock()
+    await asyncio.gather(*(task(keys) for keys in sequences))
+    elapsed = clock() - begin
+    done.set()
+    await monitor
+    return {"latencies": latencies, "waits": waits, "admitted": admitted, "elapsed": elapsed, "lateness": lateness}
+
+
+def _run_threads(storage: Storage, sequences: list, max_requests: int) -> dict:
+    barrier = threading.Barrier(len(sequences) + 1)
+    outcomes = [None] * len(sequences)
+
+    def worker(index: int, keys: list):
+        timed = TimedStorage(storage)
+        limiter = GeneralRateLimiter(timed, max_requests, TIME_WINDOW, clock=time.time)
+        barrier.wait()
+        outcomes[index] = _check_all(limiter, timed, keys)
+
+    threads = [threading.Thread(target=worker, args=(index, keys)) for index, keys in enumerate(sequences)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    begin = time.perf_counter_ns()
+    for thread in threads:
+        thread.join()
+    return _merge(outcomes, time.perf_counter_ns() - begin)
+
+
+def _process_worker(storage_name: str, directory: str, num_keys: int, keys: list, max_requests: int,
+                    barrier, queue):
+    storage = make_storage(storage_name, directory, num_keys, create=False)
+    timed = TimedStorage(storage)
+    limiter = GeneralRateLimiter(timed, max_requests, TIME_WINDOW, clock=time.time)
+    barrier.wait()
+    queue.put(_check_all(limiter, timed, keys))
+    release_storage(storage, unlink=False)
+
+
+def _run_processes(storage_name: str, directory: str, num_keys: int, sequences: list, max_requests: int) -> dict:
+    context = multiprocessing.get_context()
+    barrier = context.Barrier(len(sequences) + 1)
+    queue = context.Queue()
+    processes = [
+        context.Process(
+            target=_process_worker, args=(storage_name, directory, num_keys, keys, max_requests, barrier, queue)
+        )
+        for keys in sequences
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    begin = time.perf_counter_ns()
+    # Drain the queue before joining, a process does not exit until its result is consumed
+    outcomes = [queue.get() for _ in processes]
+    elapsed = time.perf_counter_ns() - begin
+    for process in processes:
+        process.join()
+    return _merge(outcomes, elapsed)
+
+
+def _merge(outcomes: list, elapsed: int) -> dict:
+    merged = {"latencies": [], "waits": [], "admitted": 0, "elapsed": elapsed, "lateness": None}
+    for latencies, waits, admitted in outcomes:
+        merged["latencies"].extend(latencies)
+        merged["waits"].extend(waits)
+        merged["admitted"] += admitted
+    return merged
+
+
+def run_case(mode: str, storage_name: str, concurrency: int, skew: float, num_keys: int, requests: int,
+             max_requests: int, stall_interval: float, directory: str) -> dict:
+    keys = key_names(num_keys)
+    per_worker = max(1, requests // concurrency)
+    sequences = [key_sequence(keys, per_worker, seed=index, skew=skew) for index in range(concurrency)]
+    counts = Counter(key for sequence in sequences for key in sequence)
+    expected_admitted = sum(min(count, max_requests) for count in counts.values())
+
+    storage = make_storage(storage_name, directory, num_keys)
+    try:
+        if mode == "async":
+            outcome = asyncio.run(_run_async(storage, sequences, max_requests, stall_interval))
+        elif mode == "threads":
+            outcome = _run_threads(storage, sequences, max_requests)
+        else:
+            outcome = _run_processes(storage_name, directory, num_keys, sequences, max_requests)
+    finally:
+        release_storage(storage)
+
+    latencies, waits, lateness = sorted(outcome["latencies"]), sorted(outcome["waits"]), outcome["lateness"]
+    if lateness is not None:
+        lateness.sort()
+    return {
+        "name": f"{mode}/{storage_name}/concurrency={concurrency}/skew={skew:g}",
+        "mode": mode,
+        "storage": storage_name,
+        "concurrency": concurrency,
+        "skew": skew,
+        "requests": len(latencies),
+        "ops_per_sec": len(latencies) / (outcome["elapsed"] / 1e9),
+        "p50_us": percentile(latencies, 0.50) / 1e3,
+        "p99_us": percentile(latencies, 0.99) / 1e3,
+        "wait_p50_us": percentile(waits, 0.50) / 1e3,
+        "wait_p99_us": percentile(waits, 0.99) / 1e3,
+        "stall_p99_ms": percentile(lateness, 0.99) / 1e6 if lateness else None,
+        "stall_max_ms": lateness[-1] / 1e6 if lateness else None,
+        "admitted": outcome["admitted"],
+        "expected_admitted": expected_admitted,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated modes.")
+    parser.add_argument("--storages", default="basic,sqlite3,shm",
+                        help=f"Comma-separated storages, processes only use {', '.join(SHARED_STORAGES)}.")
+    parser.add_argument("--tasks", default="1,100,10000", help="Comma-separated numbers of coroutines (async).")
+    parser.add_argument("--workers", default="1,16,64",
+                        help="Comma-separated numbers of threads or processes.")
+    parser.add_argument("--skews", default="0,1.1", help="Comma-separated Zipf exponents of the keys, 0 is uniform.")
+    parser.add_argument("--keys", type=int, default=1000, help="The number of distinct keys.")
+    parser.add_argument("--requests", type=int, default=100_000, help="The total number of checks per case.")
+    parser.add_argument("--max-requests", type=int, default=100, help="The limit of every key.")
+    parser.add_argument("--stall-interval", type=float, default=0.001,
+                        help="The period of the event-loop heartbeat in seconds.")
+    parser.add_argument("--output", default=None, help="Path to the JSON results, stdout by default.")
+    args = parser.parse_args(argv)
+
+    modes = parse_list(args.modes)
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"Unknown modes: {sorted(unknown)}")
+    results = []
+    for mode in modes:
+        concurrencies = parse_list(args.tasks if mode == "async" else args.workers, int)
+        for storage_name in parse_list(args.storages):
+            if mode == "processes" and storage_name not in SHARED_STORAGES:
+                continue
+            for concurrency in concurrencies:
+                for skew in parse_list(args.skews, float):
+                    with tempfile.TemporaryDirectory() as directory:
+                        results.append(run_case(
+                            mode, storage_name, concurrency, skew, args.keys, args.requests,
+                            args.max_requests, args.stall_interval, directory
+                        ))
+    print_table(results, ["mode", "storage", "concurrency", "skew", "ops_per_sec", "p99_us", "wait_p99_us",
+                          "stall_max_ms", "admitted", "expected_admitted"])
+    write_results(args.output, "bench_concurrency", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Throughput and latency of `GeneralRateLimiter` per operation, storage, key cardinality and deny ratio.
+
+python -m benchmarks.bench_limiter --storages basic,sqlite3 --keys 1,1000,100000 --deny-ratios 0,0.5 \
+    --output results.json
+
+Before every case the storage is loaded with `keys` keys, a `deny_ratio` fraction of them already at the limit,
+then the operation is called on keys drawn uniformly, so about `deny_ratio` of the checks are denied.
+The windows never pass during a run, the rate limiter does not reset or clean up any key.
+"""
+import argparse
+import tempfile
+import time
+from pygrl import GeneralRateLimiter, ExceededRateLimitError
+from .common import (
+    STORAGES, make_storage, key_names, key_sequence, populate, measure, write_results, print_table, parse_list
+)
+
+OPERATIONS = ("check_limit", "call", "decorator", "on_limited", "info")
+MAX_REQUESTS = 10 ** 12
+TIME_WINDOW = 3600
+
+
+def run_case(storage_name: str, num_keys: int, deny_ratio: float, operations: list,
+             iterations: int, duration: float, directory: str) -> list:
+    storage = make_storage(storage_name, directory)
+    keys = key_names(num_keys)
+    denied = int(round(num_keys * deny_ratio))
+    now = time.time()
+    populate(storage, {
+        key: {"start_time": now, "num_requests": MAX_REQUESTS if index < denied else 0}
+        for index, key in enumerate(keys)
+    })
+    # Above the number of keys, `__call__` lists the keys but never drops any
+    capacity = num_keys + 1
+    limiter = GeneralRateLimiter(storage, MAX_REQUESTS, TIME_WINDOW, capacity, TIME_WINDOW, clock=time.time)
+
+    @GeneralRateLimiter.general_rate_limiter(storage, MAX_REQUESTS, TIME_WINDOW, capacity, TIME_WINDOW,
+                                             clock=time.time)
+    def endpoint(key=None):
+        return None
+
+    def decorated(key):
+        try:
+            endpoint(key=key)
+        except ExceededRateLimitError:
+            pass
+
+    # The same decorator returning a fallback instead of raising
+    @GeneralRateLimiter.general_rate_limiter(storage, MAX_REQUESTS, TIME_WINDOW, capacity, TIME_WINDOW,
+                                             clock=time.time, on_limited=lambda key, args, kwargs: None)
+    def not_raising(key=None):
+        return None
+
+    targets = {
+        "check_limit": (limiter.check_limit, key_sequence(keys, iterations)),
+        "call": (limiter, key_sequence(keys, iterations, seed=1)),
+        "decorator": (decorated, key_sequence(keys, iterations, seed=2)),
+        "on_limited": (lambda key: not_raising(key=key), key_sequence(keys, iterations, seed=3)),
+        # O(number of keys) per call, a handful of calls is enough
+        "info": (lambda _: limiter.info(), [None] * min(iterations, 1000)),
+    }
+    results = []
+    for operation in operations:
+        function, arguments = targets[operation]
+        summary = measure(function, arguments, duration, warmup=0 if operation == "info" else 100)
+        results.append({
+            "name": f"{operation}/{storage_name}/keys={num_keys}/deny={deny_ratio:g}",
+            "operation": operation,
+            "storage": storage_name,
+            "keys": num_keys,
+            "deny_ratio": deny_ratio,
+            **summary,
+        })
+    storage.clear()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storages", default=",".join(STORAGES), help="Comma-separated storages.")
+    parser.add_argument("--keys", default="1,1000,100000",
+                        help="Comma-separated key cardinalities, up to 10_000_000 (memory permitting).")
+    parser.add_argument("--deny-ratios", default="0,0.5", help="Comma-separated fractions of denied keys.")
+    parser.add_argument("--operations", default=",".join(OPERATIONS), help="Comma-separated operations.")
+    parser.add_argument("--iterations", type=int, default=100_000, help="Maximum calls per case.")
+    parser.add_argument("--duration", type=float, default=2.0, help="Maximum seconds per case.")
+    parser.add_argument("--output", default=None, help="Path to the JSON results, stdout by default.")
+    args = parser.parse_args(argv)
+
+    operations = parse_list(args.operations)
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"Unknown operations: {sorted(unknown)}")
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for storage_name in parse_list(args.storages):
+            for num_keys in parse_list(args.keys, int):
+                for deny_ratio in parse_list(args.deny_ratios, float):
+                    results.extend(run_case(
+                        storage_name, num_keys, deny_ratio, operations, args.iterations, args.duration, directory
+                    ))
+    print_table(results, ["operation", "storage", "keys", "deny_ratio", "iterations", "ops_per_sec",
+                          "p50_us", "p99_us"])
+    write_results(args.output, "bench_limiter", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Memory footprint per tracked key, measured with tracemalloc, checked against a budget.
+
+python -m benchmarks.bench_memory --storages basic,sqlite3 --keys 10000,100000 --budget benchmarks/memory_budget.json
+
+For every case `keys` distinct keys are checked once through `check_limit`, then the clock moves past
+`cleanup_threshold` and `cleanup` drops every key:
+- bytes_per_key: the Python heap held by the storage per key once loaded.
+- peak_bytes_per_key: the highest Python heap per key during the load and the cleanup.
+- retained_bytes_per_key: the Python heap still held per key after the cleanup.
+- disk_bytes_per_key: the size of the files per key once loaded, for the storages writing to disk.
+
+tracemalloc only sees the Python heap: the pages of SQLite, shared memory or a memory map are not included.
+With `--budget`, the exit status is 1 if a metric of a storage exceeds its budget.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from pygrl import GeneralRateLimiter, ManualClock
+from .common import STORAGES, make_storage, release_storage, write_results, print_table, parse_list
+
+TIME_WINDOW = 1
+CLEANUP_THRESHOLD = 10
+
+
+def _heap() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _disk(directory: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+def run_case(storage_name: str, num_keys: int, directory: str) -> dict:
+    storage = make_storage(storage_name, directory, num_keys)
+    clock = ManualClock()
+    # A capacity of 0 lets `cleanup` scan the keys whenever there is any
+    limiter = GeneralRateLimiter(storage, 10, TIME_WINDOW, 0, CLEANUP_THRESHOLD, clock=clock)
+    tracemalloc.start()
+    try:
+        baseline = _heap()
+        tracemalloc.reset_peak()
+        for index in range(num_keys):
+            limiter.check_limit(f"key-{index}")
+        loaded = _heap() - baseline
+        disk = _disk(directory)
+        clock.advance(CLEANUP_THRESHOLD + TIME_WINDOW)
+        limiter.cleanup()
+        retained = _heap() - baseline
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+        release_storage(storage)
+    return {
+        "name": f"memory/{storage_name}/keys={num_keys}",
+        "storage": storage_name,
+        "keys": num_keys,
+        "bytes_per_key": loaded / num_keys,
+        "peak_bytes_per_key": peak / num_keys,
+        "retained_bytes_per_key": retained / num_keys,
+        "disk_bytes_per_key": disk / num_keys if disk else None,
+    }
+
+
+def check_budget(results: list, budget: dict) -> list:
+    """
+    Returns the descriptions of the metrics exceeding the budget, {storage: {metric: limit}}.
+    """
+    violations = []
+    for result in results:
+        for metric, limit in budget.get(result["storage"], {}).items():
+            value = result.get(metric)
+            if value is not None and value > limit:
+                violations.append(f"{result['name']} {metric}: {value:,.1f} > {limit:,}")
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storages", default=",".join(STORAGES), help="Comma-separated storages.")
+    parser.add_argument("--keys", default="10000,100000", help="Comma-separated numbers of keys.")
+    parser.add_argument("--budget", default=None,
+                        help="Path to a JSON budget, {storage: {metric: limit}}, e.g. benchmarks/memory_budget.json.")
+    parser.add_argument("--output", default=None, help="Path to the JSON results, stdout by default.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for storage_name in parse_list(args.storages):
+        for num_keys in parse_list(args.keys, int):
+            with tempfile.TemporaryDirectory() as directory:
+                results.append(run_case(storage_name, num_keys, directory))
+    print_table(results, ["storage", "keys", "bytes_per_key", "peak_bytes_per_key", "retained_bytes_per_key",
+                          "disk_bytes_per_key"])
+    write_results(args.output, "bench_memory", results)
+    if args.budget is None:
+        return 0
+    with open(args.budget) as file:
+        violations = check_budget(results, json.load(file))
+    for violation in violations:
+        print(f"Over budget: {violation}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Per-request overhead of the rate limiting middleware against the bare application.
+
+python -m benchmarks.bench_middleware --servers asgi,wsgi --storages basic,sqlite3 --clients 1,1000 --threads 1,8 \
+    --output results.json
+
+The requests are driven in process, without a server or sockets, so the timings are the middleware's own.
+- asgi: `ASGIMiddleware`, one coroutine after another in one event loop.
+- wsgi: `WSGIMiddleware` under `--threads` threads sending requests at once, as in a threaded server.
+Cases:
+- bare: the application alone.
+- unmatched: through the middleware, no rule applies to the path.
+- allowed: a rule applies, the request is allowed and gets the X-RateLimit-* headers.
+- denied: a rule applies, the request gets a 429 without reaching the application.
+Every case reports the p50 overhead over the bare application, `overhead_us`.
+"""
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from pygrl.middleware import ASGIMiddleware, WSGIMiddleware, Rule
+from .common import STORAGES, make_storage, release_storage, key_sequence, summarize, write_results, print_table, \
+    parse_list
+
+SERVERS = ("asgi", "wsgi")
+CASES = ("bare", "unmatched", "allowed", "denied")
+TIME_WINDOW = 3600
+BODY = b"ok"
+
+
+async def asgi_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def wsgi_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [BODY]
+
+
+def asgi_scopes(clients: list, path: str) -> list:
+    return [
+        {"type": "http", "method": "GET", "path": path, "headers": [(b"host", b"localhost")], "client": (client, 1)}
+        for client in clients
+    ]
+
+
+async def _drive_asgi(app, scopes: list, duration: float, warmup: int = 100) -> dict:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        return None
+
+    for scope in scopes[:warmup]:
+        await app(scope, receive, send)
+    durations = []
+    append = durations.append
+    clock = time.perf_counter_ns
+    deadline = clock() + int(duration * 1e9)
+    begin = clock()
+    for scope in scopes:
+        start = clock()
+        await app(scope, receive, send)
+        end = clock()
+        append(end - start)
+        if end > deadline:
+            break
+    return summarize(durations, clock() - begin)
+
+
+def wsgi_environs(clients: list, path: str) -> list:
+    return [
+        {"REQUEST_METHOD": "GET", "PATH_INFO": path, "HTTP_HOST": "localhost", "REMOTE_ADDR": client}
+        for client in clients
+    ]
+
+
+def _drive_wsgi(app, environs: list, num_threads: int, duration: float, warmup: int = 100) -> dict:
+    def start_response(status, headers, exc_info=None):
+        return None
+
+    for environ in environs[:warmup]:
+        b"".join(app(environ, start_response))
+    barrier = threading.Barrier(num_threads + 1)
+    outcomes = [None] * num_threads
+    clock = time.perf_counter_ns
+    deadline = []
+
+    def worker(index: int):
+        durations = []
+        append = durations.append
+        barrier.wait()
+        end_by = deadline[0]
+        for environ in environs[index::num_threads]:
+            start = clock()
+            b"".join(app(environ, start_response))
+            end = clock()
+            append(end - start)
+            if end > end_by:
+                break
+        outcomes[index] = durations
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    deadline.append(clock() + int(duration * 1e9))
+    begin = clock()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    return summarize([duration for durations in outcomes for duration in durations], clock() - begin)
+
+
+def _add_overhead(results: list, cases: list) -> list:
+    bare = results[0]["p50_us"]
+    for result in results:
+        result["overhead_us"] = result["p50_us"] - bare
+    return [result for result in results if result["case"] in cases]
+
+
+def _rules() -> list:
+    return [Rule("/allowed", 10 ** 12, TIME_WINDOW), Rule("/denied", 0, TIME_WINDOW)]
+
+
+def _clients(num_clients: int) -> list:
+    return [f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}" for index in range(num_clients)]
+
+
+def run_wsgi(storage_name: str, num_clients: int, num_threads: int, cases: list, iterations: int, duration: float,
+             directory: str) -> list:
+    storage = make_storage(storage_name, directory)
+    middleware = WSGIMiddleware(wsgi_app, storage, _rules(), max_capacity=10 ** 9, clock=time.time)
+    apps = {"bare": wsgi_app, "unmatched": middleware, "allowed": middleware, "denied": middleware}
+    clients = _clients(num_clients)
+    results = []
+    for index, case in enumerate(["bare"] + [case for case in cases if case != "bare"]):
+        environs = wsgi_environs(key_sequence(clients, iterations, seed=index), f"/{case}")
+        summary = _drive_wsgi(apps[case], environs, num_threads, duration)
+        results.append({
+            "name": f"wsgi/{case}/{storage_name}/clients={num_clients}/threads={num_threads}",
+            "server": "wsgi",
+            "case": case,
+            "storage": storage_name,
+            "clients": num_clients,
+            "threads": num_threads,
+            **summary,
+        })
+    storage.clear()
+    release_storage(storage)
+    return _add_overhead(results, cases)
+
+
+def run_asgi(storage_name: str, num_clients: int, cases: list, iterations: int, duration: float,
+             directory: str) -> list:
+    storage = make_storage(storage_name, directory)
+    middleware = ASGIMiddleware(asgi_app, storage, _rules(), max_capacity=10 ** 9, clock=time.time)
+    apps = {"bare": asgi_app, "unmatched": middleware, "allowed": middleware, "denied": middleware}
+    clients = _clients(num_clients)
+    results = []
+    for index, case in enumerate(["bare"] + [case for case in cases if case != "bare"]):
+        scopes = asgi_scopes(key_sequence(clients, iterations, seed=index), f"/{case}")
+        summary = asyncio.run(_drive_asgi(apps[case], scopes, duration))
+        results.append({
+            "name": f"asgi/{case}/{storage_name}/clients={num_clients}",
+            "server": "asgi",
+            "case": case,
+            "storage": storage_name,
+            "clients": num_clients,
+            **summary,
+        })
+    storage.clear()
+    release_storage(storage)
+    return _add_overhead(results, cases)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", default=",".join(SERVERS), help="Comma-separated middlewares.")
+    parser.add_argument("--storages", default=",".join(STORAGES), help="Comma-separated storages.")
+    parser.add_argument("--clients", default="1,1000", help="Comma-separated numbers of distinct client addresses.")
+    parser.add_argument("--threads", default="1,8", help="Comma-separated numbers of threads, for wsgi.")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated cases.")
+    parser.add_argument("--iterations", type=int, default=100_000, help="Maximum requests per case.")
+    parser.add_argument("--duration", type=float, default=2.0, help="Maximum seconds per case.")
+    parser.add_argument("--output", default=None, help="Path to the JSON results, stdout by default.")
+    args = parser.parse_args(argv)
+
+    servers = parse_list(args.servers)
+    cases = parse_list(args.cases)
+    unknown = (set(servers) - set(SERVERS)) | (set(cases) - set(CASES))
+    if unknown:
+        parser.error(f"Unknown servers or cases: {sorted(unknown)}")
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for storage_name in parse_list(args.storages):
+            for num_clients in parse_list(args.clients, int):
+                if "asgi" in servers:
+                    results.extend(
+                        run_asgi(storage_name, num_clients, cases, args.iterations, args.duration, directory)
+                    )
+                if "wsgi" not in servers:
+                    continue
+                for num_threads in parse_list(args.threads, int):
+                    results.extend(run_wsgi(
+                        storage_name, num_clients, num_threads, cases, args.iterations, args.duration, directory
+                    ))
+    print_table(results, ["server", "case", "storage", "clients", "threads", "iterations", "ops_per_sec", "p50_us", "p99_us",
+                          "overhead_us"])
+    write_results(args.output, "bench_middleware", results)
+
+
+if __name__ == "__main__":
+    main()
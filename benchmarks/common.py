@@ -0,0 +1,186 @@
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import time
+from bisect import bisect
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Callable, Optional
+from pygrl import BasicStorage, SQLite3_Storage, SharedMemoryStorage, MmapStorage, Storage
+
+# Metrics compared by `benchmarks.compare`, with the direction of an improvement
+HIGHER_IS_BETTER = {"ops_per_sec"}
+LOWER_IS_BETTER = {
+    "p50_us", "p99_us", "wait_p99_us", "stall_max_ms", "overhead_us",
+    "bytes_per_key", "peak_bytes_per_key", "retained_bytes_per_key", "disk_bytes_per_key",
+}
+
+STORAGES = ("basic", "sqlite3")
+# Storages shared by every process opening them with the same `directory`
+SHARED_STORAGES = ("sqlite3", "shm", "mmap")
+
+
+def make_storage(name: str, directory: str = ".", num_keys: int = 0, create: bool = True) -> Storage:
+    """
+    Returns a storage by name, see `STORAGES` and `SHARED_STORAGES`.
+
+    With `create`, the storage is emptied, otherwise an existing shared storage is attached as it is.
+    The fixed-size storages get room for twice `num_keys`.
+    """
+    capacity = max(65536, 2 * num_keys)
+    if name == "basic":
+        return BasicStorage()
+    if name == "sqlite3":
+        return SQLite3_Storage(os.path.join(directory, "bench.db"), overwrite=create)
+    if name == "shm":
+        return SharedMemoryStorage(f"pygrl-bench-{os.path.basename(directory)}", capacity, overwrite=create)
+    if name == "mmap":
+        return MmapStorage(os.path.join(directory, "bench.mmap"), capacity, overwrite=create)
+    raise ValueError(f"Unknown storage: {name}")
+
+
+def release_storage(storage: Storage, unlink: bool = True):
+    """
+    Closes the storages holding OS resources, and removes the shared memory block if `unlink`.
+    """
+    if isinstance(storage, SharedMemoryStorage):
+        storage.close()
+        if unlink:
+            storage.unlink()
+    elif isinstance(storage, (MmapStorage, SQLite3_Storage)):
+        storage.close()
+
+
+def key_names(num_keys: int) -> list[str]:
+    return [f"key-{index}" for index in range(num_keys)]
+
+
+def key_sequence(keys: list, length: int, seed: int = 0, skew: float = 0.0) -> list:
+    """
+    Returns `length` keys drawn from `keys`, generated before timing anything.
+
+    The keys are drawn uniformly, or following a Zipf distribution of exponent `skew` if not 0,
+    the first keys being the most frequent.
+    """
+    rng = random.Random(seed)
+    if not skew:
+        return [keys[rng.randrange(len(keys))] for _ in range(length)]
+    weights = list(accumulate(1 / rank ** skew for rank in range(1, len(keys) + 1)))
+    total = weights[-1]
+    last = len(keys) - 1
+    return [keys[min(bisect(weights, rng.random() * total), last)] for _ in range(length)]
+
+
+def populate(storage: Storage, items: dict, batch: int = 100_000):
+    """
+    Loads the key-value pairs into the storage.
+
+    A single-file `SQLite3_Storage` is loaded in one transaction, `set` would commit on every key.
+    """
+    if isinstance(storage, SQLite3_Storage) and len(storage.db_paths) == 1:
+        conn = sqlite3.connect(storage.db_path)
+        rows = ((key, json.dumps(value)) for key, value in items.items())
+        conn.executemany(f"INSERT OR REPLACE INTO {storage.table_name} (key, value) VALUES (?, ?)", rows)
+        conn.commit()
+        conn.close()
+        return None
+    keys = list(items)
+    for begin in range(0, len(keys), batch):
+        storage.set_many({key: items[key] for key in keys[begin:begin + batch]})
+
+
+def percentile(ordered: list, fraction: float):
+    """
+    Nearest-rank percentile of an ordered list.
+    """
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def summarize(durations_ns: list, elapsed_ns: int) -> dict:
+    """
+    Returns the throughput and latency percentiles of a run, latencies in microseconds.
+    """
+    ordered = sorted(durations_ns)
+    return {
+        "iterations": len(ordered),
+        "ops_per_sec": len(ordered) / (elapsed_ns / 1e9) if elapsed_ns else None,
+        "mean_us": sum(ordered) / len(ordered) / 1e3,
+        "p50_us": percentile(ordered, 0.50) / 1e3,
+        "p99_us": percentile(ordered, 0.99) / 1e3,
+    }
+
+
+def measure(operation: Callable, arguments: list, duration: float, warmup: int = 100) -> dict:
+    """
+    Calls `operation` on the arguments in turn, timing every call,
+    until every argument was used or `duration` seconds have passed (at least one call).
+
+    Returns the summary of `summarize`, the throughput includes the overhead of the timer.
+    """
+    for argument in arguments[:warmup]:
+        operation(argument)
+    durations = []
+    append = durations.append
+    clock = time.perf_counter_ns
+    deadline = clock() + int(duration * 1e9)
+    begin = clock()
+    for argument in arguments:
+        start = clock()
+        operation(argument)
+        end = clock()
+        append(end - start)
+        if end > deadline:
+            break
+    return summarize(durations, clock() - begin)
+
+
+def metadata() -> dict:
+    return {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "argv": sys.argv[1:],
+    }
+
+
+def write_results(path: Optional[str], benchmark: str, results: list):
+    """
+    Writes the results in the JSON format read by `benchmarks.compare`, to stdout if `path` is None.
+    """
+    document = {"benchmark": benchmark, "metadata": metadata(), "results": results}
+    if path is None:
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return None
+    with open(path, "w") as file:
+        json.dump(document, file, indent=2)
+
+
+def print_table(results: list, columns: list):
+    """
+    Prints the results as a table to stderr, stdout is left for the JSON output.
+    """
+    rows = [[_format(result.get(column)) for column in columns] for result in results]
+    widths = [max([len(column)] + [len(row[index]) for row in rows]) for index, column in enumerate(columns)]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)), file=sys.stderr)
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)), file=sys.stderr)
+
+
+def parse_list(text: str, kind: type = str) -> list:
+    return [kind(item.replace("_", "")) if kind is not str else item for item in text.split(",") if item]
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}" if value < 1e4 else f"{value:,.0f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return "-" if value is None else str(value)
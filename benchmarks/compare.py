@@ -0,0 +1,58 @@
+"""
+Compares two result files of the same benchmark, exits with status 1 if a metric regressed beyond the threshold.
+
+python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from .common import HIGHER_IS_BETTER, LOWER_IS_BETTER, print_table
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> tuple[list, list]:
+    """
+    Returns the rows of the comparison and the names of the regressed metrics.
+
+    The change is relative, positive when the candidate is better, whatever the direction of the metric.
+    """
+    before = {result["name"]: result for result in baseline["results"]}
+    rows, regressions = [], []
+    for result in candidate["results"]:
+        previous = before.get(result["name"])
+        if previous is None:
+            continue
+        for metric in sorted((HIGHER_IS_BETTER | LOWER_IS_BETTER) & result.keys() & previous.keys()):
+            old, new = previous[metric], result[metric]
+            if not old or new is None:
+                continue
+            change = (new - old) / old if metric in HIGHER_IS_BETTER else (old - new) / old
+            rows.append({"name": result["name"], "metric": metric, "baseline": old, "candidate": new,
+                         "change": f"{change:+.1%}"})
+            if change < -threshold:
+                regressions.append(f"{result['name']} {metric}")
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="Path to the results before the change.")
+    parser.add_argument("candidate", help="Path to the results after the change.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Tolerated relative regression of a metric. Defaults to 0.10.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.candidate) as file:
+        candidate = json.load(file)
+    if baseline.get("benchmark") != candidate.get("benchmark"):
+        parser.error(f"Different benchmarks: {baseline.get('benchmark')} and {candidate.get('benchmark')}")
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    print_table(rows, ["name", "metric", "baseline", "candidate", "change"])
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
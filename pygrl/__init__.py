@@ -27,13 +27,18 @@ __author__ = "Jonah Whaler"
 __license__ = "MIT"
 __copyright__ = "Copyright (c) 2024 Jonah Whaler"
 
-from .main import GeneralRateLimiter, GeneralRateLimiter_with_Lock
-from .storage import BasicStorage, Storage, SQLite3_Storage
-from .custom_exception import ExceededRateLimitError
+from .main import GeneralRateLimiter, GeneralRateLimiter_with_Lock, rate_limit
+from .clock import ManualClock
+from .simulation import Simulation
+from .storage import BasicStorage, Storage, SQLite3_Storage, SharedMemoryStorage, MmapStorage, RemoteStorage, RedisStorage, LeasedStorage, ShardedStorage, StorageWrapper
+from .custom_exception import ExceededRateLimitError, StorageFullError, RemoteStorageError
 
 __all__ = [
     "GeneralRateLimiter",
     "GeneralRateLimiter_with_Lock",
-    "BasicStorage", "Storage", "SQLite3_Storage",
-    "ExceededRateLimitError"
+    "rate_limit",
+    "ManualClock",
+    "Simulation",
+    "BasicStorage", "Storage", "SQLite3_Storage", "SharedMemoryStorage", "MmapStorage", "RemoteStorage", "RedisStorage", "LeasedStorage", "ShardedStorage", "StorageWrapper",
+    "ExceededRateLimitError", "StorageFullError", "RemoteStorageError"
 ]
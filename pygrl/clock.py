@@ -0,0 +1,49 @@
+from time import monotonic, time
+from typing import Callable
+from .storage import Storage
+
+
+def default_clock(storage: Storage) -> Callable[[], float]:
+    """
+    Returns the clock a rate limiter should use with `storage` when none is given.
+
+    A monotonic clock is immune to the wall clock being stepped (e.g. by NTP) but only meaningful
+    within one host and boot, thus the wall clock is used for storages persisting or sharing their state.
+    """
+    return time if storage.persistent else monotonic
+
+
+class ManualClock:
+    """
+    A clock that only moves when told to, e.g. to test or simulate rate limiters without sleeping.
+
+    Example:
+    --------
+    clock = ManualClock()
+    rate_limiter = GeneralRateLimiter(BasicStorage(), 3, 10, clock=clock)
+    clock.advance(10.5)
+    """
+    __slots__ = ("now",)
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        """
+        Moves the clock forward by `seconds`, returns the new time.
+        """
+        if seconds < 0:
+            raise ValueError(f"A clock cannot go backwards: {seconds}")
+        self.now += seconds
+        return self.now
+
+    def set(self, now: float):
+        """
+        Moves the clock to `now`.
+        """
+        if now < self.now:
+            raise ValueError(f"A clock cannot go backwards: {now} < {self.now}")
+        self.now = now
@@ -1,4 +1,54 @@
+from typing import Any, Optional
+
+
 class ExceededRateLimitError(Exception):
+    """
+    Raised by the decorators when the key is over its limit.
+
+    The message is formatted from `key`, `max_requests` and `time_window` only when it is read,
+    not on every denial.
+    """
+    __slots__ = ("key", "max_requests", "time_window")
+
+    def __init__(
+            self, message: Optional[str] = None,
+            key: Any = None, max_requests: Optional[int] = None, time_window: Optional[float] = None
+    ):
+        if message is None:
+            super().__init__()
+        else:
+            super().__init__(message)
+        self.key = key
+        self.max_requests = max_requests
+        self.time_window = time_window
+
+    def __str__(self) -> str:
+        if self.args:
+            return super().__str__()
+        return (
+            f"Rate limit exceeded. "
+            f"`{self.key}` was/had called more than {self.max_requests} requests per {self.time_window} seconds."
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(key={self.key!r}, "
+            f"max_requests={self.max_requests!r}, time_window={self.time_window!r})"
+        )
+
+    def __reduce__(self):
+        # The fields are not in `args`, the default pickling would drop them (e.g. across processes)
+        return type(self), (self.args[0] if self.args else None, self.key, self.max_requests, self.time_window)
+
+
+class StorageFullError(Exception):
+    __slots__ = ()
+
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+class RemoteStorageError(Exception):
     __slots__ = ()
 
     def __init__(self, message: str):
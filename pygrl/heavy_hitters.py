@@ -0,0 +1,103 @@
+import threading
+from heapq import heapify, heappop, heappush
+from typing import Any
+
+
+class SpaceSaving:
+    """
+    Space-Saving sketch estimating the most frequent keys of a stream in fixed memory.
+
+    At most `capacity` keys are counted, a new key replaces the least counted one and inherits its count.
+    Every key seen more than `total / capacity` times is in the sketch, its count is overestimated
+    by at most `error`, the count of the key it replaced.
+
+    Attributes:
+    capacity (int): The number of keys counted at once.
+    total (int): The sum of the counts added so far.
+    """
+    __slots__ = ("capacity", "total", "__counts", "__heap")
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError(f"Invalid capacity: {capacity}")
+        self.capacity = capacity
+        self.total = 0
+        # key -> [count, error]
+        self.__counts: dict[str, list] = {}
+        # (count, key), stale entries are skipped when popped and dropped when the heap is rebuilt
+        self.__heap: list[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.__counts)
+
+    def add(self, key: str, count: int = 1):
+        """
+        Counts `count` more occurrences of `key`.
+        """
+        if count <= 0:
+            return None
+        self.total += count
+        counts, heap = self.__counts, self.__heap
+        entry = counts.get(key)
+        if entry is not None:
+            entry[0] += count
+        elif len(counts) < self.capacity:
+            entry = counts[key] = [count, 0]
+        else:
+            while True:
+                smallest, victim = heappop(heap)
+                if counts.get(victim, (None,))[0] == smallest:
+                    break
+            del counts[victim]
+            entry = counts[key] = [smallest + count, smallest]
+        heappush(heap, (entry[0], key))
+        if len(heap) > 4 * self.capacity:
+            self.__heap = [(entry[0], key) for key, entry in counts.items()]
+            heapify(self.__heap)
+
+    def top(self, n: int) -> list[tuple[str, int, int]]:
+        """
+        Returns the `n` most counted keys as (key, count, error), the most counted first.
+        """
+        ranked = sorted(self.__counts.items(), key=lambda item: item[1][0], reverse=True)[:n]
+        return [(key, count, error) for key, (count, error) in ranked]
+
+    def clear(self):
+        self.total = 0
+        self.__counts.clear()
+        self.__heap.clear()
+
+
+class HeavyHitters:
+    """
+    Tracks the heaviest keys of a rate limiter, over every check and over the denied checks only.
+
+    Attributes:
+    total (SpaceSaving): Every check.
+    denied (SpaceSaving): The denied checks.
+    """
+    __slots__ = ("total", "denied", "__lock")
+
+    def __init__(self, capacity: int):
+        self.total = SpaceSaving(capacity)
+        self.denied = SpaceSaving(capacity)
+        self.__lock = threading.Lock()
+
+    def add(self, key: Any, allowed: bool):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        with self.__lock:
+            self.total.add(key)
+            if not allowed:
+                self.denied.add(key)
+
+    def top(self, n: int, denied: bool = False) -> list[tuple[str, int]]:
+        with self.__lock:
+            ranked = (self.denied if denied else self.total).top(n)
+        return [(key, count) for key, count, _ in ranked]
+
+    def clear(self):
+        with self.__lock:
+            self.total.clear()
+            self.denied.clear()
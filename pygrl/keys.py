@@ -0,0 +1,126 @@
+import inspect
+from typing import Any, Callable, Optional, Sequence, Union
+
+# key_of(args, kwargs) returns the rate limiting key of one call
+KeyFunction = Callable[[tuple, dict], Any]
+
+_MISSING = inspect.Parameter.empty
+
+
+def _getter(func: Callable, index: Optional[int], name: Optional[str], default: Any) -> KeyFunction:
+    """
+    Returns the fastest getter of one argument, passed at `index` in `args` or as `name` in `kwargs`.
+    """
+    def missing():
+        return TypeError(f"{func.__qualname__}() missing the key argument {name if name is not None else index!r}")
+
+    if name is None:
+        def from_args(args: tuple, kwargs: dict):
+            try:
+                return args[index]
+            except IndexError:
+                if default is not _MISSING:
+                    return default
+                raise missing() from None
+        return from_args
+
+    if index is None:
+        if default is not _MISSING:
+            return lambda args, kwargs: kwargs.get(name, default)
+
+        def from_kwargs(args: tuple, kwargs: dict):
+            try:
+                return kwargs[name]
+            except KeyError:
+                raise missing() from None
+        return from_kwargs
+
+    def from_either(args: tuple, kwargs: dict):
+        if len(args) > index:
+            return args[index]
+        try:
+            return kwargs[name]
+        except KeyError:
+            if default is not _MISSING:
+                return default
+            raise missing() from None
+    return from_either
+
+
+def key_extractor(func: Callable, key_args: Sequence[Union[str, int]]) -> KeyFunction:
+    """
+    Resolves `key_args` against the signature of `func` once, into a function building the key of a call.
+
+    Args:
+    func (Callable): The decorated function.
+    key_args (Sequence[str | int]): The arguments making the key, by parameter name or by position.
+        A parameter is found whether it is passed by position or by keyword, its default is used when omitted.
+
+    Returns:
+    KeyFunction: key_of(args, kwargs), the value of the argument for one entry,
+        the values joined with "," for several entries.
+
+    Raises:
+    ValueError: If an entry is not a parameter of `func`, or names its *args or **kwargs.
+    """
+    if not key_args:
+        raise ValueError("Expect at least one key argument")
+    parameters = list(inspect.signature(func).parameters.values())
+    by_name = {parameter.name: parameter for parameter in parameters}
+    positional = [
+        parameter for parameter in parameters
+        if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    ]
+    var_positional = any(parameter.kind is inspect.Parameter.VAR_POSITIONAL for parameter in parameters)
+    var_keyword = any(parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters)
+
+    getters = []
+    for key_arg in key_args:
+        if isinstance(key_arg, int):
+            if 0 <= key_arg < len(positional):
+                parameter = positional[key_arg]
+            elif key_arg >= 0 and var_positional:
+                getters.append(_getter(func, key_arg, None, _MISSING))
+                continue
+            else:
+                raise ValueError(f"{func.__qualname__}() has no positional argument {key_arg}")
+        else:
+            parameter = by_name.get(key_arg)
+            if parameter is None:
+                if not var_keyword:
+                    raise ValueError(f"{func.__qualname__}() has no argument {key_arg!r}")
+                getters.append(_getter(func, None, key_arg, _MISSING))
+                continue
+        if parameter.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            raise ValueError(f"Cannot build the key from {parameter}")
+        index = positional.index(parameter) if parameter in positional else None
+        name = None if parameter.kind is inspect.Parameter.POSITIONAL_ONLY else parameter.name
+        getters.append(_getter(func, index, name, parameter.default))
+
+    if len(getters) == 1:
+        return getters[0]
+    getters = tuple(getters)
+    return lambda args, kwargs: ",".join([str(getter(args, kwargs)) for getter in getters])
+
+
+def key_function(
+        func: Callable, key_builder: Optional[Callable] = None, key_args: Optional[Sequence[Union[str, int]]] = None
+) -> KeyFunction:
+    """
+    Returns the function building the key of a call to the decorated `func`, chosen once at decoration time.
+
+    The key is, by priority: `key_builder(func, *args, **kwargs)`, the `key_args` of the call,
+    the `key` keyword argument of the call, the name of `func` (its repr if it has none).
+
+    Raises:
+    ValueError: If both `key_builder` and `key_args` are given, see also `key_extractor`.
+    """
+    if key_builder is not None and key_args is not None:
+        raise ValueError("Expect either `key_builder` or `key_args`, not both")
+    if key_builder is not None:
+        return lambda args, kwargs: key_builder(func, *args, **kwargs)
+    if key_args is not None:
+        return key_extractor(func, key_args)
+    # A `functools.partial` or a callable object may have no name
+    name = getattr(func, "__name__", None) or repr(func)
+    return lambda args, kwargs: kwargs.get("key") or name
@@ -1,8 +1,16 @@
 import asyncio
-from time import time
-from typing import Optional
+import inspect
+from collections import OrderedDict
+from functools import partial, wraps
+from typing import AsyncIterator, Callable, Iterator, Optional, Sequence, Union
+from .clock import default_clock
 from .custom_exception import ExceededRateLimitError
+from .heavy_hitters import HeavyHitters
+from .keys import key_function
+from .metrics import Metrics, MeteredStorage
 from .storage import Storage
+from .storage.storage import check_and_increment_of
+from .tracing import Tracer, TracedStorage
 
 
 class GeneralRateLimiter:
@@ -12,17 +20,51 @@ class GeneralRateLimiter:
     Notes:
     ------
     - DB interaction is not asynchronous!!!
+    - `clock` returns the current time in seconds. It defaults to a monotonic clock,
+      or to the wall clock if the storage is persistent (see `Storage.persistent`).
+      Pass a `pygrl.clock.ManualClock` to drive the rate limiter without sleeping.
+    - `metrics=True` counts the decisions, cleanups and storage calls, see `stats()`.
+    - `heavy_hitters=N` tracks the N heaviest keys of every check and of the denied checks in fixed memory,
+      see `top_keys()`.
+    - `tracer(operation, key)` returns a context manager entered around every storage call ("storage.<method>")
+      and every check ("check_limit") and cleanup ("cleanup"), see `pygrl.tracing`.
+    - `negative_cache=N` remembers up to N denied keys until their window ends, the checks of a denied key
+      are then denied without reaching the storage, and are not counted in it. A `reset()` of the shared storage
+      from another rate limiter does not unblock the keys cached here.
+    - Without `metrics`, `heavy_hitters`, `tracer` and `negative_cache`, the checks run exactly as if none existed.
+    - The denied checks do not write to the storage, the count of a window stops at the first request over
+      `max_requests`. Storages overriding `check_and_increment` without its `limit` argument count every request.
     """
     def __init__(
             self, storage: Storage,
             max_requests: int, time_window: int = 1,
-            max_capacity: int = 32, cleanup_threshold: float = 10
+            max_capacity: int = 32, cleanup_threshold: float = 10,
+            clock: Optional[Callable[[], float]] = None, metrics: bool = False, heavy_hitters: int = 0,
+            tracer: Optional[Tracer] = None, negative_cache: int = 0
     ):
-        self.__storage = storage
+        self.__metrics = Metrics() if metrics else None
+        self.__heavy_hitters = HeavyHitters(heavy_hitters) if heavy_hitters else None
+        self.__tracer = tracer
+        self.__storage = storage if self.__metrics is None else MeteredStorage(storage, self.__metrics)
+        if tracer is not None:
+            self.__storage = TracedStorage(self.__storage, tracer)
+        # The denied checks do not write, see `Storage.check_and_increment`
+        self.__check_and_increment = partial(check_and_increment_of(self.__storage), limit=max_requests)
+        self.__clock = clock if clock is not None else default_clock(storage)
         self.__max_requests = max_requests
         self.__time_window = time_window
         self.__capacity = max_capacity
         self.__cleanup_threshold = cleanup_threshold if cleanup_threshold > time_window else time_window
+        # key -> end of its window, in order of denial
+        self.__blocked: Optional[OrderedDict] = OrderedDict() if negative_cache > 0 else None
+        self.__blocked_capacity = negative_cache
+        if self.__metrics is not None or self.__heavy_hitters is not None or tracer is not None:
+            # Only the rate limiters collecting metrics or traced pay for the extra work
+            self.check_limit = self.__check_limit_observed
+        elif self.__blocked is not None:
+            self.check_limit = self.__check_limit_cached
+        if tracer is not None:
+            self.cleanup = self.__cleanup_traced
 
     def check_limit(self, key: str) -> bool:
         """
@@ -41,35 +83,111 @@ class GeneralRateLimiter:
         bool
             True if the key has not exceeded the rate limit, False otherwise.
         """
-        current_time = time()
-        item = self.__storage.get(key)
-        if item is None:
-            item = {"start_time": current_time, "num_requests": 1}
-            self.__storage.set(key, item)
-            return True
+        item = self.__check_and_increment(key, self.__clock(), self.__time_window)
+        return item["num_requests"] <= self.__max_requests
 
-        if current_time - item.get("start_time") > self.__time_window:
-            item = {"start_time": current_time, "num_requests": 1}
-            self.__storage.set(key, item)
+    def __check_limit_cached(self, key: str) -> bool:
+        blocked = self.__blocked
+        blocked_until = blocked.get(key)
+        if blocked_until is not None:
+            if self.__clock() <= blocked_until:
+                return False
+            blocked.pop(key, None)
+        item = self.__check_and_increment(key, self.__clock(), self.__time_window)
+        if item["num_requests"] <= self.__max_requests:
             return True
+        self.__block(key, item)
+        return False
+
+    def __block(self, key: str, item: dict):
+        blocked = self.__blocked
+        if len(blocked) >= self.__blocked_capacity:
+            # The oldest denial is the first to expire, give or take the start times of the windows.
+            # Another thread sharing the rate limiter (e.g. `WSGIMiddleware`) may have emptied the cache since
+            try:
+                blocked.popitem(last=False)
+            except KeyError:
+                pass
+        blocked[key] = item["start_time"] + self.__time_window
+
+    def __check_limit_observed(self, key: str) -> bool:
+        check = GeneralRateLimiter.check_limit if self.__blocked is None else GeneralRateLimiter.__check_limit_cached
+        if self.__tracer is None:
+            allowed = check(self, key)
+        else:
+            with self.__tracer("check_limit", key):
+                allowed = check(self, key)
+        self.__count(key, allowed)
+        return allowed
+
+    def __count(self, key: str, allowed: bool):
+        if self.__metrics is not None:
+            if allowed:
+                self.__metrics.allowed += 1
+            else:
+                self.__metrics.denied += 1
+        if self.__heavy_hitters is not None:
+            self.__heavy_hitters.add(key, allowed)
+
+    def check_limit_state(self, key: str) -> tuple[bool, int, float]:
+        """
+        Checks `key` like `check_limit`, also returning the state of its window, e.g. for rate limit headers.
 
-        item["num_requests"] += 1
+        Parameters
+        ----------
+        key : str
+            The key to check the rate limit for.
 
-        self.__storage.set(key, item)
-        return item["num_requests"] <= self.__max_requests
+        Returns
+        -------
+        tuple[bool, int, float]
+            True if the key has not exceeded the rate limit, False otherwise,
+            the number of requests left in the window, and the seconds until the window resets.
+        """
+        if self.__tracer is None:
+            return self.__check_limit_state(key)
+        with self.__tracer("check_limit", key):
+            return self.__check_limit_state(key)
+
+    def __check_limit_state(self, key: str) -> tuple[bool, int, float]:
+        current_time = self.__clock()
+        blocked = self.__blocked
+        if blocked is not None:
+            blocked_until = blocked.get(key)
+            if blocked_until is not None:
+                if current_time <= blocked_until:
+                    self.__count(key, False)
+                    return False, 0, blocked_until - current_time
+                blocked.pop(key, None)
+        item = self.__check_and_increment(key, current_time, self.__time_window)
+        allowed = item["num_requests"] <= self.__max_requests
+        if not allowed and blocked is not None:
+            self.__block(key, item)
+        self.__count(key, allowed)
+        reset_after = max(0.0, item["start_time"] + self.__time_window - current_time)
+        return allowed, max(0, self.__max_requests - item["num_requests"]), reset_after
 
     def cleanup(self):
         keys = self.__storage.keys()
         if len(keys) <= self.__capacity:
             return None
 
-        current_time = time()
+        current_time = self.__clock()
+        evicted = 0
         for key in keys:
             item = self.__storage.get(key)
             if current_time - item.get("start_time") > self.__cleanup_threshold:
                 self.__storage.drop(key)
+                evicted += 1
+        if self.__metrics is not None:
+            self.__metrics.cleanup_runs += 1
+            self.__metrics.evicted += evicted
         return None
 
+    def __cleanup_traced(self):
+        with self.__tracer("cleanup", None):
+            return GeneralRateLimiter.cleanup(self)
+
     def __call__(self, key: str) -> bool:
         return_value = self.check_limit(key)
 
@@ -79,18 +197,92 @@ class GeneralRateLimiter:
 
     def reset(self):
         self.__storage.clear()
+        if self.__blocked is not None:
+            self.__blocked.clear()
     
     def info(self) -> dict:
         keys: list = self.__storage.keys()
         values: list = list(map(lambda key: self.__storage.get(key), keys))
         return {"keys": keys, "values": values}
+
+    def iter_info(self, batch_size: int = 100, prefix: Optional[str] = None) -> Iterator[tuple]:
+        """
+        Yields the (key, value) of the keys, fetched `batch_size` at a time with `Storage.scan`.
+
+        Unlike `info()`, the keys and values are never all loaded at once.
+
+        Parameters
+        ----------
+        batch_size : int
+            The number of keys fetched per call to the storage, default is 100.
+        prefix : str, optional
+            Only yields the keys starting with `prefix`.
+
+        Returns
+        -------
+        Iterator[tuple]
+            The (key, value) pairs, keys set or dropped meanwhile may or may not be yielded.
+        """
+        cursor = None
+        while True:
+            cursor, items = self.__storage.scan(cursor, batch_size, prefix)
+            yield from items
+            if cursor is None:
+                return None
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """
+        The live counters, e.g. for `pygrl.metrics.render`, None unless created with `metrics=True`.
+        """
+        return self.__metrics
+
+    def stats(self) -> Optional[dict]:
+        """
+        Returns the counters collected since the rate limiter was created.
+
+        Returns
+        -------
+        dict | None
+            {"allowed", "denied", "cleanup_runs", "evicted", "storage": {operation: {"calls", "seconds"}}},
+            None if the rate limiter was created without `metrics=True`.
+        """
+        if self.__metrics is None:
+            return None
+        return self.__metrics.snapshot()
+
+    def top_keys(self, n: int = 10, denied: bool = False) -> Optional[list]:
+        """
+        Returns the heaviest keys since the rate limiter was created, estimated in fixed memory.
+
+        Parameters
+        ----------
+        n : int
+            The number of keys to return, at most `heavy_hitters`.
+        denied : bool
+            If True, ranks the keys by denied checks, otherwise by checks.
+
+        Returns
+        -------
+        list[tuple[str, int]] | None
+            The (key, count) of the heaviest keys, the heaviest first,
+            None if the rate limiter was created without `heavy_hitters`.
+
+        Notes:
+        ------
+        - The counts are overestimated by at most the number of checks divided by `heavy_hitters`.
+        """
+        if self.__heavy_hitters is None:
+            return None
+        return self.__heavy_hitters.top(n, denied)
     
     @classmethod
     def general_rate_limiter(
             cls, storage: Storage,
             max_requests: int, time_window: int = 1,
             max_capacity: int = 32, cleanup_threshold: float = 0.1,
-            key_builder: Optional[callable] = None
+            key_builder: Optional[callable] = None, clock: Optional[Callable[[], float]] = None,
+            key_args: Optional[Sequence[Union[str, int]]] = None, on_limited: Optional[Callable] = None
     ):
         """
         Decorator to limit the number of requests to a function.
@@ -109,6 +301,14 @@ class GeneralRateLimiter:
             The threshold to clean up the storage.
         key_builder: callable
             The function to build the key from the function and arguments.
+        clock: callable
+            The function returning the current time in seconds, see `GeneralRateLimiter`.
+        key_args: list[str | int]
+            The arguments making the key, by parameter name or by position, e.g. ["username"] or [0, "host"].
+            Resolved once against the signature of the decorated function.
+        on_limited: callable
+            Called as `on_limited(key, args, kwargs)` instead of raising when the rate limit is exceeded,
+            with the arguments of the call, its return value is returned instead of the function's.
         
         Returns
         -------
@@ -116,7 +316,7 @@ class GeneralRateLimiter:
 
         Raises
         ------
-        ExceededRateLimitError : If the rate limit is exceeded.
+        ExceededRateLimitError : If the rate limit is exceeded, unless `on_limited` is given.
 
         Notes:
         ------
@@ -124,28 +324,14 @@ class GeneralRateLimiter:
         - The key can be passed as a keyword argument to the function if rate limiting is required for different keys.
         - `key_builder` has a higher priority than the `key` argument.
         - `key_builder` should be a function that returns a string.
+        - `key_args` replaces `key_builder` for keys made of the arguments, without building the key in Python
+          on every call. Several arguments are joined with ",". They cannot be used together.
+        - Same as `pygrl.rate_limit`, which picks the rate limiter matching the decorated function.
         """
-
-        def decorator(func):
-            limiter = GeneralRateLimiter(storage, max_requests, time_window, max_capacity, cleanup_threshold)
-
-            def wrapper(*args, **kwargs):
-                if key_builder:
-                    key = key_builder(func, *args, **kwargs)
-                elif kwargs.get("key"):
-                    key = kwargs.get("key")
-                else:
-                    key = f"{func.__name__}"
-                if not limiter(key):
-                    raise ExceededRateLimitError(
-                        f"Rate limit exceeded. "
-                        f"`{key}` was/had called more than {max_requests} requests per {time_window} seconds."
-                    )
-                return func(*args, **kwargs)
-
-            return wrapper
-
-        return decorator
+        return rate_limit(
+            storage, max_requests, time_window, max_capacity, cleanup_threshold, key_builder, clock, key_args,
+            on_limited
+        )
 
 
 class GeneralRateLimiter_with_Lock:
@@ -156,37 +342,145 @@ class GeneralRateLimiter_with_Lock:
     Notes:
     ------
     - DB interaction is not asynchronous!!!
+    - `clock` returns the current time in seconds. It defaults to a monotonic clock,
+      or to the wall clock if the storage is persistent (see `Storage.persistent`).
+      Pass a `pygrl.clock.ManualClock` to drive the rate limiter without sleeping.
+    - `metrics=True` counts the decisions, cleanups and storage calls, see `stats()`.
+    - `heavy_hitters=N` tracks the N heaviest keys of every check and of the denied checks in fixed memory,
+      see `top_keys()`.
+    - `tracer(operation, key)` returns a context manager entered around every storage call ("storage.<method>")
+      and every check ("check_limit") and cleanup ("cleanup"), see `pygrl.tracing`.
+    - `negative_cache=N` remembers up to N denied keys until their window ends, the checks of a denied key
+      are then denied without reaching the storage, and are not counted in it. A `reset()` of the shared storage
+      from another rate limiter does not unblock the keys cached here.
+    - Without `metrics`, `heavy_hitters`, `tracer` and `negative_cache`, the checks run exactly as if none existed.
+    - The denied checks do not write to the storage, the count of a window stops at the first request over
+      `max_requests`. Storages overriding `check_and_increment` without its `limit` argument count every request.
     """
     def __init__(
             self, storage: Storage,
             max_requests: int, time_window: int = 1,
-            max_capacity: int = 32, cleanup_threshold: float = 10
+            max_capacity: int = 32, cleanup_threshold: float = 10,
+            clock: Optional[Callable[[], float]] = None, metrics: bool = False, heavy_hitters: int = 0,
+            tracer: Optional[Tracer] = None, negative_cache: int = 0
     ):
-        self.__storage = storage
+        self.__metrics = Metrics() if metrics else None
+        self.__heavy_hitters = HeavyHitters(heavy_hitters) if heavy_hitters else None
+        self.__tracer = tracer
+        self.__storage = storage if self.__metrics is None else MeteredStorage(storage, self.__metrics)
+        if tracer is not None:
+            self.__storage = TracedStorage(self.__storage, tracer)
+        # The denied checks do not write, see `Storage.check_and_increment`
+        self.__check_and_increment = partial(check_and_increment_of(self.__storage), limit=max_requests)
+        self.__clock = clock if clock is not None else default_clock(storage)
         self.__max_requests = max_requests
         self.__time_window = time_window
         self.__capacity = max_capacity
         self.__cleanup_threshold = cleanup_threshold if cleanup_threshold > time_window else time_window
+        # key -> end of its window, in order of denial
+        self.__blocked: Optional[OrderedDict] = OrderedDict() if negative_cache > 0 else None
+        self.__blocked_capacity = negative_cache
         self.__lock = asyncio.Lock()
+        if self.__metrics is not None or self.__heavy_hitters is not None or tracer is not None:
+            # Only the rate limiters collecting metrics or traced pay for the extra work
+            self.check_limit = self.__check_limit_observed
+        elif self.__blocked is not None:
+            self.check_limit = self.__check_limit_cached
+        if tracer is not None:
+            self.cleanup = self.__cleanup_traced
 
     async def check_limit(self, key: str) -> bool:
         async with self.__lock:
-            current_time = time()
-            item = self.__storage.get(key)
-            if item is None:
-                item = {"start_time": current_time, "num_requests": 1}
-                self.__storage.set(key, item)
-                return True
+            item = self.__check_and_increment(key, self.__clock(), self.__time_window)
+            return item["num_requests"] <= self.__max_requests
 
-            if current_time - item.get("start_time") > self.__time_window:
-                item = {"start_time": current_time, "num_requests": 1}
-                self.__storage.set(key, item)
-                return True
+    async def __check_limit_cached(self, key: str) -> bool:
+        # Read without the lock, the denied keys do not wait for it
+        blocked = self.__blocked
+        blocked_until = blocked.get(key)
+        if blocked_until is not None:
+            if self.__clock() <= blocked_until:
+                return False
+            blocked.pop(key, None)
+        async with self.__lock:
+            item = self.__check_and_increment(key, self.__clock(), self.__time_window)
+        if item["num_requests"] <= self.__max_requests:
+            return True
+        self.__block(key, item)
+        return False
+
+    def __block(self, key: str, item: dict):
+        blocked = self.__blocked
+        if len(blocked) >= self.__blocked_capacity:
+            # The oldest denial is the first to expire, give or take the start times of the windows.
+            # Guarded as in `GeneralRateLimiter`, in case the rate limiter is shared with other threads
+            try:
+                blocked.popitem(last=False)
+            except KeyError:
+                pass
+        blocked[key] = item["start_time"] + self.__time_window
+
+    async def __check_limit_observed(self, key: str) -> bool:
+        check = (
+            GeneralRateLimiter_with_Lock.check_limit if self.__blocked is None
+            else GeneralRateLimiter_with_Lock.__check_limit_cached
+        )
+        if self.__tracer is None:
+            allowed = await check(self, key)
+        else:
+            with self.__tracer("check_limit", key):
+                allowed = await check(self, key)
+        self.__count(key, allowed)
+        return allowed
+
+    def __count(self, key: str, allowed: bool):
+        if self.__metrics is not None:
+            if allowed:
+                self.__metrics.allowed += 1
+            else:
+                self.__metrics.denied += 1
+        if self.__heavy_hitters is not None:
+            self.__heavy_hitters.add(key, allowed)
+
+    async def check_limit_state(self, key: str) -> tuple[bool, int, float]:
+        """
+        Checks `key` like `check_limit`, also returning the state of its window, e.g. for rate limit headers.
 
-            item["num_requests"] += 1
+        Parameters
+        ----------
+        key : str
+            The key to check the rate limit for.
 
-            self.__storage.set(key, item)
-            return item["num_requests"] <= self.__max_requests
+        Returns
+        -------
+        tuple[bool, int, float]
+            True if the key has not exceeded the rate limit, False otherwise,
+            the number of requests left in the window, and the seconds until the window resets.
+        """
+        if self.__tracer is None:
+            return await self.__check_limit_state(key)
+        with self.__tracer("check_limit", key):
+            return await self.__check_limit_state(key)
+
+    async def __check_limit_state(self, key: str) -> tuple[bool, int, float]:
+        blocked = self.__blocked
+        if blocked is not None:
+            blocked_until = blocked.get(key)
+            if blocked_until is not None:
+                current_time = self.__clock()
+                if current_time <= blocked_until:
+                    self.__count(key, False)
+                    return False, 0, blocked_until - current_time
+                blocked.pop(key, None)
+        async with self.__lock:
+            current_time = self.__clock()
+            item = self.__check_and_increment(key, current_time, self.__time_window)
+        allowed = item["num_requests"] <= self.__max_requests
+        if not allowed and blocked is not None:
+            self.__block(key, item)
+        self.__count(key, allowed)
+        reset_after = max(0.0, item["start_time"] + self.__time_window - current_time)
+        return allowed, max(0, self.__max_requests - item["num_requests"]), reset_after
 
     async def cleanup(self):
         async with self.__lock:
@@ -195,13 +489,22 @@ class GeneralRateLimiter_with_Lock:
             if len(keys) <= self.__capacity:
                 return None
 
-            current_time = time()
+            current_time = self.__clock()
+            evicted = 0
             for key in keys:
                 item = self.__storage.get(key)
                 if current_time - item.get("start_time") > self.__cleanup_threshold:
                     self.__storage.drop(key)
+                    evicted += 1
+            if self.__metrics is not None:
+                self.__metrics.cleanup_runs += 1
+                self.__metrics.evicted += evicted
             return None
 
+    async def __cleanup_traced(self):
+        with self.__tracer("cleanup", None):
+            return await GeneralRateLimiter_with_Lock.cleanup(self)
+
     async def __call__(self, key: str) -> bool:
         return_value = await self.check_limit(key)
 
@@ -212,19 +515,96 @@ class GeneralRateLimiter_with_Lock:
     async def reset(self):
         async with self.__lock:
             self.__storage.clear()
+            if self.__blocked is not None:
+                self.__blocked.clear()
     
     async def info(self) -> dict:
         async with self.__lock:
             keys: list = self.__storage.keys()
             values: list = list(map(lambda key: self.__storage.get(key), keys))
             return {"keys": keys, "values": values}
+
+    async def iter_info(self, batch_size: int = 100, prefix: Optional[str] = None) -> AsyncIterator[tuple]:
+        """
+        Yields the (key, value) of the keys, fetched `batch_size` at a time with `Storage.scan`.
+        The lock is only held while fetching a batch, not while the caller consumes it.
+
+        Unlike `info()`, the keys and values are never all loaded at once.
+
+        Parameters
+        ----------
+        batch_size : int
+            The number of keys fetched per call to the storage, default is 100.
+        prefix : str, optional
+            Only yields the keys starting with `prefix`.
+
+        Returns
+        -------
+        AsyncIterator[tuple]
+            The (key, value) pairs, keys set or dropped meanwhile may or may not be yielded.
+        """
+        cursor = None
+        while True:
+            async with self.__lock:
+                cursor, items = self.__storage.scan(cursor, batch_size, prefix)
+            for item in items:
+                yield item
+            if cursor is None:
+                return
+
+    @property
+    def metrics(self) -> Optional[Metrics]:
+        """
+        The live counters, e.g. for `pygrl.metrics.render`, None unless created with `metrics=True`.
+        """
+        return self.__metrics
+
+    def stats(self) -> Optional[dict]:
+        """
+        Returns the counters collected since the rate limiter was created.
+
+        Returns
+        -------
+        dict | None
+            {"allowed", "denied", "cleanup_runs", "evicted", "storage": {operation: {"calls", "seconds"}}},
+            None if the rate limiter was created without `metrics=True`.
+        """
+        if self.__metrics is None:
+            return None
+        return self.__metrics.snapshot()
+
+    def top_keys(self, n: int = 10, denied: bool = False) -> Optional[list]:
+        """
+        Returns the heaviest keys since the rate limiter was created, estimated in fixed memory.
+
+        Parameters
+        ----------
+        n : int
+            The number of keys to return, at most `heavy_hitters`.
+        denied : bool
+            If True, ranks the keys by denied checks, otherwise by checks.
+
+        Returns
+        -------
+        list[tuple[str, int]] | None
+            The (key, count) of the heaviest keys, the heaviest first,
+            None if the rate limiter was created without `heavy_hitters`.
+
+        Notes:
+        ------
+        - The counts are overestimated by at most the number of checks divided by `heavy_hitters`.
+        """
+        if self.__heavy_hitters is None:
+            return None
+        return self.__heavy_hitters.top(n, denied)
     
     @classmethod
     def general_rate_limiter(
             cls, storage: Storage,
             max_requests: int, time_window: int = 1,
             max_capacity: int = 32, cleanup_threshold: float = 0.1,
-            key_builder: Optional[callable] = None
+            key_builder: Optional[callable] = None, clock: Optional[Callable[[], float]] = None,
+            key_args: Optional[Sequence[Union[str, int]]] = None, on_limited: Optional[Callable] = None
     ):
         """
         Decorator to limit the number of requests to a function.
@@ -243,6 +623,14 @@ class GeneralRateLimiter_with_Lock:
             The threshold to clean up the storage.
         key_builder: callable
             The function to build the key from the function and arguments.
+        clock: callable
+            The function returning the current time in seconds, see `GeneralRateLimiter`.
+        key_args: list[str | int]
+            The arguments making the key, by parameter name or by position, e.g. ["username"] or [0, "host"].
+            Resolved once against the signature of the decorated function.
+        on_limited: callable
+            Called as `on_limited(key, args, kwargs)` instead of raising when the rate limit is exceeded,
+            with the arguments of the call, its return value is returned instead of the function's.
         
         Returns
         -------
@@ -250,7 +638,7 @@ class GeneralRateLimiter_with_Lock:
 
         Raises
         ------
-        ExceededRateLimitError : If the rate limit is exceeded.
+        ExceededRateLimitError : If the rate limit is exceeded, unless `on_limited` is given.
 
         Notes:
         ------
@@ -258,28 +646,103 @@ class GeneralRateLimiter_with_Lock:
         - The key can be passed as a keyword argument to the function if rate limiting is required for different keys.
         - `key_builder` has a higher priority than the `key` argument.
         - `key_builder` should be a function that returns a string.
+        - `key_args` replaces `key_builder` for keys made of the arguments, without building the key in Python
+          on every call. Several arguments are joined with ",". They cannot be used together.
+        - Same as `pygrl.rate_limit`, which picks the rate limiter matching the decorated function.
         """
+        return rate_limit(
+            storage, max_requests, time_window, max_capacity, cleanup_threshold, key_builder, clock, key_args,
+            on_limited
+        )
+
+
+def rate_limit(
+        storage: Storage,
+        max_requests: int, time_window: int = 1,
+        max_capacity: int = 32, cleanup_threshold: float = 0.1,
+        key_builder: Optional[callable] = None, clock: Optional[Callable[[], float]] = None,
+        key_args: Optional[Sequence[Union[str, int]]] = None, on_limited: Optional[Callable] = None
+):
+    """
+    Decorator to limit the number of requests to a function, sync or async.
+
+    Parameters
+    ----------
+    See `GeneralRateLimiter.general_rate_limiter`.
 
-        def decorator(func):
-            limiter = GeneralRateLimiter_with_Lock(storage, max_requests, time_window, max_capacity, cleanup_threshold)
+    Returns
+    -------
+    function : The decorated function, with the name, docstring and signature of the original one.
 
+    Raises
+    ------
+    ExceededRateLimitError : If the rate limit is exceeded, unless `on_limited` is given.
+
+    Notes:
+    ------
+    - Coroutine functions and async generator functions are limited by a `GeneralRateLimiter_with_Lock`,
+      the other callables by a `GeneralRateLimiter`.
+    - An async generator is checked when its iteration starts, the other functions when they are called.
+    - The wrapper sets `__wrapped__`, `inspect.signature` (e.g. FastAPI) sees the parameters of the original function.
+    - `on_limited` skips building and raising an exception, the cheaper path when many calls are denied.
+      It may be a coroutine function for async functions. An async generator over the limit yields nothing.
+    """
+
+    def decorator(func):
+        key_of = key_function(func, key_builder, key_args)
+
+        if inspect.iscoroutinefunction(func):
+            limiter = GeneralRateLimiter_with_Lock(
+                storage, max_requests, time_window, max_capacity, cleanup_threshold, clock
+            )
+            on_limited_async = inspect.iscoroutinefunction(on_limited)
+
+            @wraps(func)
             async def wrapper(*args, **kwargs):
-                if key_builder:
-                    key = key_builder(func, *args, **kwargs)
-                elif kwargs.get("key"):
-                    key = kwargs.get("key")
-                else:
-                    key = f"{func.__name__}"
+                key = key_of(args, kwargs)
                 if not await limiter(key):
-                    raise ExceededRateLimitError(
-                        f"Rate limit exceeded. "
-                        f"`{key}` was/had called more than {max_requests} requests per {time_window} seconds."
-                    )
+                    if on_limited is None:
+                        raise ExceededRateLimitError(None, key, max_requests, time_window)
+                    if on_limited_async:
+                        return await on_limited(key, args, kwargs)
+                    return on_limited(key, args, kwargs)
                 return await func(*args, **kwargs)
 
-            return wrapper
+        elif inspect.isasyncgenfunction(func):
+            limiter = GeneralRateLimiter_with_Lock(
+                storage, max_requests, time_window, max_capacity, cleanup_threshold, clock
+            )
+            on_limited_async = inspect.iscoroutinefunction(on_limited)
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = key_of(args, kwargs)
+                if not await limiter(key):
+                    if on_limited is None:
+                        raise ExceededRateLimitError(None, key, max_requests, time_window)
+                    if on_limited_async:
+                        await on_limited(key, args, kwargs)
+                    else:
+                        on_limited(key, args, kwargs)
+                    return
+                async for item in func(*args, **kwargs):
+                    yield item
+
+        else:
+            limiter = GeneralRateLimiter(storage, max_requests, time_window, max_capacity, cleanup_threshold, clock)
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = key_of(args, kwargs)
+                if not limiter(key):
+                    if on_limited is None:
+                        raise ExceededRateLimitError(None, key, max_requests, time_window)
+                    return on_limited(key, args, kwargs)
+                return func(*args, **kwargs)
+
+        return wrapper
 
-        return decorator
+    return decorator
 
 
 if __name__ == "__main__":
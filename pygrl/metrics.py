@@ -0,0 +1,220 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+from typing import Any, Callable, Mapping, Optional
+from .storage import Storage, StorageWrapper
+
+# Upper bounds of the latency histogram buckets in nanoseconds: 1us, 2us, 4us, ... about 8.4s, then +Inf
+LATENCY_BUCKETS_NS = tuple(1000 << index for index in range(24))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics:
+    """
+    Counters of a rate limiter, filled when it is created with `metrics=True`.
+
+    Attributes:
+    allowed (int): The number of checks within the limit.
+    denied (int): The number of checks over the limit.
+    cleanup_runs (int): The number of cleanups that scanned the keys, i.e. with more keys than `max_capacity`.
+    evicted (int): The number of keys dropped by the cleanups.
+    storage (dict[str, list[int]]): The number of calls and their cumulative duration in nanoseconds,
+        by storage operation.
+    histograms (dict[str, list[int]]): The number of calls per bucket of `LATENCY_BUCKETS_NS` (not cumulative,
+        the last one is +Inf), by storage operation.
+
+    Notes:
+    The counters are plain integers, no lock is taken. Threads racing on the same counter may miss an increment,
+    the counters are meant for monitoring, not accounting.
+    """
+    __slots__ = ("allowed", "denied", "cleanup_runs", "evicted", "storage", "histograms")
+
+    def __init__(self):
+        self.allowed = 0
+        self.denied = 0
+        self.cleanup_runs = 0
+        self.evicted = 0
+        self.storage: dict[str, list[int]] = {}
+        self.histograms: dict[str, list[int]] = {}
+
+    def observe(self, operation: str, duration_ns: int):
+        """
+        Records one storage call of `operation` lasting `duration_ns` nanoseconds.
+        """
+        entry = self.storage.get(operation)
+        if entry is None:
+            # The histogram first, `render` reads the histograms of the operations in `storage`
+            self.histograms[operation] = [0] * (len(LATENCY_BUCKETS_NS) + 1)
+            entry = self.storage[operation] = [0, 0]
+        entry[0] += 1
+        entry[1] += duration_ns
+        # The buckets double from 1us, the index is the bit length of the duration in whole microseconds
+        index = ((duration_ns - 1) // 1000).bit_length() if duration_ns > 0 else 0
+        self.histograms[operation][min(index, len(LATENCY_BUCKETS_NS))] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of the counters, the durations in seconds.
+        """
+        return {
+            "allowed": self.allowed,
+            "denied": self.denied,
+            "cleanup_runs": self.cleanup_runs,
+            "evicted": self.evicted,
+            "storage": {
+                operation: {"calls": calls, "seconds": total_ns / 1e9}
+                for operation, (calls, total_ns) in list(self.storage.items())
+            },
+        }
+
+
+class MeteredStorage(StorageWrapper):
+    """
+    MeteredStorage is a subclass of StorageWrapper.
+    It forwards every call to `storage` and records its duration in `metrics`.
+
+    Attributes:
+    storage (Storage): The storage being measured.
+    metrics (Metrics): The counters updated on every call.
+    """
+
+    def __init__(self, storage: Storage, metrics: Optional[Metrics] = None):
+        super().__init__(storage)
+        self.metrics = metrics if metrics is not None else Metrics()
+
+    def __observe(self, operation: str, call: Callable, *args):
+        start = perf_counter_ns()
+        try:
+            return call(*args)
+        finally:
+            self.metrics.observe(operation, perf_counter_ns() - start)
+
+    def get(self, key: str):
+        return self.__observe("get", super().get, key)
+
+    def set(self, key: str, value: Any):
+        self.__observe("set", super().set, key, value)
+
+    def drop(self, key: str):
+        self.__observe("drop", super().drop, key)
+
+    def clear(self):
+        self.__observe("clear", super().clear)
+
+    def keys(self) -> list:
+        return self.__observe("keys", super().keys)
+
+    def get_many(self, keys: list) -> list:
+        return self.__observe("get_many", super().get_many, keys)
+
+    def set_many(self, items: dict) -> None:
+        self.__observe("set_many", super().set_many, items)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        return self.__observe(
+            "check_and_increment", super().check_and_increment, key, current_time, time_window, amount, limit
+        )
+
+    def scan(self, cursor: Any = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        return self.__observe("scan", super().scan, cursor, count, prefix)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _metrics_of(source) -> Optional[Metrics]:
+    return source if isinstance(source, Metrics) else getattr(source, "metrics", None)
+
+
+def render(sources: Mapping[str, Any], namespace: str = "pygrl") -> str:
+    """
+    Renders the metrics in the Prometheus text exposition format.
+
+    Args:
+    sources (Mapping[str, Any]): The rate limiters (created with `metrics=True`), `MeteredStorage` or `Metrics`
+        by name, the name is the `limiter` label. Sources without metrics are skipped.
+    namespace (str, optional): The prefix of the metric names. Defaults to "pygrl".
+
+    Returns:
+    str: The exposition, one family per metric.
+    """
+    families = {
+        "checks_total": ("counter", "Rate limit checks by decision.", []),
+        "cleanup_runs_total": ("counter", "Cleanups that scanned the keys.", []),
+        "evicted_keys_total": ("counter", "Keys dropped by the cleanups.", []),
+        "storage_call_duration_seconds": ("histogram", "Duration of the storage calls by operation.", []),
+    }
+    for name, source in list(sources.items()):
+        metrics = _metrics_of(source)
+        if metrics is None:
+            continue
+        label = f'limiter="{_escape(str(name))}"'
+        checks = families["checks_total"][2]
+        checks.append(f'{{{label},decision="allowed"}} {metrics.allowed}')
+        checks.append(f'{{{label},decision="denied"}} {metrics.denied}')
+        families["cleanup_runs_total"][2].append(f"{{{label}}} {metrics.cleanup_runs}")
+        families["evicted_keys_total"][2].append(f"{{{label}}} {metrics.evicted}")
+        durations = families["storage_call_duration_seconds"][2]
+        for operation, (_, total_ns) in sorted(list(metrics.storage.items())):
+            labels = f'{label},operation="{_escape(operation)}"'
+            # Copied first, other threads may keep observing meanwhile
+            counts = list(metrics.histograms[operation])
+            cumulative = 0
+            for bound_ns, count in zip(LATENCY_BUCKETS_NS, counts):
+                cumulative += count
+                durations.append(f'_bucket{{{labels},le="{bound_ns / 1e9:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            durations.append(f'_bucket{{{labels},le="+Inf"}} {cumulative}')
+            durations.append(f"_sum{{{labels}}} {total_ns / 1e9!r}")
+            durations.append(f"_count{{{labels}}} {cumulative}")
+
+    lines = []
+    for suffix, (kind, description, samples) in families.items():
+        name = f"{namespace}_{suffix}"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample in samples:
+            lines.append(name + sample)
+    return "\n".join(lines) + "\n"
+
+
+def start_http_server(
+        sources: Mapping[str, Any], port: int = 8000, host: str = "127.0.0.1",
+        path: str = "/metrics", namespace: str = "pygrl"
+) -> ThreadingHTTPServer:
+    """
+    Serves `render(sources)` over HTTP from a daemon thread, `sources` is read again on every scrape.
+
+    Args:
+    sources (Mapping[str, Any]): See `render`.
+    port (int, optional): The port to listen on, 0 picks a free one. Defaults to 8000.
+    host (str, optional): The address to listen on. Defaults to "127.0.0.1".
+    path (str, optional): The path of the metrics. Defaults to "/metrics".
+    namespace (str, optional): See `render`. Defaults to "pygrl".
+
+    Returns:
+    ThreadingHTTPServer: The running server, `shutdown()` stops it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != path:
+                self.send_error(404)
+                return None
+            body = render(sources, namespace).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would flood stderr
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="pygrl-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,5 @@
+from .rules import Rule, RouteTable
+from .asgi import ASGIMiddleware
+from .wsgi import WSGIMiddleware
+
+__all__ = ["Rule", "RouteTable", "ASGIMiddleware", "WSGIMiddleware"]
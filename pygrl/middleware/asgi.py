@@ -0,0 +1,133 @@
+import math
+from typing import Any, Callable, Iterable
+from .rules import Rule, RouteTable, parse_key
+from ..main import GeneralRateLimiter_with_Lock
+from ..storage import Storage
+
+BODY = b"Rate limit exceeded."
+
+
+def asgi_key(key) -> Callable[[dict], str]:
+    """
+    Compiles the key of a `Rule` into a function of the ASGI scope.
+    """
+    if callable(key):
+        return key
+    kind, header = parse_key(key)
+
+    def client_ip(scope: dict) -> str:
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    if kind == "ip":
+        return client_ip
+    if kind == "forwarded":
+        header = "x-forwarded-for"
+    name = header.encode("latin-1")
+
+    def from_header(scope: dict) -> str:
+        for field, value in scope["headers"]:
+            if field == name:
+                value = value.decode("latin-1")
+                return value.split(",", 1)[0].strip() if kind == "forwarded" else value
+        return client_ip(scope)
+
+    return from_header
+
+
+class _Route:
+    __slots__ = ("prefix", "limiter", "key_of", "limit_header", "checks")
+
+    def __init__(self, rule: Rule, limiter: GeneralRateLimiter_with_Lock):
+        self.prefix = f"{rule.name}:"
+        self.limiter = limiter
+        self.key_of = asgi_key(rule.key)
+        self.limit_header = (b"x-ratelimit-limit", str(rule.max_requests).encode("latin-1"))
+        self.checks = 0
+
+
+class ASGIMiddleware:
+    """
+    ASGI middleware limiting the HTTP requests per rule and client, e.g. around a FastAPI or Starlette app.
+
+    Every rule gets its own `GeneralRateLimiter_with_Lock` over the shared `storage`, the rule of a request
+    is looked up in a `RouteTable` built once. The requests over the limit get a 429 response with
+    Retry-After without reaching the app, the others get X-RateLimit-Limit, X-RateLimit-Remaining and
+    X-RateLimit-Reset headers (with `headers=True`). Requests without a rule, and other scopes (websocket,
+    lifespan), are passed through.
+
+    Attributes:
+    app (Callable): The wrapped ASGI application.
+    routes (RouteTable): The rules of the requests.
+    """
+
+    def __init__(
+            self, app: Callable, storage: Storage, rules: Iterable[Rule],
+            headers: bool = True, cleanup_interval: int = 1000, **options: Any
+    ):
+        """
+        Args:
+        app (Callable): The ASGI application.
+        storage (Storage): The storage of the counters of every rule.
+        rules (Iterable[Rule]): The rules, in order of priority, see `RouteTable`.
+        headers (bool, optional): Add the X-RateLimit-* headers to the allowed responses. Defaults to True.
+        cleanup_interval (int, optional): The number of checks of a rule between two cleanups of its rate limiter.
+            Defaults to 1000.
+        options: Passed to every `GeneralRateLimiter_with_Lock`, e.g. `max_capacity`, `clock` or `metrics`.
+            `cleanup_threshold` is raised to the longest time window of the rules.
+        """
+        self.app = app
+        self.headers = headers
+        self.cleanup_interval = cleanup_interval
+        rules = list(rules)
+        # The rules share the storage, a cleanup must not drop the keys of a rule with a longer window
+        options["cleanup_threshold"] = max([options.get("cleanup_threshold", 10)] + [r.time_window for r in rules])
+        self.routes = RouteTable(
+            (rule, _Route(rule, GeneralRateLimiter_with_Lock(storage, rule.max_requests, rule.time_window, **options)))
+            for rule in rules
+        )
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route = self.routes.match(scope["method"], scope["path"])
+        if route is None:
+            return await self.app(scope, receive, send)
+
+        allowed, remaining, reset_after = await route.limiter.check_limit_state(route.prefix + route.key_of(scope))
+        route.checks += 1
+        if route.checks >= self.cleanup_interval:
+            route.checks = 0
+            await route.limiter.cleanup()
+        reset = str(math.ceil(reset_after)).encode("latin-1")
+
+        if not allowed:
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(BODY)).encode("latin-1")),
+                    (b"retry-after", reset),
+                    route.limit_header,
+                    (b"x-ratelimit-remaining", b"0"),
+                    (b"x-ratelimit-reset", reset),
+                ],
+            })
+            await send({"type": "http.response.body", "body": BODY})
+            return None
+        if not self.headers:
+            return await self.app(scope, receive, send)
+
+        extra = (
+            route.limit_header,
+            (b"x-ratelimit-remaining", str(remaining).encode("latin-1")),
+            (b"x-ratelimit-reset", reset),
+        )
+
+        async def send_with_headers(message: dict):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", ()), *extra]}
+            await send(message)
+
+        return await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,119 @@
+from typing import Any, Callable, Iterable, Optional, Union
+
+KEY_KINDS = ("ip", "forwarded", "header")
+
+
+class Rule:
+    """
+    A rate limit on the requests of a route, shared by the ASGI and WSGI middlewares.
+
+    Attributes:
+    path (str): The path of the requests, e.g. "/login", or a prefix ending with "*", e.g. "/api/*".
+        "*" matches every path.
+    max_requests (int): The maximum number of requests of a client within the time window.
+    time_window (float): The time window in seconds.
+    methods (frozenset[str] | None): The HTTP methods limited by this rule, None for every method.
+    key (str | Callable): What identifies a client:
+        "ip" the address of the client,
+        "forwarded" the first address of the X-Forwarded-For header, else the address of the client,
+        "header:<name>" the value of the header, else the address of the client,
+        or a callable of the ASGI scope (WSGI environ) returning the key.
+    name (str): Prepended to the keys in the storage, the rules sharing a name share their counters.
+        Defaults to the methods and the path.
+    """
+    __slots__ = ("path", "max_requests", "time_window", "methods", "key", "name")
+
+    def __init__(
+            self, path: str, max_requests: int, time_window: float = 1,
+            methods: Optional[Iterable[str]] = None, key: Union[str, Callable] = "ip", name: Optional[str] = None
+    ):
+        if path != "*" and not path.startswith("/"):
+            raise ValueError(f"Invalid path: {path}")
+        if max_requests < 0:
+            raise ValueError(f"Invalid max_requests: {max_requests}")
+        if not callable(key):
+            parse_key(key)
+        self.path = path
+        self.max_requests = max_requests
+        self.time_window = time_window
+        self.methods = None if methods is None else frozenset(method.upper() for method in methods)
+        self.key = key
+        if name is None:
+            name = path if self.methods is None else f"{','.join(sorted(self.methods))} {path}"
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"Rule({self.name!r}, max_requests={self.max_requests}, time_window={self.time_window})"
+
+
+def parse_key(spec: str) -> tuple[str, Optional[str]]:
+    """
+    Splits a key spec of `Rule` into its kind and, for "header:<name>", the lowercase name of the header.
+
+    Raises:
+    ValueError: If the spec is not one of `KEY_KINDS`.
+    """
+    kind, _, header = spec.partition(":")
+    if kind not in KEY_KINDS or (kind == "header") != bool(header):
+        raise ValueError(f"Invalid key: {spec!r}, expect 'ip', 'forwarded' or 'header:<name>'")
+    return kind, header.lower() if header else None
+
+
+class RouteTable:
+    """
+    The rule of every request, resolved from a table built once from the rules.
+
+    A request gets the first rule of its exact path matching its method, else the first of the longest
+    matching prefix, else None. Prefix matches are remembered, up to `cache_size` paths.
+    """
+    __slots__ = ("__exact", "__prefixes", "__cache", "__cache_size")
+
+    def __init__(self, routes: Iterable[tuple[Rule, Any]], cache_size: int = 4096):
+        """
+        Args:
+        routes (Iterable[tuple[Rule, Any]]): The rules, in order of priority, with the value `match` returns.
+        cache_size (int, optional): The number of paths whose prefix match is remembered. Defaults to 4096.
+        """
+        self.__exact: dict[str, list] = {}
+        prefixes: dict[str, list] = {}
+        for rule, value in routes:
+            if rule.path.endswith("*"):
+                prefixes.setdefault(rule.path[:-1], []).append((rule.methods, value))
+            else:
+                self.__exact.setdefault(rule.path, []).append((rule.methods, value))
+        # The longest prefix first
+        self.__prefixes = sorted(prefixes.items(), key=lambda item: len(item[0]), reverse=True)
+        self.__cache: dict[tuple, Any] = {}
+        self.__cache_size = cache_size
+
+    @staticmethod
+    def __first(candidates: list, method: str):
+        for methods, value in candidates:
+            if methods is None or method in methods:
+                return value
+        return None
+
+    def match(self, method: str, path: str) -> Any:
+        """
+        Returns the value of the rule of the request, None if no rule applies.
+        """
+        candidates = self.__exact.get(path)
+        if candidates is not None:
+            value = self.__first(candidates, method)
+            if value is not None:
+                return value
+        cache_key = (method, path)
+        try:
+            return self.__cache[cache_key]
+        except KeyError:
+            pass
+        value = None
+        for prefix, candidates in self.__prefixes:
+            if path.startswith(prefix):
+                value = self.__first(candidates, method)
+                if value is not None:
+                    break
+        if len(self.__cache) >= self.__cache_size:
+            self.__cache.clear()
+        self.__cache[cache_key] = value
+        return value
@@ -0,0 +1,141 @@
+import itertools
+import math
+import threading
+from typing import Any, Callable, Iterable
+from .rules import Rule, RouteTable, parse_key
+from ..main import GeneralRateLimiter
+from ..storage import Storage
+
+BODY = b"Rate limit exceeded."
+# Headers without the HTTP_ prefix in the WSGI environ
+_CGI_HEADERS = ("content-type", "content-length")
+
+
+def wsgi_key(key) -> Callable[[dict], str]:
+    """
+    Compiles the key of a `Rule` into a function of the WSGI environ.
+    """
+    if callable(key):
+        return key
+    kind, header = parse_key(key)
+
+    def client_ip(environ: dict) -> str:
+        return environ.get("REMOTE_ADDR") or "unknown"
+
+    if kind == "ip":
+        return client_ip
+    if kind == "forwarded":
+        header = "x-forwarded-for"
+    name = header.upper().replace("-", "_")
+    if header not in _CGI_HEADERS:
+        name = f"HTTP_{name}"
+
+    def from_header(environ: dict) -> str:
+        value = environ.get(name)
+        if not value:
+            return client_ip(environ)
+        return value.split(",", 1)[0].strip() if kind == "forwarded" else value
+
+    return from_header
+
+
+class _Route:
+    __slots__ = ("prefix", "limiter", "key_of", "limit_header", "checks")
+
+    def __init__(self, rule: Rule, limiter: GeneralRateLimiter):
+        self.prefix = f"{rule.name}:"
+        self.limiter = limiter
+        self.key_of = wsgi_key(rule.key)
+        self.limit_header = ("X-RateLimit-Limit", str(rule.max_requests))
+        # `next` on a count is atomic, the threads never lose a check
+        self.checks = itertools.count(1)
+
+
+class WSGIMiddleware:
+    """
+    WSGI middleware limiting the HTTP requests per rule and client, e.g. around a Flask or Django app
+    served by threads (gunicorn --threads, waitress, mod_wsgi).
+
+    The counterpart of `ASGIMiddleware` with the same `Rule` and `RouteTable`, every rule gets its own
+    `GeneralRateLimiter` over the shared `storage`. The requests over the limit get a 429 response with
+    Retry-After without calling the app, the others get X-RateLimit-Limit, X-RateLimit-Remaining and
+    X-RateLimit-Reset headers (with `headers=True`). Requests without a rule are passed through.
+
+    Notes:
+    The checks of a key hold one of `stripes` locks, picked by the hash of the key: the threads checking
+    the same key take turns, the others run in parallel, e.g. over a `RedisStorage`. A cleanup runs in the
+    thread reaching `cleanup_interval`, unless another thread is already running one.
+
+    Attributes:
+    app (Callable): The wrapped WSGI application.
+    routes (RouteTable): The rules of the requests.
+    """
+
+    def __init__(
+            self, app: Callable, storage: Storage, rules: Iterable[Rule],
+            headers: bool = True, cleanup_interval: int = 1000, stripes: int = 64, **options: Any
+    ):
+        """
+        Args:
+        app (Callable): The WSGI application.
+        storage (Storage): The storage of the counters of every rule.
+        rules (Iterable[Rule]): The rules, in order of priority, see `RouteTable`.
+        headers (bool, optional): Add the X-RateLimit-* headers to the allowed responses. Defaults to True.
+        cleanup_interval (int, optional): The number of checks of a rule between two cleanups of its rate limiter.
+            Defaults to 1000.
+        stripes (int, optional): The number of locks the keys are spread over. Defaults to 64.
+        options: Passed to every `GeneralRateLimiter`, e.g. `max_capacity`, `clock` or `metrics`.
+            `cleanup_threshold` is raised to the longest time window of the rules.
+        """
+        if stripes < 1:
+            raise ValueError(f"Invalid stripes: {stripes}")
+        self.app = app
+        self.headers = headers
+        self.cleanup_interval = cleanup_interval
+        self.__locks = [threading.Lock() for _ in range(stripes)]
+        self.__cleanup_lock = threading.Lock()
+        rules = list(rules)
+        # The rules share the storage, a cleanup must not drop the keys of a rule with a longer window
+        options["cleanup_threshold"] = max([options.get("cleanup_threshold", 10)] + [r.time_window for r in rules])
+        self.routes = RouteTable(
+            (rule, _Route(rule, GeneralRateLimiter(storage, rule.max_requests, rule.time_window, **options)))
+            for rule in rules
+        )
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        route = self.routes.match(environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO") or "/")
+        if route is None:
+            return self.app(environ, start_response)
+
+        key = route.prefix + route.key_of(environ)
+        locks = self.__locks
+        with locks[hash(key) % len(locks)]:
+            allowed, remaining, reset_after = route.limiter.check_limit_state(key)
+        if next(route.checks) % self.cleanup_interval == 0:
+            # The cleanups of every rule go over the same storage, one at a time
+            if self.__cleanup_lock.acquire(blocking=False):
+                try:
+                    route.limiter.cleanup()
+                finally:
+                    self.__cleanup_lock.release()
+        reset = str(math.ceil(reset_after))
+
+        if not allowed:
+            start_response("429 Too Many Requests", [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(BODY))),
+                ("Retry-After", reset),
+                route.limit_header,
+                ("X-RateLimit-Remaining", "0"),
+                ("X-RateLimit-Reset", reset),
+            ])
+            return [BODY]
+        if not self.headers:
+            return self.app(environ, start_response)
+
+        extra = [route.limit_header, ("X-RateLimit-Remaining", str(remaining)), ("X-RateLimit-Reset", reset)]
+
+        def start_response_with_headers(status: str, response_headers: list, exc_info=None):
+            return start_response(status, response_headers + extra, exc_info)
+
+        return self.app(environ, start_response_with_headers)
@@ -0,0 +1,213 @@
+"""
+A small server sharing one Storage with many processes, see `pygrl.storage.RemoteStorage`.
+
+Usage:
+------
+python -m pygrl.server --unix /tmp/pygrl.sock
+python -m pygrl.server --host 127.0.0.1 --port 6380 --storage sqlite3 --path storage.db
+"""
+import argparse
+import asyncio
+import os
+import socket
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Union
+from .storage import Storage, BasicStorage, SQLite3_Storage, MmapStorage
+from .storage.remote_storage import (
+    FRAME, VALUE, WINDOW, SCAN,
+    OP_GET, OP_SET, OP_DROP, OP_CLEAR, OP_KEYS, OP_CHECK, OP_SCAN,
+    STATUS_OK, STATUS_VALUE, STATUS_NOT_FOUND, STATUS_KEYS, STATUS_ERROR, STATUS_ITEMS,
+    encode_frame, encode_keys, encode_items,
+)
+
+# The cursors of the unfinished scans kept by the server, the oldest is forgotten first
+MAX_CURSORS = 1024
+
+
+class StorageServer:
+    """
+    Serves a Storage over a Unix domain socket or TCP.
+
+    Requests of all connections are executed one at a time on the event loop,
+    the storage therefore does not need to be thread-safe or process-safe.
+
+    Notes:
+    ------
+    - Responses are written without waiting for the next request, clients may pipeline requests.
+    - The cursors of `Storage.scan` stay on the server, clients get an id. Up to `MAX_CURSORS` unfinished
+      scans are kept.
+    """
+    def __init__(self, storage: Storage, address: Union[str, tuple]):
+        self.storage = storage
+        self.address = address
+        self.__cursors: OrderedDict[int, Any] = OrderedDict()
+        self.__cursor_ids = itertools.count(1)
+        self.__server: Optional[asyncio.AbstractServer] = None
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+
+    def dispatch(self, op: int, payload: bytes) -> bytes:
+        """
+        Executes one request and returns the encoded response.
+        """
+        try:
+            if op == OP_GET:
+                item = self.storage.get(payload.decode("utf-8"))
+                if item is None:
+                    return encode_frame(STATUS_NOT_FOUND)
+                return encode_frame(STATUS_VALUE, VALUE.pack(item["start_time"], item["num_requests"]))
+            if op == OP_CHECK:
+                current_time, time_window, amount, limit = WINDOW.unpack_from(payload)
+                key = payload[WINDOW.size:].decode("utf-8")
+                if limit < 0:
+                    item = self.storage.check_and_increment(key, current_time, time_window, amount)
+                else:
+                    item = self.storage.check_and_increment(key, current_time, time_window, amount, limit)
+                return encode_frame(STATUS_VALUE, VALUE.pack(item["start_time"], item["num_requests"]))
+            if op == OP_SET:
+                start_time, num_requests = VALUE.unpack_from(payload)
+                self.storage.set(
+                    payload[VALUE.size:].decode("utf-8"),
+                    {"start_time": start_time, "num_requests": num_requests}
+                )
+                return encode_frame(STATUS_OK)
+            if op == OP_DROP:
+                self.storage.drop(payload.decode("utf-8"))
+                return encode_frame(STATUS_OK)
+            if op == OP_CLEAR:
+                self.storage.clear()
+                return encode_frame(STATUS_OK)
+            if op == OP_KEYS:
+                return encode_frame(STATUS_KEYS, encode_keys([str(key) for key in self.storage.keys()]))
+            if op == OP_SCAN:
+                return encode_frame(STATUS_ITEMS, self.__scan(payload))
+            return encode_frame(STATUS_ERROR, f"Unknown operation: {op}".encode("utf-8"))
+        except Exception as e:
+            return encode_frame(STATUS_ERROR, f"{type(e).__name__}: {e}".encode("utf-8"))
+
+    def __scan(self, payload: bytes) -> bytes:
+        cursor_id, count = SCAN.unpack_from(payload)
+        prefix = payload[SCAN.size:].decode("utf-8") or None
+        cursor = None
+        if cursor_id:
+            cursor = self.__cursors.pop(cursor_id, None)
+            if cursor is None:
+                raise KeyError(f"Unknown or expired scan cursor: {cursor_id}")
+        cursor, items = self.storage.scan(cursor, count, prefix)
+        if cursor is None:
+            return encode_items(0, items)
+        cursor_id = next(self.__cursor_ids)
+        self.__cursors[cursor_id] = cursor
+        if len(self.__cursors) > MAX_CURSORS:
+            self.__cursors.popitem(last=False)
+        return encode_items(cursor_id, items)
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                op, length = FRAME.unpack(await reader.readexactly(FRAME.size))
+                payload = await reader.readexactly(length) if length else b""
+                writer.write(self.dispatch(op, payload))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Client went away, or the server is shutting down
+            pass
+        finally:
+            writer.close()
+
+    async def start_serving(self):
+        """
+        Binds the address and starts accepting connections on the running event loop.
+        """
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                os.remove(self.address)  # Stale socket left by a previous run
+            self.__server = await asyncio.start_unix_server(self.__handle, path=self.address)
+        else:
+            host, port = self.address
+            self.__server = await asyncio.start_server(self.__handle, host=host, port=port)
+            for sock in self.__server.sockets:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Report the actual port when binding port 0
+            self.address = self.__server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self.start_serving()
+        async with self.__server:
+            await self.__server.serve_forever()
+
+    def start(self):
+        """
+        Serves from a background daemon thread, returns once the address is bound.
+        """
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            self.__loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.__loop)
+            try:
+                self.__loop.run_until_complete(self.start_serving())
+            except BaseException as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self.__loop.run_forever()
+            self.__server.close()
+            # Cancel the handlers of the connections still open
+            pending = asyncio.all_tasks(self.__loop)
+            for task in pending:
+                task.cancel()
+            self.__loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.__loop.run_until_complete(self.__server.wait_closed())
+            self.__loop.close()
+
+        self.__thread = threading.Thread(target=run, name="pygrl-server", daemon=True)
+        self.__thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+
+    def stop(self):
+        """
+        Stops the background thread started by `start()`.
+        """
+        if self.__thread is None:
+            return None
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__thread = None
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(prog="python -m pygrl.server", description="Share one pygrl Storage.")
+    parser.add_argument("--unix", help="Path of the Unix domain socket to listen on.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on when --unix is not given.")
+    parser.add_argument("--port", type=int, default=6380, help="Port to listen on when --unix is not given.")
+    parser.add_argument("--storage", choices=["basic", "sqlite3", "mmap"], default="basic")
+    parser.add_argument("--path", help="Path of the database/file for the sqlite3 and mmap storages.")
+    args = parser.parse_args(argv)
+
+    if args.storage == "basic":
+        storage = BasicStorage()
+    elif args.path is None:
+        parser.error(f"--path is required by the {args.storage} storage")
+    elif args.storage == "sqlite3":
+        storage = SQLite3_Storage(args.path)
+    else:
+        storage = MmapStorage(args.path)
+
+    server = StorageServer(storage, args.unix or (args.host, args.port))
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import asyncio
+import csv
+import inspect
+import random
+from bisect import bisect
+from itertools import accumulate
+from typing import Any, Iterable, Iterator, Optional
+from .clock import ManualClock
+from .main import GeneralRateLimiter
+from .storage import Storage, StorageWrapper
+
+
+def synthetic_trace(
+        num_keys: int, rate: float, duration: float, skew: float = 0.0, start: float = 0.0, seed: int = 0
+) -> Iterator[tuple[float, str]]:
+    """
+    Generates Poisson arrivals of `rate` requests per second over `duration` seconds.
+
+    Args:
+    num_keys (int): The number of distinct keys, named "key-0", "key-1", ...
+    rate (float): The mean number of requests per second, over all keys.
+    duration (float): The length of the trace in seconds.
+    skew (float, optional): The exponent of the Zipf distribution of the keys, 0 is uniform. Defaults to 0.0.
+    start (float, optional): The time of the beginning of the trace. Defaults to 0.0.
+    seed (int, optional): The seed of the generator, the same seed yields the same trace. Defaults to 0.
+
+    Yields:
+    tuple[float, str]: The (time, key) of every request, in time order.
+    """
+    if num_keys <= 0 or rate <= 0:
+        raise ValueError(f"Invalid trace: num_keys={num_keys}, rate={rate}")
+    rng = random.Random(seed)
+    weights = None
+    if skew:
+        weights = list(accumulate(1 / rank ** skew for rank in range(1, num_keys + 1)))
+    end = start + duration
+    current_time = start + rng.expovariate(rate)
+    while current_time < end:
+        if weights is None:
+            index = rng.randrange(num_keys)
+        else:
+            index = min(bisect(weights, rng.random() * weights[-1]), num_keys - 1)
+        yield current_time, f"key-{index}"
+        current_time += rng.expovariate(rate)
+
+
+def read_trace(path: str) -> Iterator[tuple[float, str]]:
+    """
+    Reads a recorded trace, one "time,key" row per request, in time order.
+    """
+    with open(path, newline="") as file:
+        for row in csv.reader(file):
+            if row:
+                yield float(row[0]), row[1]
+
+
+def write_trace(path: str, trace: Iterable[tuple[float, Any]]) -> int:
+    """
+    Writes a trace in the format of `read_trace`, returns the number of requests written.
+    """
+    count = 0
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        for current_time, key in trace:
+            writer.writerow((repr(float(current_time)), key))
+            count += 1
+    return count
+
+
+class _CountingStorage(StorageWrapper):
+    """
+    Forwards every call to `storage`, counting the work done by the rate limiter.
+    """
+
+    def __init__(self, storage: Storage):
+        super().__init__(storage)
+        self.counts = dict.fromkeys(("check_and_increment", "keys", "scanned", "get", "drop"), 0)
+
+    def get(self, key: str):
+        self.counts["get"] += 1
+        return super().get(key)
+
+    def drop(self, key: str):
+        self.counts["drop"] += 1
+        super().drop(key)
+
+    def keys(self) -> list:
+        keys = super().keys()
+        self.counts["keys"] += 1
+        self.counts["scanned"] += len(keys)
+        return keys
+
+    def get_many(self, keys: list) -> list:
+        self.counts["get"] += len(keys)
+        return super().get_many(keys)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        self.counts["check_and_increment"] += 1
+        return super().check_and_increment(key, current_time, time_window, amount, limit)
+
+
+class Simulation:
+    """
+    Replays a trace of requests against a rate limiter driven by a `ManualClock`, no wall time is spent waiting.
+
+    Every decision is compared with a reference fixed-window model of the same limits,
+    a storage or rate limiter deviating from it shows up as `mismatches`.
+
+    Attributes:
+    storage (Storage): The storage under test.
+    clock (ManualClock): The clock of the rate limiter, moved to the time of every request.
+    limiter (GeneralRateLimiter | GeneralRateLimiter_with_Lock): The rate limiter under test.
+
+    Example:
+    --------
+    simulation = Simulation(BasicStorage(), max_requests=10, time_window=60, max_capacity=100_000)
+    report = simulation.run(synthetic_trace(num_keys=1_000_000, rate=50_000, duration=600, skew=1.1))
+
+    Notes:
+    ------
+    - The times of the trace must not go backwards.
+    - `LeasedStorage` and other approximate storages are expected to mismatch, the report measures by how much.
+    """
+
+    def __init__(
+            self, storage: Storage,
+            max_requests: int, time_window: float = 1,
+            max_capacity: int = 32, cleanup_threshold: float = 10,
+            limiter_class: type = GeneralRateLimiter, start: float = 0.0
+    ):
+        """
+        Initializes a new simulation, the arguments are passed to `limiter_class`.
+
+        Args:
+        storage (Storage): The storage under test.
+        max_requests (int): The maximum number of requests per window.
+        time_window (float, optional): The length of a window in seconds. Defaults to 1.
+        max_capacity (int, optional): The number of keys above which the rate limiter cleans up. Defaults to 32.
+        cleanup_threshold (float, optional): The idle time after which a key is cleaned up. Defaults to 10.
+        limiter_class (type, optional): `GeneralRateLimiter`, `GeneralRateLimiter_with_Lock` or a class
+            with the same constructor. Defaults to GeneralRateLimiter.
+        start (float, optional): The initial time of the clock. Defaults to 0.0.
+        """
+        self.storage = storage
+        self.clock = ManualClock(start)
+        self.__counting = _CountingStorage(storage)
+        self.limiter = limiter_class(
+            self.__counting, max_requests, time_window, max_capacity, cleanup_threshold, clock=self.clock
+        )
+        self.__max_requests = max_requests
+        self.__time_window = time_window
+        # key -> [start_time, num_requests] of the reference model
+        self.__reference: dict[str, list] = {}
+
+    def run(
+            self, trace: Iterable[tuple[float, Any]], cleanup: bool = True,
+            sample_interval: float = 1.0, reference: bool = True
+    ) -> dict:
+        """
+        Replays `trace`, continuing from the state left by the previous runs.
+
+        Args:
+        trace (Iterable[tuple[float, Any]]): The (time, key) of every request, in time order.
+        cleanup (bool, optional): If True, calls the rate limiter (`__call__`, with cleanup),
+            otherwise only `check_limit`. Defaults to True.
+        sample_interval (float, optional): The simulated seconds between two samples. Defaults to 1.0.
+        reference (bool, optional): If True, compares every decision with the reference model. Defaults to True.
+
+        Returns:
+        dict: {
+            "requests", "admitted", "denied", "mismatches": The totals of the run,
+            "samples": [{"time", "keys", "admitted", "denied"}, ...] The state size and cumulative decisions,
+            "storage": {"check_and_increment", "keys", "scanned", "get", "drop"} The storage calls of the run,
+        }
+        """
+        if sample_interval <= 0:
+            raise ValueError(f"Invalid sample interval: {sample_interval}")
+        for name in self.__counting.counts:
+            self.__counting.counts[name] = 0
+        report = {"requests": 0, "admitted": 0, "denied": 0, "mismatches": 0, "samples": []}
+        decide = self.limiter if cleanup else self.limiter.check_limit
+        if inspect.iscoroutinefunction(decide) or inspect.iscoroutinefunction(getattr(decide, "__call__", None)):
+            asyncio.run(self.__run_async(decide, trace, sample_interval, reference, report))
+        else:
+            self.__run_sync(decide, trace, sample_interval, reference, report)
+        self.__sample(report)
+        report["storage"] = dict(self.__counting.counts)
+        return report
+
+    def __run_sync(self, decide, trace, sample_interval: float, reference: bool, report: dict):
+        next_sample = self.clock() + sample_interval
+        for current_time, key in trace:
+            while current_time >= next_sample:
+                self.__sample(report, next_sample)
+                next_sample += sample_interval
+            self.clock.set(current_time)
+            self.__record(report, key, decide(key), reference)
+
+    async def __run_async(self, decide, trace, sample_interval: float, reference: bool, report: dict):
+        next_sample = self.clock() + sample_interval
+        for current_time, key in trace:
+            while current_time >= next_sample:
+                self.__sample(report, next_sample)
+                next_sample += sample_interval
+            self.clock.set(current_time)
+            self.__record(report, key, await decide(key), reference)
+
+    def __record(self, report: dict, key: Any, allowed: bool, reference: bool):
+        report["requests"] += 1
+        report["admitted" if allowed else "denied"] += 1
+        if reference and allowed != self.__expect(key if type(key) is str else str(key)):
+            report["mismatches"] += 1
+
+    def __expect(self, key: str) -> bool:
+        current_time = self.clock()
+        item = self.__reference.get(key)
+        if item is None or current_time - item[0] > self.__time_window:
+            self.__reference[key] = [current_time, 1]
+            return 1 <= self.__max_requests
+        item[1] += 1
+        return item[1] <= self.__max_requests
+
+    def __sample(self, report: dict, current_time: float = None):
+        report["samples"].append({
+            "time": self.clock() if current_time is None else current_time,
+            "keys": len(self.storage.keys()),
+            "admitted": report["admitted"],
+            "denied": report["denied"],
+        })
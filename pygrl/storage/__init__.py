@@ -30,9 +30,23 @@ __copyright__ = "Copyright (c) 2024 Jonah Whaler"
 from .storage import Storage
 from .basic_storage import BasicStorage
 from .sqlite3_storage import SQLite3_Storage
+from .shared_memory_storage import SharedMemoryStorage
+from .mmap_storage import MmapStorage
+from .remote_storage import RemoteStorage
+from .redis_storage import RedisStorage
+from .leased_storage import LeasedStorage
+from .sharded_storage import ShardedStorage
+from .wrapper import StorageWrapper
 
 __all__ = [
     "Storage",
     "BasicStorage",
     "SQLite3_Storage",
+    "SharedMemoryStorage",
+    "MmapStorage",
+    "RemoteStorage",
+    "RedisStorage",
+    "LeasedStorage",
+    "ShardedStorage",
+    "StorageWrapper",
 ]
@@ -1,7 +1,18 @@
+import os
+import struct
+import threading
 from collections import defaultdict
-from typing import Any
+from time import monotonic, time
+from typing import Any, Callable, Optional
 from .storage import Storage
 
+SNAPSHOT_MAGIC = b"PYGRLSNP"
+SNAPSHOT_VERSION = 1
+# magic, version, number of records, epoch of the clock (wall time when the clock read 0)
+SNAPSHOT_HEADER = struct.Struct("<8sIId")
+# start_time, num_requests, key_len, followed by the key
+SNAPSHOT_RECORD = struct.Struct("<dqH")
+
 
 class BasicStorage(Storage):
     """
@@ -9,12 +20,19 @@ class BasicStorage(Storage):
     
     Notes:
     Expect the keys to be string, or at least convertible to strings.
+    `snapshot()` / `restore()` save and load the state in a compact binary file, e.g. across a restart.
+    The snapshot records the epoch of the clock of the rate limiter, the start times are moved to the clock
+    of the restoring process, e.g. the monotonic clock of another boot.
     """
 
     def __init__(self):
         # print("BasicStorage init")
         f: float | None = None
         self.__memory = defaultdict(lambda: {"start_time": f, "num_requests": 0})
+        self.__snapshot_path: Optional[str] = None
+        self.__snapshot_clock: Optional[Callable[[], float]] = None
+        self.__snapshot_thread: Optional[threading.Thread] = None
+        self.__snapshot_stop = threading.Event()
 
     def get(self, key: str):
         # Force the type of the key to string
@@ -39,3 +57,148 @@ class BasicStorage(Storage):
 
     def keys(self) -> list[str]:
         return list(self.__memory.keys())
+
+    def scan(self, cursor: Optional[tuple] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        """
+        Returns one page of at most `count` key-value pairs, in insertion order, see `Storage.scan`.
+
+        The first page takes a snapshot of the keys, the cursor is (snapshot, position):
+        the keys are copied once per scan, every page only reads the keys after the position.
+
+        Args:
+        cursor (tuple, optional): None for the first page, then the cursor returned with the previous page.
+        count (int, optional): The maximum number of pairs per page. Defaults to 100.
+        prefix (str, optional): Only returns the keys starting with `prefix`. Defaults to None.
+
+        Returns:
+        tuple: The cursor of the next page, None after the last page, and the [(key, value), ...] of this page.
+        """
+        if count <= 0:
+            raise ValueError(f"Invalid count: {count}")
+        # `list` copies the keys in one step, other threads may keep updating the storage meanwhile
+        keys, position = cursor if cursor is not None else (list(self.__memory), 0)
+        memory = self.__memory
+        end = len(keys)
+        items = []
+        while position < end and len(items) < count:
+            key = keys[position]
+            position += 1
+            if prefix is not None and not key.startswith(prefix):
+                continue
+            value = memory.get(key)
+            # Skips the keys dropped since the snapshot
+            if value is not None:
+                items.append((key, value))
+        return ((keys, position) if position < end else None), items
+
+    def snapshot(self, path: str, clock: Optional[Callable[[], float]] = None):
+        """
+        Writes every key-value pair to `path` in a compact binary format.
+
+        The file is written next to `path` first and then renamed, a crash never leaves a partial snapshot behind.
+
+        Args:
+        path (str): The path to the snapshot file.
+        clock (Callable, optional): The clock of the rate limiter, its start times are saved with the epoch
+            of the clock. Defaults to the monotonic clock, the default of the rate limiters with this storage.
+        """
+        epoch = time() - (monotonic if clock is None else clock)()
+        chunks = []
+        # `list` copies the items in one step, other threads may keep updating the storage meanwhile
+        for key, value in list(self.__memory.items()):
+            start_time = value.get("start_time")
+            if start_time is None:
+                continue
+            encoded = key.encode("utf-8")
+            chunks.append(SNAPSHOT_RECORD.pack(start_time, value.get("num_requests"), len(encoded)))
+            chunks.append(encoded)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(chunks) // 2, epoch))
+            f.write(b"".join(chunks))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+
+    def restore(
+            self, path: str, max_age: Optional[float] = None, current_time: Optional[float] = None,
+            clock: Optional[Callable[[], float]] = None
+    ) -> int:
+        """
+        Loads the key-value pairs written by `snapshot()`, on top of the current ones.
+
+        The start times are moved from the clock of the snapshot to `clock`, by the difference of their epochs.
+
+        Args:
+        path (str): The path to the snapshot file.
+        max_age (float, optional): If given, skips the pairs started more than `max_age` seconds ago,
+            e.g. the time window of the rate limiter. Defaults to None.
+        current_time (float, optional): The time to compare `start_time` with, read from `clock`.
+            Defaults to `clock()`.
+        clock (Callable, optional): The clock of the rate limiter. Defaults to the monotonic clock,
+            the default of the rate limiters with this storage.
+
+        Returns:
+        int: The number of pairs loaded.
+        """
+        if clock is None:
+            clock = monotonic
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, count, epoch = SNAPSHOT_HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError(f"Not a pygrl snapshot: {path}")
+        shift = epoch - (time() - clock())
+        offset = SNAPSHOT_HEADER.size
+        if current_time is None:
+            current_time = clock()
+        loaded = 0
+        for _ in range(count):
+            start_time, num_requests, key_len = SNAPSHOT_RECORD.unpack_from(data, offset)
+            offset += SNAPSHOT_RECORD.size
+            key = data[offset:offset + key_len].decode("utf-8")
+            offset += key_len
+            start_time += shift
+            if max_age is not None and current_time - start_time > max_age:
+                continue
+            self.__memory[key] = {"start_time": start_time, "num_requests": num_requests}
+            loaded += 1
+        return loaded
+
+    def start_snapshots(self, path: str, interval: float = 60, clock: Optional[Callable[[], float]] = None):
+        """
+        Writes a snapshot to `path` every `interval` seconds from a background daemon thread.
+
+        Args:
+        path (str): The path to the snapshot file.
+        interval (float, optional): The number of seconds between two snapshots. Defaults to 60.
+        clock (Callable, optional): The clock of the rate limiter, see `snapshot()`.
+        """
+        if interval <= 0:
+            raise ValueError(f"Invalid interval: {interval}")
+        self.stop_snapshots(final=False)
+        self.__snapshot_stop.clear()
+
+        def run():
+            while not self.__snapshot_stop.wait(interval):
+                self.snapshot(path, clock)
+
+        self.__snapshot_path = path
+        self.__snapshot_clock = clock
+        self.__snapshot_thread = threading.Thread(target=run, name="pygrl-snapshot", daemon=True)
+        self.__snapshot_thread.start()
+
+    def stop_snapshots(self, final: bool = True):
+        """
+        Stops the background snapshots started by `start_snapshots()`.
+
+        Args:
+        final (bool, optional): If True, writes one last snapshot. Defaults to True.
+        """
+        if self.__snapshot_thread is None:
+            return None
+        self.__snapshot_stop.set()
+        self.__snapshot_thread.join()
+        self.__snapshot_thread = None
+        if final:
+            self.snapshot(self.__snapshot_path, self.__snapshot_clock)
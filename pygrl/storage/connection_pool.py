@@ -0,0 +1,72 @@
+import queue
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, Union
+
+
+def open_socket(address: Union[str, tuple], timeout: Optional[float]) -> socket.socket:
+    """
+    Connects to a Unix domain socket when `address` is a path, otherwise to the (host, port) over TCP.
+    """
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most `size` connections created on demand by `connect`.
+
+    A connection is expected to expose `close()`.
+    """
+    def __init__(self, connect: Callable, size: int = 8):
+        if size <= 0:
+            raise ValueError(f"Invalid pool size: {size}")
+        self.size = size
+        self.__connect = connect
+        self.__idle = queue.LifoQueue()
+        self.__slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection, blocking while `size` connections are in use.
+
+        The connection is discarded instead of returned to the pool when the block raises,
+        as the state of its stream is then unknown.
+        """
+        self.__slots.acquire()
+        try:
+            try:
+                connection = self.__idle.get_nowait()
+            except queue.Empty:
+                connection = self.__connect()
+            try:
+                yield connection
+            except BaseException:
+                connection.close()
+                raise
+            self.__idle.put(connection)
+        finally:
+            self.__slots.release()
+
+    def close(self):
+        """
+        Closes the idle connections.
+        """
+        while True:
+            try:
+                connection = self.__idle.get_nowait()
+            except queue.Empty:
+                return None
+            connection.close()
@@ -0,0 +1,341 @@
+import hashlib
+import struct
+import threading
+import zlib
+from typing import Optional
+from ..custom_exception import StorageFullError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+MAGIC = b"PYGRLFST"
+VERSION = 1
+
+# magic, version, capacity, stripes, key_size
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+
+# state, key_len, crc, key_hash, start_time, num_requests
+SLOT = struct.Struct("<BxHIQdq")
+
+EMPTY = 0
+OCCUPIED = 1
+TOMBSTONE = 2
+
+
+def key_hash(key: bytes) -> int:
+    """
+    Hashes the key into a 64-bit integer.
+
+    Python's `hash()` is salted per process, a stable digest is required so every process
+    sharing the table probes the same slots.
+    """
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def table_size(capacity: int, key_size: int) -> int:
+    """
+    Returns the number of bytes required by a table of `capacity` slots.
+    """
+    return HEADER_SIZE + capacity * (SLOT.size + key_size)
+
+
+class FixedSlotTable:
+    """
+    Open-addressing hash table of fixed-size binary records laid over a writable buffer.
+
+    The buffer starts with a header describing the layout, followed by `capacity` slots.
+    Each slot holds (state, key_len, crc, key_hash, start_time, num_requests, key bytes).
+    The slots are partitioned into `stripes` independent regions, a key is hashed into one
+    region and linearly probed within it, so each region can be guarded by its own lock.
+
+    Notes:
+    ------
+    - Locks are a `threading.Lock` per stripe plus, when `lock_fd` is given, a POSIX
+      byte-range lock (`fcntl.lockf`) per stripe on that file descriptor so that other
+      processes mapping the same buffer are excluded as well.
+    - Every record carries a CRC32 of its payload. A record whose checksum does not match
+      (e.g. torn by a crash in the middle of a write) is treated as absent.
+    - `drop` shifts the following records back instead of leaving a tombstone, the probes do not
+      grow longer as keys are inserted and dropped.
+    """
+
+    def __init__(self, buffer, lock_fd: Optional[int] = None):
+        self.__buffer = buffer
+        self.__lock_fd = lock_fd if fcntl is not None else None
+        magic, version, capacity, stripes, key_size = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Buffer does not contain a pygrl fixed slot table")
+        self.capacity = capacity
+        self.stripes = stripes
+        self.key_size = key_size
+        self.__slot_size = SLOT.size + key_size
+        self.__per_stripe = capacity // stripes
+        self.__thread_locks = [threading.Lock() for _ in range(stripes)]
+
+    @classmethod
+    def format(cls, buffer, capacity: int, stripes: int, key_size: int):
+        """
+        Writes an empty table into `buffer`.
+
+        Args:
+        buffer: A writable buffer of at least `table_size(capacity, key_size)` bytes.
+        capacity (int): The number of slots, must be a multiple of `stripes`.
+        stripes (int): The number of independently locked regions.
+        key_size (int): The maximum length of an encoded key in bytes.
+        """
+        if capacity <= 0 or stripes <= 0 or capacity % stripes:
+            raise ValueError(f"capacity ({capacity}) must be a positive multiple of stripes ({stripes})")
+        if key_size <= 0 or key_size > 0xFFFF:
+            raise ValueError(f"Invalid key size: {key_size}")
+        size = table_size(capacity, key_size)
+        if len(buffer) < size:
+            raise ValueError(f"Buffer of {len(buffer)} bytes cannot hold a table of {size} bytes")
+        buffer[HEADER_SIZE:size] = bytes(size - HEADER_SIZE)
+        HEADER.pack_into(buffer, 0, MAGIC, VERSION, capacity, stripes, key_size)
+
+    @staticmethod
+    def is_formatted(buffer) -> bool:
+        return bytes(buffer[:len(MAGIC)]) == MAGIC
+
+    def __lock(self, stripe: int):
+        return RangeLock(self.__thread_locks[stripe], self.__lock_fd, stripe + 1)
+
+    @staticmethod
+    def __crc(h: int, start_time: float, num_requests: int, encoded: bytes) -> int:
+        return zlib.crc32(encoded, zlib.crc32(struct.pack("<Qdq", h, start_time, num_requests)))
+
+    def __encode(self, key: str) -> bytes:
+        encoded = key.encode("utf-8")
+        if len(encoded) > self.key_size:
+            raise ValueError(f"Key exceeds {self.key_size} bytes: {key}")
+        return encoded
+
+    def __probe(self, h: int):
+        stripe = h % self.stripes
+        return stripe, self.__offsets(stripe, (h // self.stripes) % self.__per_stripe)
+
+    def __offsets(self, stripe: int, start: int):
+        per_stripe = self.__per_stripe
+        base = stripe * per_stripe
+        for i in range(per_stripe):
+            yield HEADER_SIZE + (base + (start + i) % per_stripe) * self.__slot_size
+
+    def __read(self, offset: int):
+        """
+        Returns (state, key_hash, start_time, num_requests, key bytes) of the slot at `offset`,
+        state is reported as TOMBSTONE when the record fails its checksum.
+        """
+        state, key_len, crc, h, start_time, num_requests = SLOT.unpack_from(self.__buffer, offset)
+        if state != OCCUPIED:
+            return state, h, start_time, num_requests, b""
+        key_offset = offset + SLOT.size
+        encoded = bytes(self.__buffer[key_offset:key_offset + key_len])
+        if key_len > self.key_size or crc != self.__crc(h, start_time, num_requests, encoded):
+            return TOMBSTONE, h, start_time, num_requests, b""
+        return state, h, start_time, num_requests, encoded
+
+    def get(self, key: str) -> Optional[dict]:
+        encoded = self.__encode(key)
+        h = key_hash(encoded)
+        stripe, offsets = self.__probe(h)
+        with self.__lock(stripe):
+            for offset in offsets:
+                state, slot_hash, start_time, num_requests, slot_key = self.__read(offset)
+                if state == EMPTY:
+                    return None
+                if state == OCCUPIED and slot_hash == h and slot_key == encoded:
+                    return {"start_time": start_time, "num_requests": num_requests}
+        return None
+
+    def __update(self, offset: int, encoded: bytes, h: int, start_time: float, num_requests: int):
+        crc = self.__crc(h, start_time, num_requests, encoded)
+        SLOT.pack_into(self.__buffer, offset, OCCUPIED, len(encoded), crc, h, start_time, num_requests)
+
+    def __insert(self, target: Optional[int], key: str, encoded: bytes, h: int, start_time: float, num_requests: int):
+        if target is None:
+            raise StorageFullError(f"No free slot left for key: {key}")
+        # Payload first, state last: a crash in between leaves the slot unused.
+        key_offset = target + SLOT.size
+        self.__buffer[key_offset:key_offset + len(encoded)] = encoded
+        crc = self.__crc(h, start_time, num_requests, encoded)
+        SLOT.pack_into(self.__buffer, target, TOMBSTONE, len(encoded), crc, h, start_time, num_requests)
+        self.__buffer[target] = OCCUPIED
+
+    def set(self, key: str, start_time: float, num_requests: int):
+        encoded = self.__encode(key)
+        h = key_hash(encoded)
+        stripe, offsets = self.__probe(h)
+        with self.__lock(stripe):
+            target = None
+            for offset in offsets:
+                state, slot_hash, _, _, slot_key = self.__read(offset)
+                if state == OCCUPIED:
+                    if slot_hash == h and slot_key == encoded:
+                        self.__update(offset, encoded, h, start_time, num_requests)
+                        return None
+                    continue
+                if target is None:
+                    target = offset
+                if state == EMPTY:
+                    break
+            self.__insert(target, key, encoded, h, start_time, num_requests)
+        return None
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        """
+        Counts `amount` requests of `key` like `Storage.check_and_increment`.
+
+        The read, the window check and the write hold the same stripe lock,
+        the concurrent checks of a key from other threads or processes are never lost.
+        """
+        encoded = self.__encode(key)
+        h = key_hash(encoded)
+        stripe, offsets = self.__probe(h)
+        with self.__lock(stripe):
+            target = None
+            for offset in offsets:
+                state, slot_hash, start_time, num_requests, slot_key = self.__read(offset)
+                if state == OCCUPIED:
+                    if slot_hash != h or slot_key != encoded:
+                        continue
+                    if current_time - start_time > time_window:
+                        start_time, num_requests = current_time, amount
+                    elif limit is not None and num_requests > limit:
+                        return {"start_time": start_time, "num_requests": num_requests}
+                    else:
+                        num_requests += amount
+                    self.__update(offset, encoded, h, start_time, num_requests)
+                    return {"start_time": start_time, "num_requests": num_requests}
+                if target is None:
+                    target = offset
+                if state == EMPTY:
+                    break
+            self.__insert(target, key, encoded, h, current_time, amount)
+        return {"start_time": current_time, "num_requests": amount}
+
+    def drop(self, key: str):
+        encoded = self.__encode(key)
+        h = key_hash(encoded)
+        stripe, offsets = self.__probe(h)
+        with self.__lock(stripe):
+            for offset in offsets:
+                state, slot_hash, _, _, slot_key = self.__read(offset)
+                if state == EMPTY:
+                    return None
+                if state == OCCUPIED and slot_hash == h and slot_key == encoded:
+                    self.__buffer[offset] = TOMBSTONE
+                    self.__shift_back(stripe, offset)
+                    return None
+        return None
+
+    def __shift_back(self, stripe: int, offset: int):
+        """
+        Backward-shift deletion: moves the next records of the probe sequence into the slot
+        freed at `offset` when their home slot allows it, then empties the last freed slot.
+
+        No tombstone is left behind, the probes of the stripe stay as short as its records allow
+        however many keys come and go. A crash in between leaves tombstones or a duplicate record,
+        the lookups stay correct.
+        """
+        per_stripe = self.__per_stripe
+        slot_size = self.__slot_size
+        base = HEADER_SIZE + stripe * per_stripe * slot_size
+        hole = (offset - base) // slot_size
+        index = hole
+        for _ in range(per_stripe - 1):
+            index = (index + 1) % per_stripe
+            source = base + index * slot_size
+            state, h, _, _, _ = self.__read(source)
+            if state == EMPTY:
+                break
+            if state != OCCUPIED:
+                continue
+            home = (h // self.stripes) % per_stripe
+            # The record stays if its home slot lies between the hole (excluded) and itself
+            if (index - home) % per_stripe < (index - hole) % per_stripe:
+                continue
+            target = base + hole * slot_size
+            # Payload first, state last, then the source is released
+            self.__buffer[target + 1:target + slot_size] = self.__buffer[source + 1:source + slot_size]
+            self.__buffer[target] = OCCUPIED
+            self.__buffer[source] = TOMBSTONE
+            hole = index
+        self.__buffer[base + hole * slot_size] = EMPTY
+
+    def clear(self):
+        size = self.__per_stripe * self.__slot_size
+        for stripe in range(self.stripes):
+            begin = HEADER_SIZE + stripe * size
+            with self.__lock(stripe):
+                self.__buffer[begin:begin + size] = bytes(size)
+
+    def keys(self) -> list[str]:
+        keys = []
+        for stripe in range(self.stripes):
+            begin = stripe * self.__per_stripe
+            with self.__lock(stripe):
+                for slot in range(begin, begin + self.__per_stripe):
+                    state, _, _, _, encoded = self.__read(HEADER_SIZE + slot * self.__slot_size)
+                    if state == OCCUPIED:
+                        keys.append(encoded.decode("utf-8"))
+        return keys
+
+    def scan(self, cursor: Optional[int] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        """
+        Returns one page of at most `count` (key, value) pairs, in slot order, see `Storage.scan`.
+
+        The cursor is the index of the next slot to read, a page reads the slots up to its last pair
+        and holds the lock of one stripe at a time.
+        """
+        if count <= 0:
+            raise ValueError(f"Invalid count: {count}")
+        encoded_prefix = prefix.encode("utf-8") if prefix else b""
+        slot = cursor or 0
+        per_stripe = self.__per_stripe
+        items = []
+        while slot < self.capacity and len(items) < count:
+            stripe = slot // per_stripe
+            end = (stripe + 1) * per_stripe
+            with self.__lock(stripe):
+                while slot < end and len(items) < count:
+                    state, _, start_time, num_requests, encoded = self.__read(HEADER_SIZE + slot * self.__slot_size)
+                    slot += 1
+                    if state == OCCUPIED and encoded.startswith(encoded_prefix):
+                        value = {"start_time": start_time, "num_requests": num_requests}
+                        items.append((encoded.decode("utf-8"), value))
+        return (slot if slot < self.capacity else None), items
+
+
+class RangeLock:
+    """
+    Holds a thread lock and, if a file descriptor is given, an exclusive POSIX lock on one byte of it.
+
+    Byte 0 is reserved for creating/formatting the table, byte `i + 1` guards stripe `i`.
+    """
+    __slots__ = ("__lock", "__fd", "__offset")
+
+    def __init__(self, lock: threading.Lock, fd: Optional[int], offset: int):
+        self.__lock = lock
+        self.__fd = fd if fcntl is not None else None
+        self.__offset = offset
+
+    def __enter__(self):
+        self.__lock.acquire()
+        if self.__fd is not None:
+            try:
+                fcntl.lockf(self.__fd, fcntl.LOCK_EX, 1, self.__offset)
+            except BaseException:
+                self.__lock.release()
+                raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.__fd is not None:
+            fcntl.lockf(self.__fd, fcntl.LOCK_UN, 1, self.__offset)
+        self.__lock.release()
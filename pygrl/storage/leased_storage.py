@@ -0,0 +1,115 @@
+import threading
+from typing import Any, Optional
+from .storage import Storage
+
+
+class LeasedStorage(Storage):
+    """
+    LeasedStorage is a subclass of the Storage abstract base class.
+    It wraps a shared storage and serves `check_and_increment` from local leases:
+    the first check of a key in a window reserves a block of `lease_size` requests in the shared storage,
+    the following checks are counted locally until the block is used up or the window has passed.
+
+    The shared storage is hit once per `lease_size` checks instead of on every check.
+
+    Attributes:
+    storage (Storage): The shared storage.
+    lease_size (int): The number of requests reserved at once, about 10% of `max_requests` is a good start.
+
+    Notes:
+    Expect the keys to be string, or at least convertible to strings.
+    Every reserved request counts in the shared storage, even before it is served locally.
+    A process holding unused requests of a lease makes the other processes hit the limit earlier,
+    by at most `lease_size - 1` requests per process and key. Never admits more than `max_requests`.
+    `get`, `set`, `keys`, `scan` read and write the shared storage, values include the reserved requests.
+    """
+
+    def __init__(self, storage: Storage, lease_size: int = 10):
+        """
+        Initializes a new instance of the LeasedStorage class.
+
+        Args:
+        storage (Storage): The shared storage.
+        lease_size (int, optional): The number of requests reserved at once. Defaults to 10.
+        """
+        if lease_size <= 0:
+            raise ValueError(f"Invalid lease size: {lease_size}")
+        self.storage = storage
+        self.lease_size = lease_size
+        # key -> [start_time, next num_requests, last num_requests]
+        self.__leases: dict[str, list] = {}
+        self.__purge_at = 1024
+        self.__lock = threading.Lock()
+
+    @property
+    def persistent(self) -> bool:
+        return self.storage.persistent
+
+    def get(self, key: str):
+        return self.storage.get(key)
+
+    def set(self, key: str, value: Any):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        with self.__lock:
+            self.__leases.pop(key, None)
+        self.storage.set(key, value)
+
+    def drop(self, key: str):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        with self.__lock:
+            self.__leases.pop(key, None)
+        self.storage.drop(key)
+
+    def clear(self):
+        with self.__lock:
+            self.__leases.clear()
+        self.storage.clear()
+
+    def keys(self) -> list:
+        return self.storage.keys()
+
+    def get_many(self, keys: list) -> list:
+        return self.storage.get_many(keys)
+
+    def scan(self, cursor: Any = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        return self.storage.scan(cursor, count, prefix)
+
+    def set_many(self, items: dict) -> None:
+        with self.__lock:
+            for key in items:
+                self.__leases.pop(key if type(key) is str else str(key), None)
+        self.storage.set_many(items)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        # `limit` is not forwarded, a lease is a block of requests counted at once in the shared storage
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        with self.__lock:
+            lease = self.__leases.get(key)
+            if lease is not None and current_time - lease[0] <= time_window and lease[1] + amount - 1 <= lease[2]:
+                lease[1] += amount
+                return {"start_time": lease[0], "num_requests": lease[1] - 1}
+
+        reserved = max(self.lease_size, amount)
+        item = self.storage.check_and_increment(key, current_time, time_window, reserved)
+        first = item["num_requests"] - reserved + 1
+        with self.__lock:
+            self.__leases[key] = [item["start_time"], first + amount, item["num_requests"]]
+            if len(self.__leases) >= self.__purge_at:
+                self.__purge(current_time, time_window)
+        return {"start_time": item["start_time"], "num_requests": first + amount - 1}
+
+    def __purge(self, current_time: float, time_window: float):
+        """
+        Forgets the leases of passed windows, amortized over the growth of the lease table.
+        """
+        for key in [key for key, lease in self.__leases.items() if current_time - lease[0] > time_window]:
+            del self.__leases[key]
+        self.__purge_at = max(1024, 2 * len(self.__leases))
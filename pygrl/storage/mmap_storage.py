@@ -0,0 +1,125 @@
+import mmap
+import os
+import threading
+from typing import Any, Optional
+from .storage import Storage
+from .fixed_slot_table import FixedSlotTable, RangeLock, HEADER_SIZE, table_size
+
+
+class MmapStorage(Storage):
+    """
+    MmapStorage is a subclass of the Storage abstract base class.
+    It keeps a fixed-size hash table of binary records in a memory-mapped file,
+    the state survives restarts and is shared by every process mapping the same file, without serialization.
+
+    Attributes:
+    path (str): The path to the file.
+    capacity (int): The number of slots, the maximum number of keys tracked at once.
+    max_key_size (int): The maximum length of a key in bytes (UTF-8 encoded).
+
+    Notes:
+    Expect the keys to be string, or at least convertible to strings.
+    Only `start_time` and `num_requests` of the value are stored.
+    Write-back is left to the OS, call `flush()` to force it.
+    A record torn by a crash fails its checksum and is treated as absent, the rest of the table stays usable.
+    """
+    persistent = True
+
+    def __init__(
+            self, path: str, capacity: int = 65536, max_key_size: int = 64,
+            stripes: int = 64, overwrite: bool = False
+    ):
+        """
+        Creates the file or maps an existing one.
+
+        Args:
+        path (str): The path to the file.
+        capacity (int, optional): The number of slots, rounded up to a multiple of `stripes`. Defaults to 65536.
+        max_key_size (int, optional): The maximum length of a key in bytes. Defaults to 64.
+        stripes (int, optional): The number of lock stripes. Defaults to 64.
+        overwrite (bool, optional): If True, wipes the existing file. Defaults to False.
+
+        When mapping an existing file, the layout (capacity, max_key_size, stripes) of the file is used.
+        """
+        MmapStorage.validate_path(path)
+        if capacity <= 0 or stripes <= 0:
+            raise ValueError(f"Invalid capacity ({capacity}) or stripes ({stripes})")
+        stripes = min(stripes, capacity)
+        capacity = -(-capacity // stripes) * stripes
+
+        self.path = path
+        self.__fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with RangeLock(threading.Lock(), self.__fd, 0):
+            # A fresh file, or one left behind by a process that crashed before writing the header
+            fresh = os.fstat(self.__fd).st_size < HEADER_SIZE or not any(os.pread(self.__fd, HEADER_SIZE, 0))
+            if overwrite or fresh:
+                os.ftruncate(self.__fd, table_size(capacity, max_key_size))
+            self.__mmap = mmap.mmap(self.__fd, 0)
+            if overwrite or fresh:
+                FixedSlotTable.format(self.__mmap, capacity, stripes, max_key_size)
+        self.__table = FixedSlotTable(self.__mmap, self.__fd)
+        self.capacity = self.__table.capacity
+        self.max_key_size = self.__table.key_size
+
+    @classmethod
+    def validate_path(cls, path: str):
+        if not isinstance(path, str):
+            raise ValueError(f"Invalid path: {path}")
+
+        if not path:
+            raise ValueError("Path cannot be empty")
+
+        if not os.path.basename(path):
+            raise ValueError(f"Invalid path: {path}")
+
+    def get(self, key: str):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        return self.__table.get(key)
+
+    def set(self, key: str, value: Any):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        self.__table.set(key, value["start_time"], value["num_requests"])
+
+    def drop(self, key: str):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        self.__table.drop(key)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        # One stripe lock around the read and the write, see `FixedSlotTable.check_and_increment`
+        return self.__table.check_and_increment(key, current_time, time_window, amount, limit)
+
+    def clear(self):
+        self.__table.clear()
+
+    def keys(self) -> list[str]:
+        return self.__table.keys()
+
+    def scan(self, cursor: Optional[int] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        # The cursor is the index of the next slot, see `FixedSlotTable.scan`
+        return self.__table.scan(cursor, count, prefix)
+
+    def flush(self):
+        """
+        Writes the dirty pages back to the file.
+        """
+        self.__mmap.flush()
+
+    def close(self):
+        """
+        Flushes and unmaps the file.
+        """
+        self.__table = None
+        self.__mmap.flush()
+        self.__mmap.close()
+        os.close(self.__fd)
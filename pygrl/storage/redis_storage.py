@@ -0,0 +1,282 @@
+import hashlib
+import socket
+from typing import Any, Optional, Union
+from .storage import Storage
+from .connection_pool import ConnectionPool, open_socket
+from ..custom_exception import RemoteStorageError
+
+
+class RedisStorage(Storage):
+    """
+    RedisStorage is a subclass of the Storage abstract base class.
+    It stores every key as a Redis hash {start_time, num_requests}, so the rate limits are shared by every node
+    talking to the same Redis server.
+
+    Speaks RESP directly over a socket, no client library is required.
+
+    Attributes:
+    address (str | tuple[str, int]): The path of the Unix domain socket, or the (host, port) of the Redis server.
+    prefix (str): The prefix prepended to every key, `keys()` and `clear()` only touch keys under this prefix.
+
+    Notes:
+    Expect the keys to be string, or at least convertible to strings.
+    `check_and_increment` runs as a single Lua script (EVALSHA), it is atomic across nodes and also sets an expiry
+    of `time_window + 1` seconds, so Redis evicts idle keys on its own.
+    `get_many`, `set_many` and `check_and_increment_many` pipeline all commands on one connection.
+    `scan` follows the SCAN cursor of the server, a page may be empty or repeat a key.
+    """
+    persistent = True
+
+    CHECK_AND_INCREMENT_SCRIPT = """
+local item = redis.call('HMGET', KEYS[1], 'start_time', 'num_requests')
+local current_time = tonumber(ARGV[1])
+local time_window = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local limit = tonumber(ARGV[4])
+local start_time = tonumber(item[1])
+if start_time == nil or current_time - start_time > time_window then
+    redis.call('HSET', KEYS[1], 'start_time', ARGV[1], 'num_requests', amount)
+    redis.call('PEXPIRE', KEYS[1], math.ceil((time_window + 1) * 1000))
+    return {ARGV[1], amount}
+end
+if limit ~= nil and tonumber(item[2]) > limit then
+    return {item[1], tonumber(item[2])}
+end
+local num_requests = redis.call('HINCRBY', KEYS[1], 'num_requests', amount)
+return {item[1], num_requests}
+"""
+    CHECK_AND_INCREMENT_SHA = hashlib.sha1(CHECK_AND_INCREMENT_SCRIPT.encode("utf-8")).hexdigest()
+
+    def __init__(
+            self, address: Union[str, tuple] = ("127.0.0.1", 6379), prefix: str = "pygrl:",
+            db: int = 0, password: Optional[str] = None, pool_size: int = 8, timeout: Optional[float] = 5.0
+    ):
+        """
+        Initializes a new instance of the RedisStorage class, connections are opened lazily.
+
+        Args:
+        address (str | tuple[str, int], optional): The Redis server. Defaults to ("127.0.0.1", 6379).
+        prefix (str, optional): The prefix prepended to every key. Defaults to "pygrl:".
+        db (int, optional): The database index selected on every connection. Defaults to 0.
+        password (str, optional): The password sent with AUTH on every connection. Defaults to None.
+        pool_size (int, optional): The maximum number of connections kept open to the server. Defaults to 8.
+        timeout (float, optional): The socket timeout in seconds. Defaults to 5.0.
+        """
+        self.address = address
+        self.prefix = prefix
+        self.db = db
+        self.timeout = timeout
+        self.__password = password
+        self.__pool = ConnectionPool(self.__connect, pool_size)
+
+    def __connect(self):
+        connection = _RespConnection(open_socket(self.address, self.timeout))
+        try:
+            setup = []
+            if self.__password is not None:
+                setup.append(("AUTH", self.__password))
+            if self.db:
+                setup.append(("SELECT", self.db))
+            for reply in connection.execute(setup):
+                if isinstance(reply, RemoteStorageError):
+                    raise reply
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    def __execute(self, commands: list[tuple]) -> list:
+        """
+        Pipelines the commands on one connection, returns one reply per command.
+        """
+        with self.__pool.connection() as connection:
+            replies = connection.execute(commands)
+        for reply in replies:
+            if isinstance(reply, RemoteStorageError):
+                raise reply
+        return replies
+
+    def __key(self, key: Any) -> str:
+        return self.prefix + (key if type(key) is str else str(key))
+
+    @staticmethod
+    def __decode_value(reply: list) -> Optional[dict]:
+        start_time, num_requests = reply
+        if start_time is None:
+            return None
+        return {"start_time": float(start_time), "num_requests": int(num_requests)}
+
+    @staticmethod
+    def __encode_value(value: Any) -> tuple:
+        return "start_time", repr(float(value["start_time"])), "num_requests", int(value["num_requests"])
+
+    def get(self, key: str):
+        (reply,) = self.__execute([("HMGET", self.__key(key), "start_time", "num_requests")])
+        return self.__decode_value(reply)
+
+    def set(self, key: str, value: Any):
+        self.__execute([("HSET", self.__key(key), *self.__encode_value(value))])
+
+    def drop(self, key: str):
+        self.__execute([("DEL", self.__key(key))])
+
+    def clear(self):
+        keys = [self.prefix + key for key in self.keys()]
+        for begin in range(0, len(keys), 512):
+            self.__execute([("UNLINK", *keys[begin:begin + 512])])
+
+    def keys(self) -> list[str]:
+        keys = []
+        cursor = "0"
+        pattern = self.__escape(self.prefix) + "*"
+        while True:
+            ((cursor, batch),) = self.__execute([("SCAN", cursor, "MATCH", pattern, "COUNT", 1000)])
+            keys.extend(key[len(self.prefix):] for key in batch)
+            if cursor == "0":
+                return list(dict.fromkeys(keys))  # SCAN may return a key more than once
+
+    def scan(self, cursor: Optional[str] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        """
+        Returns one page of key-value pairs, about `count` of them, from one SCAN and one pipelined HMGET.
+
+        Args:
+        cursor (str, optional): None for the first page, then the cursor returned with the previous page.
+        count (int, optional): The COUNT hint of SCAN. Defaults to 100.
+        prefix (str, optional): Only returns the keys starting with `prefix` (after `self.prefix`). Defaults to None.
+
+        Returns:
+        tuple: The cursor of the next page, None after the last page, and the [(key, value), ...] of this page.
+        """
+        if count <= 0:
+            raise ValueError(f"Invalid count: {count}")
+        pattern = self.__escape(self.prefix + (prefix or "")) + "*"
+        ((cursor, batch),) = self.__execute([("SCAN", cursor or "0", "MATCH", pattern, "COUNT", count)])
+        keys = [key[len(self.prefix):] for key in batch]
+        values = self.get_many(keys)
+        items = [(key, value) for key, value in zip(keys, values) if value is not None]
+        return (None if cursor == "0" else cursor), items
+
+    @staticmethod
+    def __escape(pattern: str) -> str:
+        for char in "\\*?[]":
+            pattern = pattern.replace(char, "\\" + char)
+        return pattern
+
+    def get_many(self, keys: list) -> list:
+        if not keys:
+            return []
+        replies = self.__execute([("HMGET", self.__key(key), "start_time", "num_requests") for key in keys])
+        return [self.__decode_value(reply) for reply in replies]
+
+    def set_many(self, items: dict) -> None:
+        if not items:
+            return None
+        self.__execute([("HSET", self.__key(key), *self.__encode_value(value)) for key, value in items.items()])
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        return self.check_and_increment_many([key], current_time, time_window, amount, limit)[0]
+
+    def check_and_increment_many(
+            self, keys: list, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> list:
+        """
+        Pipelined `check_and_increment` of every key, one round trip for the whole batch.
+
+        Args:
+        keys (list): The keys to count one request for.
+        current_time (float): The time of the requests.
+        time_window (float): The length of a window in seconds.
+        amount (int, optional): The number of requests to count for each key. Defaults to 1.
+        limit (int, optional): Leaves the windows counting more than `limit` requests as they are. Defaults to None.
+
+        Returns:
+        list[dict]: The updated values, in the same order as the keys.
+        """
+        if not keys:
+            return []
+        args = (repr(float(current_time)), repr(float(time_window)), int(amount), "" if limit is None else int(limit))
+        commands = [("EVALSHA", self.CHECK_AND_INCREMENT_SHA, 1, self.__key(key), *args) for key in keys]
+        with self.__pool.connection() as connection:
+            replies = connection.execute(commands)
+            # First use on this server (or after SCRIPT FLUSH), EVAL caches the script for the next EVALSHA.
+            # Only the failed commands are retried, the others have already been counted.
+            missing = [
+                index for index, reply in enumerate(replies)
+                if isinstance(reply, RemoteStorageError) and str(reply).startswith("NOSCRIPT")
+            ]
+            if missing:
+                retried = connection.execute([
+                    ("EVAL", self.CHECK_AND_INCREMENT_SCRIPT) + commands[index][2:] for index in missing
+                ])
+                for index, reply in zip(missing, retried):
+                    replies[index] = reply
+        for reply in replies:
+            if isinstance(reply, RemoteStorageError):
+                raise reply
+        return [self.__decode_value(reply) for reply in replies]
+
+    def close(self):
+        """
+        Closes the idle connections of the pool.
+        """
+        self.__pool.close()
+
+
+class _RespConnection:
+    """
+    A connection speaking RESP2, error replies are returned as `RemoteStorageError` instead of raised,
+    so the replies of a pipeline are always fully consumed.
+    """
+    __slots__ = ("sock", "reader")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+
+    @staticmethod
+    def encode(command: tuple) -> bytes:
+        chunks = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if isinstance(arg, bytes):
+                data = arg
+            elif isinstance(arg, str):
+                data = arg.encode("utf-8")
+            else:
+                data = str(arg).encode("utf-8")
+            chunks.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(chunks)
+
+    def execute(self, commands: list) -> list:
+        if not commands:
+            return []
+        self.sock.sendall(b"".join(map(self.encode, commands)))
+        return [self.read_reply() for _ in commands]
+
+    def read_reply(self):
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the server")
+        kind, data = line[:1], line[1:-2]
+        if kind == b"+":
+            return data.decode("utf-8")
+        if kind == b"-":
+            return RemoteStorageError(data.decode("utf-8"))
+        if kind == b":":
+            return int(data)
+        if kind == b"$":
+            length = int(data)
+            if length < 0:
+                return None
+            return self.reader.read(length + 2)[:-2].decode("utf-8")
+        if kind == b"*":
+            length = int(data)
+            if length < 0:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from the server: {line!r}")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
@@ -0,0 +1,242 @@
+import socket
+import struct
+from typing import Any, Optional, Union
+from .storage import Storage
+from .connection_pool import ConnectionPool, open_socket
+from ..custom_exception import RemoteStorageError
+
+# Every request and response is a frame: (code: u8, payload length: u32) followed by the payload.
+# Responses are returned in request order, thus a client may pipeline requests on one connection.
+FRAME = struct.Struct("<BI")
+VALUE = struct.Struct("<dq")  # start_time, num_requests
+KEY_LEN = struct.Struct("<H")
+CURSOR = struct.Struct("<Q")
+WINDOW = struct.Struct("<ddqq")  # current_time, time_window, amount, limit (-1 for None)
+SCAN = struct.Struct("<QI")  # cursor id (0 for the first page), count
+
+OP_GET = 1  # payload: key
+OP_SET = 2  # payload: VALUE + key
+OP_DROP = 3  # payload: key
+OP_CLEAR = 4  # payload: empty
+OP_KEYS = 5  # payload: empty
+OP_CHECK = 6  # payload: WINDOW + key, see `Storage.check_and_increment`
+OP_SCAN = 7  # payload: SCAN + prefix, see `Storage.scan`
+
+STATUS_OK = 0  # payload: empty
+STATUS_VALUE = 1  # payload: VALUE
+STATUS_NOT_FOUND = 2  # payload: empty
+STATUS_KEYS = 3  # payload: (KEY_LEN + key) * n
+STATUS_ERROR = 4  # payload: UTF-8 message
+STATUS_ITEMS = 5  # payload: cursor id (0 after the last page) + (KEY_LEN + key + VALUE) * n
+
+
+def encode_frame(code: int, payload: bytes = b"") -> bytes:
+    return FRAME.pack(code, len(payload)) + payload
+
+
+def encode_keys(keys: list) -> bytes:
+    chunks = []
+    for key in keys:
+        encoded = key.encode("utf-8")
+        chunks.append(KEY_LEN.pack(len(encoded)))
+        chunks.append(encoded)
+    return b"".join(chunks)
+
+
+def encode_items(cursor_id: int, items: list) -> bytes:
+    chunks = [CURSOR.pack(cursor_id)]
+    for key, value in items:
+        encoded = str(key).encode("utf-8")
+        chunks.append(KEY_LEN.pack(len(encoded)))
+        chunks.append(encoded)
+        chunks.append(VALUE.pack(value["start_time"], value["num_requests"]))
+    return b"".join(chunks)
+
+
+def decode_items(payload: bytes) -> tuple[int, list]:
+    (cursor_id,) = CURSOR.unpack_from(payload)
+    items = []
+    offset = CURSOR.size
+    while offset < len(payload):
+        (length,) = KEY_LEN.unpack_from(payload, offset)
+        offset += KEY_LEN.size
+        key = payload[offset:offset + length].decode("utf-8")
+        offset += length
+        start_time, num_requests = VALUE.unpack_from(payload, offset)
+        offset += VALUE.size
+        items.append((key, {"start_time": start_time, "num_requests": num_requests}))
+    return cursor_id, items
+
+
+def decode_keys(payload: bytes) -> list[str]:
+    keys = []
+    offset = 0
+    while offset < len(payload):
+        (length,) = KEY_LEN.unpack_from(payload, offset)
+        offset += KEY_LEN.size
+        keys.append(payload[offset:offset + length].decode("utf-8"))
+        offset += length
+    return keys
+
+
+class RemoteStorage(Storage):
+    """
+    RemoteStorage is a subclass of the Storage abstract base class.
+    It forwards every operation to a `pygrl.server.StorageServer` over a Unix domain socket or TCP,
+    so many processes share one authoritative storage.
+
+    Attributes:
+    address (str | tuple[str, int]): The path of the Unix domain socket, or the (host, port) of the TCP server.
+    pool_size (int): The maximum number of connections kept open to the server.
+
+    Notes:
+    Expect the keys to be string, or at least convertible to strings.
+    Only `start_time` and `num_requests` of the value are transferred.
+    Thread-safe, each operation checks out its own connection from the pool.
+    `get_many` and `set_many` pipeline all requests on one connection.
+    `check_and_increment` is executed by the server in a single step, it is atomic across clients.
+    """
+    persistent = True
+
+    def __init__(self, address: Union[str, tuple], pool_size: int = 8, timeout: Optional[float] = 5.0):
+        """
+        Initializes a new instance of the RemoteStorage class, connections are opened lazily.
+
+        Args:
+        address (str | tuple[str, int]): The path of the Unix domain socket, or the (host, port) of the TCP server.
+        pool_size (int, optional): The maximum number of connections kept open to the server. Defaults to 8.
+        timeout (float, optional): The socket timeout in seconds. Defaults to 5.0.
+        """
+        self.address = address
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.__pool = ConnectionPool(lambda: _Connection(open_socket(address, timeout)), pool_size)
+
+    def __roundtrip(self, requests: list[bytes]) -> list[tuple[int, bytes]]:
+        """
+        Sends the requests on one connection and reads one response for each of them.
+        """
+        with self.__pool.connection() as connection:
+            connection.sock.sendall(b"".join(requests))
+            responses = [connection.read_frame() for _ in requests]
+        for status, payload in responses:
+            if status == STATUS_ERROR:
+                raise RemoteStorageError(payload.decode("utf-8"))
+        return responses
+
+    @staticmethod
+    def __decode_value(status: int, payload: bytes) -> Optional[dict]:
+        if status != STATUS_VALUE:
+            return None
+        start_time, num_requests = VALUE.unpack(payload)
+        return {"start_time": start_time, "num_requests": num_requests}
+
+    def get(self, key: str):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        ((status, payload),) = self.__roundtrip([encode_frame(OP_GET, key.encode("utf-8"))])
+        return self.__decode_value(status, payload)
+
+    def set(self, key: str, value: Any):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        self.__roundtrip([encode_frame(
+            OP_SET, VALUE.pack(value["start_time"], value["num_requests"]) + key.encode("utf-8")
+        )])
+
+    def drop(self, key: str):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        self.__roundtrip([encode_frame(OP_DROP, key.encode("utf-8"))])
+
+    def clear(self):
+        self.__roundtrip([encode_frame(OP_CLEAR)])
+
+    def keys(self) -> list[str]:
+        ((_, payload),) = self.__roundtrip([encode_frame(OP_KEYS)])
+        return decode_keys(payload)
+
+    def get_many(self, keys: list) -> list:
+        if not keys:
+            return []
+        responses = self.__roundtrip([encode_frame(OP_GET, str(key).encode("utf-8")) for key in keys])
+        return [self.__decode_value(status, payload) for status, payload in responses]
+
+    def set_many(self, items: dict) -> None:
+        if not items:
+            return None
+        self.__roundtrip([
+            encode_frame(OP_SET, VALUE.pack(value["start_time"], value["num_requests"]) + str(key).encode("utf-8"))
+            for key, value in items.items()
+        ])
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        window = WINDOW.pack(current_time, time_window, amount, -1 if limit is None else limit)
+        ((status, payload),) = self.__roundtrip([encode_frame(OP_CHECK, window + key.encode("utf-8"))])
+        return self.__decode_value(status, payload)
+
+    def scan(self, cursor: Optional[int] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        """
+        Returns one page of at most `count` key-value pairs, scanned by the server, see `Storage.scan`.
+
+        The server keeps the cursor of the storage it serves, the cursor returned here is its id.
+
+        Raises:
+        RemoteStorageError: If the server forgot the cursor, e.g. after a restart or too many unfinished scans.
+        """
+        if count <= 0:
+            raise ValueError(f"Invalid count: {count}")
+        request = SCAN.pack(cursor or 0, count) + (prefix or "").encode("utf-8")
+        ((_, payload),) = self.__roundtrip([encode_frame(OP_SCAN, request)])
+        cursor_id, items = decode_items(payload)
+        return (cursor_id or None), items
+
+    def close(self):
+        """
+        Closes the idle connections of the pool.
+        """
+        self.__pool.close()
+
+
+class _Connection:
+    __slots__ = ("sock", "reader")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.reader = sock.makefile("rb")
+
+    def read_exactly(self, size: int) -> bytes:
+        """
+        Reads `size` bytes, over as many reads as the socket takes.
+
+        Raises:
+        ConnectionError: If the server closes the connection first.
+        """
+        data = self.reader.read(size)
+        if len(data) == size:
+            return data
+        chunks = [data]
+        received = len(data)
+        while received < size:
+            chunk = self.reader.read(size - received)
+            if not chunk:
+                raise ConnectionError("Connection closed by the server")
+            chunks.append(chunk)
+            received += len(chunk)
+        return b"".join(chunks)
+
+    def read_frame(self) -> tuple[int, bytes]:
+        code, length = FRAME.unpack(self.read_exactly(FRAME.size))
+        return code, self.read_exactly(length) if length else b""
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
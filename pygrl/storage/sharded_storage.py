@@ -0,0 +1,203 @@
+import hashlib
+from bisect import bisect, insort
+from typing import Any, Callable, Optional
+from .storage import Storage, check_and_increment_of
+
+
+def _hash(data: str) -> int:
+    # Stable across processes, unlike `hash()`
+    return int.from_bytes(hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ShardedStorage(Storage):
+    """
+    ShardedStorage is a subclass of the Storage abstract base class.
+    It spreads the keys over several storages with consistent hashing, every shard is placed
+    on a hash ring `virtual_nodes` times and a key belongs to the next point on the ring.
+
+    Adding or removing a shard only moves the keys between the neighbouring points,
+    about 1/N of the keys, the other keys stay where they are.
+
+    Attributes:
+    shards (dict[str, Storage]): The storages by name.
+    virtual_nodes (int): The number of points of each shard on the ring.
+
+    Notes:
+    Expect the keys to be string, or at least convertible to strings.
+    The placement only depends on the shard names, processes configured with the same names route the same way.
+    `get_many`, `set_many` issue one batch per shard.
+    `scan` goes through the shards one after the other, adding or removing a shard during a scan
+    may skip or repeat keys.
+    """
+
+    def __init__(self, storages: list, names: Optional[list] = None, virtual_nodes: int = 160):
+        """
+        Initializes a new instance of the ShardedStorage class.
+
+        Args:
+        storages (list[Storage]): The shards.
+        names (list[str], optional): The names of the shards. Defaults to "shard-0", "shard-1", ...
+        virtual_nodes (int, optional): The number of points of each shard on the ring. Defaults to 160.
+        """
+        if not storages:
+            raise ValueError("At least one storage is required")
+        if names is None:
+            names = [f"shard-{index}" for index in range(len(storages))]
+        if len(names) != len(storages) or len(set(names)) != len(names):
+            raise ValueError(f"Expect one unique name per storage: {names}")
+        if virtual_nodes <= 0:
+            raise ValueError(f"Invalid number of virtual nodes: {virtual_nodes}")
+        self.virtual_nodes = virtual_nodes
+        self.shards: dict[str, Storage] = {}
+        self.__points: list[int] = []
+        self.__owners: dict[int, str] = {}
+        # Per shard, a shard may override `check_and_increment` without `limit`
+        self.__checks: dict[str, Callable[..., dict]] = {}
+        for name, storage in zip(names, storages):
+            self.__place(name, storage)
+
+    def __place(self, name: str, storage: Storage):
+        self.shards[name] = storage
+        self.__checks[name] = check_and_increment_of(storage)
+        for replica in range(self.virtual_nodes):
+            point = _hash(f"{name}#{replica}")
+            if point in self.__owners:
+                continue  # Collision, keep the first owner so every process agrees
+            self.__owners[point] = name
+            insort(self.__points, point)
+
+    def __unplace(self, name: str):
+        del self.shards[name]
+        del self.__checks[name]
+        self.__points = [point for point in self.__points if self.__owners[point] != name]
+        self.__owners = {point: owner for point, owner in self.__owners.items() if owner != name}
+
+    @property
+    def persistent(self) -> bool:
+        return any(storage.persistent for storage in self.shards.values())
+
+    def shard_name(self, key: Any) -> str:
+        """
+        Returns the name of the shard owning the key.
+        """
+        index = bisect(self.__points, _hash(key if type(key) is str else str(key)))
+        return self.__owners[self.__points[index % len(self.__points)]]
+
+    def shard(self, key: Any) -> Storage:
+        """
+        Returns the shard owning the key.
+        """
+        return self.shards[self.shard_name(key)]
+
+    def add_shard(self, storage: Storage, name: Optional[str] = None, migrate: bool = True):
+        """
+        Adds a shard to the ring.
+
+        Args:
+        storage (Storage): The new shard.
+        name (str, optional): The name of the new shard. Defaults to the first free "shard-N".
+        migrate (bool, optional): If True, moves the keys now owned by the new shard into it. Defaults to True.
+        """
+        if name is None:
+            name = next(f"shard-{index}" for index in range(len(self.shards) + 1) if f"shard-{index}" not in self.shards)
+        if name in self.shards:
+            raise ValueError(f"Shard already exists: {name}")
+        self.__place(name, storage)
+        if migrate:
+            for source_name, source in list(self.shards.items()):
+                if source_name != name:
+                    self.__migrate(source_name, source)
+
+    def remove_shard(self, name: str, migrate: bool = True) -> Storage:
+        """
+        Removes a shard from the ring.
+
+        Args:
+        name (str): The name of the shard.
+        migrate (bool, optional): If True, moves the keys of the shard to their new owners. Defaults to True.
+
+        Returns:
+        Storage: The removed shard.
+        """
+        if name not in self.shards:
+            raise KeyError(f"Unknown shard: {name}")
+        if len(self.shards) == 1:
+            raise ValueError("Cannot remove the last shard")
+        storage = self.shards[name]
+        self.__unplace(name)
+        if migrate:
+            self.__migrate(name, storage)
+        return storage
+
+    def __migrate(self, source_name: str, source: Storage):
+        """
+        Moves the keys of `source` not owned by `source_name` anymore to their owners.
+        """
+        moving: dict[str, list] = {}
+        for key in source.keys():
+            owner = self.shard_name(key)
+            if owner != source_name:
+                moving.setdefault(owner, []).append(key)
+        for owner, keys in moving.items():
+            values = source.get_many(keys)
+            self.shards[owner].set_many({key: value for key, value in zip(keys, values) if value is not None})
+            for key in keys:
+                source.drop(key)
+
+    def __group(self, keys) -> dict[str, list]:
+        groups: dict[str, list] = {}
+        for index, key in enumerate(keys):
+            groups.setdefault(self.shard_name(key), []).append(index)
+        return groups
+
+    def get(self, key: str):
+        return self.shard(key).get(key)
+
+    def set(self, key: str, value: Any):
+        self.shard(key).set(key, value)
+
+    def drop(self, key: str):
+        self.shard(key).drop(key)
+
+    def clear(self):
+        for storage in self.shards.values():
+            storage.clear()
+
+    def keys(self) -> list:
+        keys = []
+        for storage in self.shards.values():
+            keys.extend(storage.keys())
+        return keys
+
+    def get_many(self, keys: list) -> list:
+        values = [None] * len(keys)
+        for name, indices in self.__group(keys).items():
+            batch = self.shards[name].get_many([keys[index] for index in indices])
+            for index, value in zip(indices, batch):
+                values[index] = value
+        return values
+
+    def set_many(self, items: dict) -> None:
+        keys = list(items.keys())
+        for name, indices in self.__group(keys).items():
+            self.shards[name].set_many({keys[index]: items[keys[index]] for index in indices})
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        return self.__checks[self.shard_name(key)](key, current_time, time_window, amount, limit)
+
+    def scan(self, cursor: Optional[tuple] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        """
+        Returns one page of key-value pairs of one shard, see `Storage.scan`.
+
+        The cursor is (shard index, cursor of the shard).
+        """
+        index, inner = cursor if cursor is not None else (0, None)
+        storages = list(self.shards.values())
+        if index >= len(storages):
+            return None, []
+        inner, items = storages[index].scan(inner, count, prefix)
+        if inner is None:
+            index += 1
+        return ((index, inner) if index < len(storages) else None), items
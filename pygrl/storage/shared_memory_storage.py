@@ -0,0 +1,148 @@
+import os
+import re
+import tempfile
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Optional
+from .storage import Storage
+from .fixed_slot_table import FixedSlotTable, RangeLock, table_size
+
+_TRACKER_PATCH_LOCK = threading.Lock()
+
+
+class SharedMemoryStorage(Storage):
+    """
+    SharedMemoryStorage is a subclass of the Storage abstract base class.
+    It stores the rate limiting state in a `multiprocessing.shared_memory` block, so every process
+    on the same host attaching to the same `name` shares the same counters at memory speed.
+
+    The block holds an open-addressing hash table of fixed-size slots (key hash, start_time, num_requests, key),
+    partitioned into lock stripes. Each stripe is guarded by a byte-range lock on a sidecar lock file,
+    thus unrelated processes (e.g. gunicorn workers) are serialized per stripe rather than globally.
+
+    Attributes:
+    name (str): The name of the shared memory block.
+    capacity (int): The number of slots, the maximum number of keys tracked at once.
+    max_key_size (int): The maximum length of a key in bytes (UTF-8 encoded).
+
+    Notes:
+    Expect the keys to be string, or at least convertible to strings.
+    Only `start_time` and `num_requests` of the value are stored.
+    The first process creating the block owns it, call `unlink()` once no process needs it anymore.
+    """
+    persistent = True
+
+    def __init__(
+            self, name: str = "pygrl", capacity: int = 65536, max_key_size: int = 64,
+            stripes: int = 64, overwrite: bool = False
+    ):
+        """
+        Creates the shared memory block or attaches to an existing one.
+
+        Args:
+        name (str, optional): The name of the shared memory block. Defaults to "pygrl".
+        capacity (int, optional): The number of slots, rounded up to a multiple of `stripes`. Defaults to 65536.
+        max_key_size (int, optional): The maximum length of a key in bytes. Defaults to 64.
+        stripes (int, optional): The number of lock stripes. Defaults to 64.
+        overwrite (bool, optional): If True, wipes the existing block. Defaults to False.
+
+        When attaching to an existing block, the layout (capacity, max_key_size, stripes) of the block is used.
+        """
+        SharedMemoryStorage.validate_name(name)
+        if capacity <= 0 or stripes <= 0:
+            raise ValueError(f"Invalid capacity ({capacity}) or stripes ({stripes})")
+        stripes = min(stripes, capacity)
+        capacity = -(-capacity // stripes) * stripes
+
+        self.name = name
+        self.__lock_fd = os.open(
+            os.path.join(tempfile.gettempdir(), f"{name}.pygrl.lock"), os.O_RDWR | os.O_CREAT, 0o600
+        )
+        with RangeLock(threading.Lock(), self.__lock_fd, 0):
+            self.__shm, created = SharedMemoryStorage.__open(name, table_size(capacity, max_key_size))
+            if created or overwrite or not FixedSlotTable.is_formatted(self.__shm.buf):
+                FixedSlotTable.format(self.__shm.buf, capacity, stripes, max_key_size)
+        self.__table = FixedSlotTable(self.__shm.buf, self.__lock_fd)
+        self.capacity = self.__table.capacity
+        self.max_key_size = self.__table.key_size
+
+    @staticmethod
+    def __open(name: str, size: int):
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=size), True
+        except FileExistsError:
+            return SharedMemoryStorage.__attach(name), False
+
+    @staticmethod
+    def __attach(name: str):
+        # Attaching registers the block for removal at exit (bpo-39959), only the creator should own it.
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            pass
+        with _TRACKER_PATCH_LOCK:
+            register = shared_memory.resource_tracker.register
+            shared_memory.resource_tracker.register = lambda *args, **kwargs: None
+            try:
+                return shared_memory.SharedMemory(name=name)
+            finally:
+                shared_memory.resource_tracker.register = register
+
+    @classmethod
+    def validate_name(cls, name: str):
+        if not isinstance(name, str):
+            raise ValueError(f"Invalid shared memory name: {name}")
+
+        if re.search(r"^[\w.-]+$", name) is None:
+            raise ValueError(f"Invalid shared memory name: {name}")
+
+    def get(self, key: str):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        return self.__table.get(key)
+
+    def set(self, key: str, value: Any):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        self.__table.set(key, value["start_time"], value["num_requests"])
+
+    def drop(self, key: str):
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        self.__table.drop(key)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        # Force the type of the key to string
+        if type(key) is not str:
+            key = str(key)
+        # One stripe lock around the read and the write, see `FixedSlotTable.check_and_increment`
+        return self.__table.check_and_increment(key, current_time, time_window, amount, limit)
+
+    def clear(self):
+        self.__table.clear()
+
+    def keys(self) -> list[str]:
+        return self.__table.keys()
+
+    def scan(self, cursor: Optional[int] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        # The cursor is the index of the next slot, see `FixedSlotTable.scan`
+        return self.__table.scan(cursor, count, prefix)
+
+    def close(self):
+        """
+        Detaches this process from the shared memory block.
+        """
+        self.__table = None
+        self.__shm.close()
+        os.close(self.__lock_fd)
+
+    def unlink(self):
+        """
+        Removes the shared memory block, processes still attached keep their mapping until they close it.
+        """
+        self.__shm.unlink()
@@ -2,7 +2,9 @@ import json
 import os
 import re
 import sqlite3
-from typing import Any
+import threading
+import zlib
+from typing import Any, Callable, Optional
 from .storage import Storage
 
 
@@ -15,12 +17,21 @@ class SQLite3_Storage(Storage):
     Attributes:
     db_path (str): The path to the SQLite3 database.
     table_name (str): The name of the table in the SQLite3 database.
+    db_paths (list[str]): The paths to the database files, one per shard.
     
     Notes:
     Expect the keys to be string, or at least convertible to strings.
+    SQLite allows one writer per database file. With `shards` > 1 the keys are spread over several files
+    by key hash, writers of different shards do not wait for each other.
+    Every shard keeps one connection, shared by the threads of the process under a lock. A process forked
+    after the storage was created opens its own connections on first use.
+    `check_and_increment` reads and writes in one `BEGIN IMMEDIATE` transaction, it is atomic across
+    the processes sharing the files.
+    `scan` seeks through the primary key index, one query per page.
     """
+    persistent = True
 
-    def __init__(self, db_path: str, table_name: str = "storage", overwrite: bool = False):
+    def __init__(self, db_path: str, table_name: str = "storage", overwrite: bool = False, shards: int = 1):
         """
         Initializes a new instance of the SQLite3_Storage class.
 
@@ -28,10 +39,85 @@ class SQLite3_Storage(Storage):
         db_path (str): The path to the SQLite3 database.
         table_name (str, optional): The name of the table in the SQLite3 database. Defaults to "storage".
         overwrite (bool, optional): If True, overwrites the existing database at db_path. Defaults to False.
+        shards (int, optional): The number of database files, "storage.db" becomes "storage-0.db", "storage-1.db", ...
+            Defaults to 1, a single file at db_path.
         """
         self.db_path = db_path
         self.table_name = table_name
-        self.init(db_path, table_name, overwrite)
+        self.db_paths = SQLite3_Storage.shard_paths(db_path, shards)
+        for path in self.db_paths:
+            self.init(path, table_name, overwrite)
+        self.__pid = None
+        self.__connections: list[sqlite3.Connection] = []
+        self.__inodes: list[int] = []
+        self.__locks = [threading.Lock() for _ in self.db_paths]
+        self.__open()
+
+    @classmethod
+    def shard_paths(cls, db_path: str, shards: int) -> list[str]:
+        """
+        Returns the paths to the database files of `shards` shards.
+
+        Args:
+        db_path (str): The path to the SQLite3 database.
+        shards (int): The number of shards.
+        """
+        if not isinstance(shards, int) or shards <= 0:
+            raise ValueError(f"Invalid number of shards: {shards}")
+        if shards == 1:
+            return [db_path]
+        root, ext = os.path.splitext(db_path)
+        return [f"{root}-{index}{ext}" for index in range(shards)]
+
+    def __open(self):
+        # Autocommit, the transactions are explicit; the lock of the shard serializes the threads
+        self.__connections = [
+            sqlite3.connect(path, isolation_level=None, check_same_thread=False) for path in self.db_paths
+        ]
+        self.__inodes = [os.stat(path).st_ino for path in self.db_paths]
+        self.__pid = os.getpid()
+
+    def __replaced(self, index: int) -> bool:
+        try:
+            return os.stat(self.db_paths[index]).st_ino != self.__inodes[index]
+        except FileNotFoundError:
+            return False
+
+    def __shard(self, key: str) -> int:
+        if len(self.db_paths) == 1:
+            return 0
+        # Stable across processes, unlike `hash()`
+        return zlib.crc32(str(key).encode("utf-8")) % len(self.db_paths)
+
+    def __run(self, index: int, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """
+        Runs `operation` with the connection of shard `index`, under the lock of the shard.
+        """
+        with self.__locks[index]:
+            if self.__pid != os.getpid():
+                # A connection must not be used across a fork, the child gets its own
+                self.__open()
+            try:
+                return operation(self.__connections[index])
+            except sqlite3.OperationalError as error:
+                # The file was replaced, e.g. by another storage created with `overwrite=True`:
+                # the connection to the removed file is read-only, the operation is run again on the new file
+                if "readonly" not in str(error) or not self.__replaced(index):
+                    raise
+                self.__connections[index].close()
+                self.__connections[index] = sqlite3.connect(
+                    self.db_paths[index], isolation_level=None, check_same_thread=False
+                )
+                self.__inodes[index] = os.stat(self.db_paths[index]).st_ino
+                return operation(self.__connections[index])
+
+    def close(self):
+        """
+        Closes the connections, the storage must not be used afterwards.
+        """
+        for index, conn in enumerate(self.__connections):
+            with self.__locks[index]:
+                conn.close()
 
     @classmethod
     def init(cls, db_path: str, table_name: str, overwrite: bool = False):
@@ -55,6 +141,7 @@ class SQLite3_Storage(Storage):
         cursor = conn.cursor()
         cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} (key TEXT PRIMARY KEY, value TEXT)")
         conn.commit()
+        conn.close()
 
     @classmethod
     def validate_db_path(cls, db_path: str):
@@ -88,10 +175,10 @@ class SQLite3_Storage(Storage):
         Returns:
         Any: The value associated with the given key, or None if the key does not exist.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT value FROM {self.table_name} WHERE key=?", (key,))
-        result = cursor.fetchone()
+        result = self.__run(
+            self.__shard(key),
+            lambda conn: conn.execute(f"SELECT value FROM {self.table_name} WHERE key=?", (key,)).fetchone()
+        )
         if result:
             return json.loads(result[0])
         return None
@@ -104,11 +191,41 @@ class SQLite3_Storage(Storage):
         key (str): The key to set the value for.
         value (Any): The value to set.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"INSERT OR REPLACE INTO {self.table_name} (key, value) VALUES (?, ?)",
-                       (key, json.dumps(value)))
-        conn.commit()
+        self.__run(self.__shard(key), lambda conn: conn.execute(
+            f"INSERT OR REPLACE INTO {self.table_name} (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        ))
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        """
+        Counts `amount` requests of `key` like `Storage.check_and_increment`, in one transaction.
+
+        `BEGIN IMMEDIATE` takes the write lock of the database file before the read,
+        the concurrent checks of other processes wait for it and are never lost.
+        """
+        def check(conn: sqlite3.Connection) -> dict:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(f"SELECT value FROM {self.table_name} WHERE key=?", (key,)).fetchone()
+                item = json.loads(row[0]) if row else None
+                if item is None or current_time - item.get("start_time") > time_window:
+                    item = {"start_time": current_time, "num_requests": amount}
+                elif limit is not None and item["num_requests"] > limit:
+                    conn.execute("COMMIT")
+                    return item
+                else:
+                    item["num_requests"] += amount
+                conn.execute(f"INSERT OR REPLACE INTO {self.table_name} (key, value) VALUES (?, ?)",
+                             (key, json.dumps(item)))
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            return item
+
+        return self.__run(self.__shard(key), check)
 
     def drop(self, key: str):
         """
@@ -117,19 +234,14 @@ class SQLite3_Storage(Storage):
         Args:
         key (str): The key to delete the value for.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"DELETE FROM {self.table_name} WHERE key=?", (key,))
-        conn.commit()
+        self.__run(self.__shard(key), lambda conn: conn.execute(f"DELETE FROM {self.table_name} WHERE key=?", (key,)))
 
     def clear(self):
         """
         Deletes all key-value pairs from the SQLite3 database.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"DELETE FROM {self.table_name}")
-        conn.commit()
+        for index in range(len(self.db_paths)):
+            self.__run(index, lambda conn: conn.execute(f"DELETE FROM {self.table_name}"))
 
     def keys(self) -> list[str]:
         """
@@ -138,7 +250,43 @@ class SQLite3_Storage(Storage):
         Returns:
         list[str]: A list of all keys in the SQLite3 database.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT key FROM {self.table_name}")
-        return [row[0] for row in cursor.fetchall()]
+        keys = []
+        for index in range(len(self.db_paths)):
+            rows = self.__run(index, lambda conn: conn.execute(f"SELECT key FROM {self.table_name}").fetchall())
+            keys.extend(row[0] for row in rows)
+        return keys
+
+    def scan(self, cursor: Optional[tuple] = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        """
+        Returns one page of at most `count` key-value pairs, in key order within each database file.
+
+        Args:
+        cursor (tuple, optional): None for the first page, then the cursor returned with the previous page.
+        count (int, optional): The maximum number of pairs per page. Defaults to 100.
+        prefix (str, optional): Only returns the keys starting with `prefix`. Defaults to None.
+
+        Returns:
+        tuple: The cursor of the next page, (database index, last key), None after the last page,
+            and the [(key, value), ...] of this page.
+        """
+        if count <= 0:
+            raise ValueError(f"Invalid count: {count}")
+        index, last_key = cursor if cursor is not None else (0, None)
+        conditions, params = [], []
+        if last_key is not None:
+            conditions.append("key > ?")
+            params.append(last_key)
+        if prefix:
+            # The lower bound seeks to the prefix, the substring filters the keys after it
+            conditions.append("key >= ? AND substr(key, 1, ?) = ?")
+            params.extend((prefix, len(prefix), prefix))
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self.__run(index, lambda conn: conn.execute(
+            f"SELECT key, value FROM {self.table_name} {where}ORDER BY key LIMIT ?", (*params, count)
+        ).fetchall())
+        items = [(key, json.loads(value)) for key, value in rows]
+        if len(items) == count:
+            return (index, items[-1][0]), items
+        if index + 1 < len(self.db_paths):
+            return (index + 1, None), items
+        return None, items
@@ -1,5 +1,7 @@
+import heapq
+import inspect
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable, Optional
 
 
 class Storage(ABC):
@@ -13,7 +15,27 @@ class Storage(ABC):
 
     set(key: str, value: Any) -> None
         Sets the value associated with the key.
+
+    get_many(keys: list) -> list
+        Gets the values associated with the keys, in one round trip when the storage supports it.
+
+    set_many(items: dict) -> None
+        Sets the values associated with the keys, in one round trip when the storage supports it.
+
+    check_and_increment(key: str, current_time: float, time_window: float, amount: int = 1, limit: int = None) -> dict
+        Starts a new window or counts `amount` more requests for the key, atomically when the storage supports it.
+        Nothing is written once the window counts more than `limit` requests.
+
+    scan(cursor: Any = None, count: int = 100, prefix: Optional[str] = None) -> tuple[Any, list]
+        Returns one page of key-value pairs and the cursor of the next page.
+
+    Attributes:
+    -----------
+    persistent : bool
+        True if the state outlives the process or is shared with other processes/hosts,
+        rate limiters then default to the wall clock instead of a monotonic clock.
     """
+    persistent: bool = False
 
     @abstractmethod
     def get(self, key: str) -> Any:
@@ -71,3 +93,134 @@ class Storage(ABC):
         Returns all the keys in the storage.
         """
         pass
+
+    def get_many(self, keys: list) -> list:
+        """
+        Gets the values associated with the keys.
+
+        Storages with a round trip per call (e.g. over the network) should override this method to batch the calls.
+
+        Parameters
+        ----------
+        keys : list
+            The keys to get the values for.
+
+        Returns
+        -------
+        list
+            The values associated with the keys, in the same order, None for missing keys.
+        """
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items: dict) -> None:
+        """
+        Sets the values associated with the keys.
+
+        Storages with a round trip per call (e.g. over the network) should override this method to batch the calls.
+
+        Parameters
+        ----------
+        items : dict
+            The key-value pairs to set.
+        """
+        for key, value in items.items():
+            self.set(key, value)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        """
+        Starts a new window for the key if it has none or its window has passed,
+        otherwise increments the number of requests of the current window by `amount`.
+
+        With `limit`, a window already counting more than `limit` requests is returned as is, without writing:
+        the count saturates at the first request over the limit, and the denied requests only read the storage.
+
+        Storages able to run this on the server side (e.g. a script) should override this method,
+        this makes the check atomic across processes and saves a round trip.
+
+        Parameters
+        ----------
+        key : str
+            The key to count the request for.
+        current_time : float
+            The time of the request.
+        time_window : float
+            The length of a window in seconds.
+        amount : int
+            The number of requests to count, default is 1.
+        limit : int, optional
+            The maximum number of requests of a window, default is None (always count).
+
+        Returns
+        -------
+        dict
+            The updated value, {"start_time": float, "num_requests": int}.
+        """
+        item = self.get(key)
+        if item is None or current_time - item.get("start_time") > time_window:
+            item = {"start_time": current_time, "num_requests": amount}
+        elif limit is not None and item["num_requests"] > limit:
+            return item
+        else:
+            item["num_requests"] += amount
+        self.set(key, item)
+        return item
+
+    def scan(self, cursor: Any = None, count: int = 100, prefix: Optional[str] = None) -> tuple[Any, list]:
+        """
+        Returns one page of at most `count` key-value pairs, without loading the whole storage at once.
+
+        Start with `cursor=None` and pass the returned cursor to get the next page, until the cursor is None.
+        The cursor is opaque, its type depends on the storage. A page may be empty before the last one.
+        Keys set or dropped during a scan may or may not be returned.
+
+        This default implementation pages through the keys in lexicographic order, the cursor is the last key
+        of the previous page. It lists every key for every page, a whole scan is quadratic: it is only a
+        fallback for third-party storages, every storage of pygrl overrides it with a cursor into its keys.
+
+        Parameters
+        ----------
+        cursor : Any
+            None for the first page, then the cursor returned with the previous page.
+        count : int
+            The maximum number of pairs per page, default is 100.
+        prefix : str, optional
+            Only returns the keys starting with `prefix`.
+
+        Returns
+        -------
+        tuple[Any, list]
+            The cursor of the next page (None after the last page) and the [(key, value), ...] of this page.
+        """
+        if count <= 0:
+            raise ValueError(f"Invalid count: {count}")
+        keys = (
+            key for key in self.keys()
+            if (cursor is None or key > cursor) and (prefix is None or key.startswith(prefix))
+        )
+        page = heapq.nsmallest(count, keys)
+        values = self.get_many(page)
+        # Skips the keys dropped since they were listed
+        items = [(key, value) for key, value in zip(page, values) if value is not None]
+        return (page[-1] if len(page) == count else None), items
+
+
+def check_and_increment_of(storage: Storage) -> Callable[..., dict]:
+    """
+    Returns `storage.check_and_increment`, callable with `limit` even if the storage overrides it without `limit`:
+    the `limit` is then dropped and every request is counted. Wrapping storages call their inner storages through it.
+    """
+    check_and_increment = storage.check_and_increment
+    try:
+        if "limit" in inspect.signature(check_and_increment).parameters:
+            return check_and_increment
+    except (TypeError, ValueError):
+        pass
+
+    def legacy_check_and_increment(
+            key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        return check_and_increment(key, current_time, time_window, amount)
+
+    return legacy_check_and_increment
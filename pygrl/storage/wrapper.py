@@ -0,0 +1,52 @@
+from typing import Any, Optional
+from .storage import Storage, check_and_increment_of
+
+
+class StorageWrapper(Storage):
+    """
+    StorageWrapper is a subclass of the Storage abstract base class.
+    It forwards every call to `storage`, the base of the storages observing another one (metrics, tracing).
+
+    Subclasses override the methods they observe and call the same method of `super()` to forward it.
+
+    Attributes:
+    storage (Storage): The wrapped storage.
+    """
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+        self.__check_and_increment = check_and_increment_of(storage)
+
+    @property
+    def persistent(self) -> bool:
+        return self.storage.persistent
+
+    def get(self, key: str):
+        return self.storage.get(key)
+
+    def set(self, key: str, value: Any):
+        self.storage.set(key, value)
+
+    def drop(self, key: str):
+        self.storage.drop(key)
+
+    def clear(self):
+        self.storage.clear()
+
+    def keys(self) -> list:
+        return self.storage.keys()
+
+    def get_many(self, keys: list) -> list:
+        return self.storage.get_many(keys)
+
+    def set_many(self, items: dict) -> None:
+        self.storage.set_many(items)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        # The wrapped storage may override `check_and_increment` without `limit`
+        return self.__check_and_increment(key, current_time, time_window, amount, limit)
+
+    def scan(self, cursor: Any = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        return self.storage.scan(cursor, count, prefix)
@@ -0,0 +1,101 @@
+from time import perf_counter_ns
+from typing import Any, Callable, ContextManager, Optional
+from .storage import Storage, StorageWrapper
+
+# tracer(operation, key) returns the context manager wrapping one call, key is None for the calls without a key
+Tracer = Callable[[str, Optional[str]], ContextManager]
+
+
+class Hooks:
+    """
+    Tracer calling `before` and `after` around every call, for profilers without a span API.
+
+    Attributes:
+    before (Callable[[str, Optional[str]], Any], optional): Called with (operation, key) before the call.
+    after (Callable[[str, Optional[str], int, Optional[BaseException]], Any], optional):
+        Called with (operation, key, duration in nanoseconds, raised exception or None) after the call.
+    """
+    __slots__ = ("before", "after")
+
+    def __init__(self, before: Optional[Callable] = None, after: Optional[Callable] = None):
+        self.before = before
+        self.after = after
+
+    def __call__(self, operation: str, key: Optional[str]) -> ContextManager:
+        return _HookSpan(self, operation, key)
+
+
+class _HookSpan:
+    __slots__ = ("hooks", "operation", "key", "start")
+
+    def __init__(self, hooks: Hooks, operation: str, key: Optional[str]):
+        self.hooks = hooks
+        self.operation = operation
+        self.key = key
+
+    def __enter__(self):
+        if self.hooks.before is not None:
+            self.hooks.before(self.operation, self.key)
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.hooks.after is not None:
+            self.hooks.after(self.operation, self.key, perf_counter_ns() - self.start, exc)
+        return False
+
+
+class TracedStorage(StorageWrapper):
+    """
+    TracedStorage is a subclass of StorageWrapper.
+    It forwards every call to `storage` inside `tracer(operation, key)`.
+
+    Attributes:
+    storage (Storage): The storage being traced.
+    tracer (Tracer): Returns the context manager entered around each call, e.g. a span of the current trace.
+
+    Notes:
+    The operations are named "storage.<method>", e.g. "storage.check_and_increment".
+    """
+
+    def __init__(self, storage: Storage, tracer: Tracer):
+        super().__init__(storage)
+        self.tracer = tracer
+
+    def get(self, key: str):
+        with self.tracer("storage.get", key):
+            return super().get(key)
+
+    def set(self, key: str, value: Any):
+        with self.tracer("storage.set", key):
+            super().set(key, value)
+
+    def drop(self, key: str):
+        with self.tracer("storage.drop", key):
+            super().drop(key)
+
+    def clear(self):
+        with self.tracer("storage.clear", None):
+            super().clear()
+
+    def keys(self) -> list:
+        with self.tracer("storage.keys", None):
+            return super().keys()
+
+    def get_many(self, keys: list) -> list:
+        with self.tracer("storage.get_many", None):
+            return super().get_many(keys)
+
+    def set_many(self, items: dict) -> None:
+        with self.tracer("storage.set_many", None):
+            super().set_many(items)
+
+    def check_and_increment(
+            self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+    ) -> dict:
+        with self.tracer("storage.check_and_increment", key):
+            return super().check_and_increment(key, current_time, time_window, amount, limit)
+
+    def scan(self, cursor: Any = None, count: int = 100, prefix: Optional[str] = None) -> tuple:
+        with self.tracer("storage.scan", None):
+            return super().scan(cursor, count, prefix)
@@ -10,7 +10,7 @@ VERSION = '0.0.6.5'
 setup(
     name='pygrl',
     version=VERSION,
-    packages=find_packages(),
+    packages=find_packages(exclude=("tests*", "benchmarks*")),
     description=DESCRIPTION,
     long_description=open('README.md').read(),
     long_description_content_type='text/markdown',
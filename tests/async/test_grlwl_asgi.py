@@ -0,0 +1,96 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock
+from pygrl.middleware import ASGIMiddleware, Rule
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return "lifespan"
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def request(middleware, path="/", method="GET", headers=(), client=("10.0.0.1", 1234)):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers), "client": client}
+    await middleware(scope, receive, send)
+    start = messages[0]
+    return start["status"], dict(start["headers"]), messages[1]["body"]
+
+
+@pytest.mark.asyncio
+async def test_grlwl_asgi_limit():
+    clock = ManualClock(100.0)
+    middleware = ASGIMiddleware(app, BasicStorage(), [Rule("/login", 2, 60, methods=["POST"])], clock=clock)
+    status, headers, body = await request(middleware, "/login", "POST")
+    assert (status, body) == (200, b"ok")
+    assert headers[b"content-type"] == b"text/plain"
+    assert (headers[b"x-ratelimit-limit"], headers[b"x-ratelimit-remaining"], headers[b"x-ratelimit-reset"]) == (
+        b"2", b"1", b"60"
+    )
+    clock.advance(10.5)
+    assert (await request(middleware, "/login", "POST"))[1][b"x-ratelimit-remaining"] == b"0"
+    status, headers, body = await request(middleware, "/login", "POST")
+    assert (status, body) == (429, b"Rate limit exceeded.")
+    assert headers[b"retry-after"] == b"50" and headers[b"x-ratelimit-reset"] == b"50"
+    # Another client, another method, another path
+    assert (await request(middleware, "/login", "POST", client=("10.0.0.2", 1)))[0] == 200
+    assert (await request(middleware, "/login", "GET"))[0] == 200
+    assert b"x-ratelimit-limit" not in (await request(middleware, "/other"))[1]
+    clock.advance(50)
+    assert (await request(middleware, "/login", "POST"))[0] == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key,headers,same_client", [
+    ("header:X-API-Key", [(b"x-api-key", b"token-1")], [(b"x-api-key", b"token-1")]),
+    ("forwarded", [(b"x-forwarded-for", b"1.2.3.4, 10.0.0.9")], [(b"x-forwarded-for", b"1.2.3.4")]),
+    (lambda scope: "everyone", [], []),
+])
+async def test_grlwl_asgi_keys(key, headers, same_client):
+    middleware = ASGIMiddleware(app, BasicStorage(), [Rule("*", 1, 60, key=key)], clock=ManualClock())
+    assert (await request(middleware, headers=headers, client=("10.0.0.1", 1)))[0] == 200
+    # Another address, same key
+    assert (await request(middleware, headers=same_client, client=("10.0.0.2", 1)))[0] == 429
+
+
+@pytest.mark.asyncio
+async def test_grlwl_asgi_header_fallback_and_passthrough():
+    middleware = ASGIMiddleware(app, BasicStorage(), [Rule("*", 1, 60, key="header:x-api-key")],
+                                headers=False, clock=ManualClock())
+    status, headers, _ = await request(middleware)
+    assert status == 200 and b"x-ratelimit-limit" not in headers
+    # Without the header, the key is the client address
+    assert (await request(middleware, client=("10.0.0.2", 1)))[0] == 200
+    assert (await request(middleware))[0] == 429
+    assert await middleware({"type": "lifespan"}, None, None) == "lifespan"
+
+
+@pytest.mark.asyncio
+async def test_grlwl_asgi_cleanup_keeps_longer_windows():
+    clock = ManualClock()
+    storage = BasicStorage()
+    middleware = ASGIMiddleware(app, storage, [Rule("/slow", 1, 3600), Rule("*", 100, 1)],
+                                clock=clock, max_capacity=0, cleanup_interval=1)
+    assert (await request(middleware, "/slow"))[0] == 200
+    clock.advance(60)
+    await request(middleware, "/fast")
+    assert "/slow:10.0.0.1" in storage.keys()
+    assert (await request(middleware, "/slow"))[0] == 429
+
+
+@pytest.mark.asyncio
+async def test_grlwl_check_limit_state():
+    clock = ManualClock(100.0)
+    rate_limiter = grl(BasicStorage(), max_requests=1, time_window=10, clock=clock, negative_cache=4)
+    assert await rate_limiter.check_limit_state("key") == (True, 0, 10.0)
+    clock.advance(4)
+    assert await rate_limiter.check_limit_state("key") == (False, 0, 6.0)
+    assert await rate_limiter.check_limit_state("key") == (False, 0, 6.0)
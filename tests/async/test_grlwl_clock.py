@@ -0,0 +1,42 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock, ExceededRateLimitError
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_requests,time_window", [(3, 3), (10, 5), (5, 4)])
+async def test_grlwl_clock_check_limit_w_same_key(max_requests: int, time_window: int):
+    clock = ManualClock(1000.0)
+    rate_limiter = grl(STORAGE, max_requests=max_requests, time_window=time_window, clock=clock)
+    for _ in range(max_requests):
+        assert await rate_limiter.check_limit("key")
+    assert not await rate_limiter.check_limit("key")
+    clock.advance(time_window)
+    assert not await rate_limiter.check_limit("key")
+    clock.advance(0.001)
+    assert await rate_limiter.check_limit("key")
+
+
+@pytest.mark.asyncio
+async def test_grlwl_clock_decorator():
+    clock = ManualClock()
+
+    @grl.general_rate_limiter(STORAGE, 2, 60, clock=clock)
+    async def function():
+        return True
+
+    await function()
+    await function()
+    with pytest.raises(ExceededRateLimitError):
+        await function()
+    clock.advance(61)
+    assert await function()
@@ -0,0 +1,12 @@
+import pytest
+from pygrl import GeneralRateLimiter_with_Lock as grl, ManualClock
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_requests,number_of_request", [(1, 10), (5, 50), (10, 10)])
+async def test_grlwl_denied_checks_do_not_write(counting_storage, max_requests: int, number_of_request: int):
+    storage = counting_storage()
+    rate_limiter = grl(storage, max_requests=max_requests, time_window=60, clock=ManualClock())
+    decisions = [await rate_limiter.check_limit("key") for _ in range(number_of_request)]
+    assert decisions == [i < max_requests for i in range(number_of_request)]
+    assert storage.writes == min(number_of_request, max_requests + 1)
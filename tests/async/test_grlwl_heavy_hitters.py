@@ -0,0 +1,23 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+@pytest.mark.asyncio
+async def test_grlwl_heavy_hitters_top_keys():
+    rate_limiter = grl(STORAGE, max_requests=5, time_window=60, heavy_hitters=8, clock=ManualClock())
+    assert grl(STORAGE, max_requests=5).top_keys() is None
+    for key_index, number_of_request in enumerate([3, 20, 7, 1]):
+        for _ in range(number_of_request):
+            await rate_limiter.check_limit(key_index)
+    assert rate_limiter.top_keys(2) == [("1", 20), ("2", 7)]
+    assert rate_limiter.top_keys(10, denied=True) == [("1", 15), ("2", 2)]
@@ -0,0 +1,25 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_size", [1, 10, 1000])
+async def test_grlwl_iter_info(batch_size: int):
+    rate_limiter = grl(STORAGE, max_requests=5, time_window=60, max_capacity=1000, clock=ManualClock())
+    for key_index in range(120):
+        await rate_limiter.check_limit(f"user:{key_index}" if key_index % 3 else f"ip:{key_index}")
+    items = {key: value async for key, value in rate_limiter.iter_info(batch_size)}
+    info = await rate_limiter.info()
+    assert items == dict(zip(info["keys"], info["values"]))
+    users = [key async for key, _ in rate_limiter.iter_info(batch_size, prefix="user:")]
+    assert len(users) == 80 and all(key.startswith("user:") for key in users)
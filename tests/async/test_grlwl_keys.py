@@ -0,0 +1,18 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ExceededRateLimitError, ManualClock
+
+
+@pytest.mark.asyncio
+async def test_grlwl_decorator_key_args():
+    @grl.general_rate_limiter(
+        BasicStorage(), max_requests=2, time_window=60, key_args=["username", 1], clock=ManualClock()
+    )
+    async def connect(username: str, host: str, port: int = 3306):
+        return f"{username}@{host}:{port}"
+
+    for _ in range(2):
+        assert await connect("alice", "db") == "alice@db:3306"
+        assert await connect("alice", host="cache") == "alice@cache:3306"
+    with pytest.raises(ExceededRateLimitError):
+        await connect(username="alice", host="db", port=1)
+    assert await connect("bob", "db") == "bob@db:3306"
@@ -0,0 +1,45 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+@pytest.mark.asyncio
+async def test_grlwl_metrics_disabled_by_default():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1)
+    assert await rate_limiter.check_limit("key")
+    assert rate_limiter.stats() is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_requests,number_of_request", [(3, 5), (10, 10), (1, 4)])
+async def test_grlwl_metrics_allowed_denied(max_requests: int, number_of_request: int):
+    rate_limiter = grl(STORAGE, max_requests=max_requests, time_window=60, metrics=True, clock=ManualClock())
+    for _ in range(number_of_request):
+        await rate_limiter.check_limit("key")
+    stats = rate_limiter.stats()
+    assert stats["allowed"] == min(max_requests, number_of_request)
+    assert stats["denied"] == max(0, number_of_request - max_requests)
+    assert stats["storage"]["check_and_increment"]["calls"] == number_of_request
+
+
+@pytest.mark.asyncio
+async def test_grlwl_metrics_cleanup():
+    clock = ManualClock()
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1, max_capacity=4, cleanup_threshold=10,
+                       clock=clock, metrics=True)
+    for key_index in range(4):
+        await rate_limiter(key_index)
+    clock.advance(10.5)
+    await rate_limiter("new")
+    stats = rate_limiter.stats()
+    assert (stats["allowed"], stats["cleanup_runs"], stats["evicted"]) == (5, 1, 4)
+    assert STORAGE.keys() == ["new"]
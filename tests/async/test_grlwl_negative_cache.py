@@ -0,0 +1,37 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_requests,number_of_request", [(1, 10), (5, 100), (10, 10)])
+async def test_grlwl_negative_cache_skips_storage(counting_storage, max_requests: int, number_of_request: int):
+    storage = counting_storage()
+    clock = ManualClock()
+    rate_limiter = grl(storage, max_requests=max_requests, time_window=10, negative_cache=16, clock=clock)
+    decisions = [await rate_limiter.check_limit("key") for _ in range(number_of_request)]
+    assert decisions == [i < max_requests for i in range(number_of_request)]
+    assert storage.calls == min(number_of_request, max_requests + 1)
+    clock.advance(10.5)
+    assert await rate_limiter.check_limit("key")
+
+
+@pytest.mark.asyncio
+async def test_grlwl_negative_cache_with_metrics():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, negative_cache=8, metrics=True, clock=ManualClock())
+    for _ in range(5):
+        await rate_limiter.check_limit("key")
+    stats = rate_limiter.stats()
+    assert (stats["allowed"], stats["denied"]) == (1, 4)
+    assert stats["storage"]["check_and_increment"]["calls"] == 2
+    await rate_limiter.reset()
+    assert await rate_limiter.check_limit("key")
@@ -0,0 +1,38 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock, rate_limit
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("handler_is_async", [False, True])
+async def test_grlwl_on_limited(handler_is_async: bool):
+    calls = []
+
+    def on_limited(key, args, kwargs):
+        calls.append(key)
+        return None
+
+    async def on_limited_async(key, args, kwargs):
+        return on_limited(key, args, kwargs)
+
+    @grl.general_rate_limiter(BasicStorage(), max_requests=1, time_window=60, key_args=[0], clock=ManualClock(),
+                              on_limited=on_limited_async if handler_is_async else on_limited)
+    async def fetch(url: str) -> str:
+        return url
+
+    assert [await fetch("a"), await fetch("a"), await fetch("b")] == ["a", None, "b"]
+    assert calls == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_grlwl_on_limited_async_generator():
+    calls = []
+
+    @rate_limit(BasicStorage(), max_requests=1, time_window=60, clock=ManualClock(),
+                on_limited=lambda key, args, kwargs: calls.append(key))
+    async def stream(n: int):
+        for index in range(n):
+            yield index
+
+    assert [item async for item in stream(2)] == [0, 1]
+    assert [item async for item in stream(2)] == []
+    assert calls == ["stream"]
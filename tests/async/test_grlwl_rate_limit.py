@@ -0,0 +1,48 @@
+import inspect
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ExceededRateLimitError, ManualClock, rate_limit
+
+
+@pytest.mark.asyncio
+async def test_grlwl_rate_limit_coroutine():
+    @rate_limit(BasicStorage(), max_requests=2, time_window=60, key_args=["user_id"], clock=ManualClock())
+    async def read_user(user_id: int, verbose: bool = False) -> dict:
+        """Reads a user."""
+        return {"user_id": user_id}
+
+    assert inspect.iscoroutinefunction(read_user)
+    assert read_user.__name__ == "read_user" and read_user.__doc__ == "Reads a user."
+    assert list(inspect.signature(read_user).parameters) == ["user_id", "verbose"]
+    for _ in range(2):
+        assert await read_user(1) == {"user_id": 1}
+    with pytest.raises(ExceededRateLimitError):
+        await read_user(user_id=1)
+    assert await read_user(2) == {"user_id": 2}
+
+
+@pytest.mark.asyncio
+async def test_grlwl_rate_limit_async_generator():
+    @rate_limit(BasicStorage(), max_requests=1, time_window=60, clock=ManualClock())
+    async def stream(n: int):
+        for index in range(n):
+            yield index
+
+    assert inspect.isasyncgenfunction(stream)
+    assert stream.__name__ == "stream"
+    assert [item async for item in stream(3)] == [0, 1, 2]
+    # Checked when the iteration starts
+    iterator = stream(3)
+    with pytest.raises(ExceededRateLimitError):
+        await iterator.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_grlwl_rate_limit_sync_function():
+    # A sync function decorated from the async class is not awaited
+    @grl.general_rate_limiter(BasicStorage(), max_requests=1, time_window=60, clock=ManualClock())
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    assert add(1, 2) == 3
+    with pytest.raises(ExceededRateLimitError):
+        add(1, 2)
@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter_with_Lock as grl, ManualClock
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+@pytest.mark.asyncio
+async def test_grlwl_tracing_check_limit():
+    events = []
+
+    @contextmanager
+    def tracer(operation, key):
+        events.append((operation, key))
+        yield
+
+    assert grl(STORAGE, max_requests=1).check_limit.__func__ is grl.check_limit
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, tracer=tracer, clock=ManualClock())
+    assert await rate_limiter("key")
+    assert not await rate_limiter.check_limit("key")
+    assert events == [
+        ("check_limit", "key"), ("storage.check_and_increment", "key"),
+        ("cleanup", None), ("storage.keys", None),
+        ("check_limit", "key"), ("storage.check_and_increment", "key"),
+    ]
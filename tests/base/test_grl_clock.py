@@ -0,0 +1,88 @@
+import time
+import pytest
+from pygrl import (
+    BasicStorage, SQLite3_Storage, LeasedStorage, GeneralRateLimiter as grl, ManualClock, ExceededRateLimitError
+)
+from pygrl.clock import default_clock
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+@pytest.mark.parametrize("max_requests,time_window", [(3, 3), (10, 5), (5, 4)])
+def test_grl_clock_check_limit_w_same_key(max_requests: int, time_window: int):
+    clock = ManualClock(1000.0)
+    rate_limiter = grl(STORAGE, max_requests=max_requests, time_window=time_window, clock=clock)
+    for _ in range(max_requests):
+        assert rate_limiter.check_limit("key")
+    assert not rate_limiter.check_limit("key")
+    # Still within the window
+    clock.advance(time_window)
+    assert not rate_limiter.check_limit("key")
+    # The window has passed
+    clock.advance(0.001)
+    assert rate_limiter.check_limit("key")
+
+
+@pytest.mark.parametrize("max_requests,time_window,number_of_key", [(5, 5, 3), (10, 5, 1000), (3, 3, 7)])
+def test_grl_clock_check_limit_w_different_key(max_requests: int, time_window: int, number_of_key: int):
+    clock = ManualClock()
+    rate_limiter = grl(STORAGE, max_requests=max_requests, time_window=time_window, clock=clock)
+    for _ in range(max_requests):
+        for key_index in range(number_of_key):
+            assert rate_limiter.check_limit(key_index)
+    clock.advance(time_window)
+    for key_index in range(number_of_key):
+        assert not rate_limiter.check_limit(key_index)
+    clock.advance(0.001)
+    for key_index in range(number_of_key):
+        assert rate_limiter.check_limit(key_index)
+
+
+def test_grl_clock_cleanup():
+    clock = ManualClock()
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1, max_capacity=4, cleanup_threshold=10, clock=clock)
+    for key_index in range(4):
+        rate_limiter(key_index)
+    clock.advance(10.5)
+    # Over capacity, the keys idle for longer than `cleanup_threshold` are dropped
+    rate_limiter("new")
+    assert STORAGE.keys() == ["new"]
+
+
+def test_grl_clock_decorator():
+    clock = ManualClock()
+
+    @grl.general_rate_limiter(STORAGE, 2, 60, clock=clock)
+    def function():
+        return True
+
+    function()
+    function()
+    with pytest.raises(ExceededRateLimitError):
+        function()
+    clock.advance(61)
+    assert function()
+
+
+def test_grl_clock_never_goes_backwards():
+    clock = ManualClock(10)
+    with pytest.raises(ValueError):
+        clock.advance(-1)
+    with pytest.raises(ValueError):
+        clock.set(5)
+
+
+def test_grl_default_clock():
+    assert default_clock(BasicStorage()) is time.monotonic
+    assert default_clock(LeasedStorage(BasicStorage())) is time.monotonic
+    sqlite3_storage = SQLite3_Storage("./test_grl_clock.db", overwrite=True)
+    assert default_clock(sqlite3_storage) is time.time
+    assert default_clock(LeasedStorage(sqlite3_storage)) is time.time
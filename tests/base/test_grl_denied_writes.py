@@ -0,0 +1,35 @@
+from contextlib import nullcontext
+import pytest
+from pygrl import BasicStorage, ShardedStorage, GeneralRateLimiter as grl, ManualClock
+
+
+class LegacyStorage(BasicStorage):
+    """
+    Overrides `check_and_increment` without `limit`.
+    """
+    def check_and_increment(self, key, current_time, time_window, amount=1):
+        return super().check_and_increment(key, current_time, time_window, amount)
+
+
+@pytest.mark.parametrize("max_requests,number_of_request", [(1, 10), (5, 50), (10, 10)])
+@pytest.mark.parametrize("metrics", [False, True])
+def test_grl_denied_checks_do_not_write(counting_storage, max_requests: int, number_of_request: int, metrics: bool):
+    storage = counting_storage()
+    rate_limiter = grl(storage, max_requests=max_requests, time_window=60, metrics=metrics, clock=ManualClock())
+    decisions = [rate_limiter.check_limit("key") for _ in range(number_of_request)]
+    assert decisions == [i < max_requests for i in range(number_of_request)]
+    assert storage.writes == min(number_of_request, max_requests + 1)
+    assert storage.get("key")["num_requests"] == min(number_of_request, max_requests + 1)
+
+
+@pytest.mark.parametrize("options", [{}, {"metrics": True}, {"tracer": lambda operation, key: nullcontext()}])
+@pytest.mark.parametrize("sharded", [False, True])
+def test_grl_denied_checks_legacy_storage(options: dict, sharded: bool):
+    storage = LegacyStorage()
+    # The wrapping storages accept `limit` but must not pass it to the legacy storage
+    wrapped = ShardedStorage([storage, BasicStorage()]) if sharded else storage
+    rate_limiter = grl(wrapped, max_requests=2, time_window=60, clock=ManualClock(), **options)
+    decisions = [rate_limiter.check_limit("key") for _ in range(5)]
+    assert decisions == [True, True, False, False, False]
+    # Every request is counted
+    assert storage.get("key")["num_requests"] == 5
@@ -0,0 +1,75 @@
+import random
+from collections import Counter
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ManualClock
+from pygrl.heavy_hitters import SpaceSaving
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+def test_grl_space_saving_exact_below_capacity():
+    sketch = SpaceSaving(10)
+    for key, count in [("a", 5), ("b", 3), ("c", 8)]:
+        for _ in range(count):
+            sketch.add(key)
+    assert sketch.top(2) == [("c", 8, 0), ("a", 5, 0)]
+    assert sketch.total == 16
+    assert len(sketch) == 3
+
+
+@pytest.mark.parametrize("capacity,seed", [(16, 0), (64, 1), (256, 2)])
+def test_grl_space_saving_bounded_error(capacity: int, seed: int):
+    rng = random.Random(seed)
+    stream = [f"key-{min(int(rng.paretovariate(1.0)), 10_000)}" for _ in range(50_000)]
+    truth = Counter(stream)
+    sketch = SpaceSaving(capacity)
+    for key in stream:
+        sketch.add(key)
+    assert len(sketch) == capacity
+    bound = len(stream) / capacity
+    tracked = {key: (count, error) for key, count, error in sketch.top(capacity)}
+    for key, (count, error) in tracked.items():
+        assert truth[key] <= count <= truth[key] + error
+        assert error <= bound
+    # Every key heavier than total / capacity is tracked
+    for key, count in truth.items():
+        if count > bound:
+            assert key in tracked
+    assert sketch.top(1)[0][0] == truth.most_common(1)[0][0]
+
+
+def test_grl_heavy_hitters_disabled_by_default():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1)
+    rate_limiter.check_limit("key")
+    assert rate_limiter.top_keys() is None
+    assert rate_limiter.check_limit.__func__ is grl.check_limit
+
+
+def test_grl_heavy_hitters_top_keys():
+    rate_limiter = grl(STORAGE, max_requests=5, time_window=60, heavy_hitters=8, clock=ManualClock())
+    for key_index, number_of_request in enumerate([3, 20, 7, 1]):
+        for _ in range(number_of_request):
+            rate_limiter.check_limit(key_index)
+    assert rate_limiter.top_keys(2) == [("1", 20), ("2", 7)]
+    assert rate_limiter.top_keys(10, denied=True) == [("1", 15), ("2", 2)]
+    # Fixed memory whatever the number of keys
+    for key_index in range(1000):
+        rate_limiter.check_limit(f"other-{key_index}")
+    assert len(rate_limiter.top_keys(100)) == 8
+    assert rate_limiter.top_keys(1, denied=True) == [("1", 15)]
+
+
+def test_grl_heavy_hitters_with_metrics():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, metrics=True, heavy_hitters=4, clock=ManualClock())
+    rate_limiter("key")
+    rate_limiter("key")
+    assert rate_limiter.top_keys() == [("key", 2)]
+    assert (rate_limiter.stats()["allowed"], rate_limiter.stats()["denied"]) == (1, 1)
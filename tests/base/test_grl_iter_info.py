@@ -0,0 +1,33 @@
+import pytest
+from pygrl import BasicStorage, SQLite3_Storage, GeneralRateLimiter as grl, ManualClock
+
+
+@pytest.fixture(params=["basic", "sqlite3"])
+def storage(request):
+    if request.param == "basic":
+        return BasicStorage()
+    return SQLite3_Storage("./test_grl_iter_info.db", "storage", overwrite=True)
+
+
+@pytest.mark.parametrize("batch_size", [1, 10, 1000])
+def test_grl_iter_info(storage, batch_size: int):
+    rate_limiter = grl(storage, max_requests=5, time_window=60, max_capacity=1000, clock=ManualClock())
+    for key_index in range(120):
+        rate_limiter.check_limit(f"user:{key_index}" if key_index % 3 else f"ip:{key_index}")
+    info = rate_limiter.info()
+    assert dict(rate_limiter.iter_info(batch_size)) == dict(zip(info["keys"], info["values"]))
+    users = dict(rate_limiter.iter_info(batch_size, prefix="user:"))
+    assert sorted(users) == sorted(key for key in info["keys"] if key.startswith("user:"))
+    assert len(users) == 80
+
+
+def test_grl_iter_info_is_lazy():
+    storage = BasicStorage()
+    rate_limiter = grl(storage, max_requests=5, time_window=60, max_capacity=1000, clock=ManualClock())
+    for key_index in range(10):
+        rate_limiter.check_limit(key_index)
+    iterator = rate_limiter.iter_info(batch_size=4)
+    assert next(iterator)[0] == "0"
+    # Dropped before its batch is fetched
+    storage.drop("9")
+    assert [key for key, _ in iterator] == [str(key_index) for key_index in range(1, 9)]
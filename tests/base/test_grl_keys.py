@@ -0,0 +1,96 @@
+from functools import partial
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ExceededRateLimitError, ManualClock
+from pygrl.keys import key_extractor, key_function
+
+
+def connect(username: str, host: str = "localhost", port: int = 3306, *args, timeout: float = 1.0, **kwargs):
+    return f"{username} connected to {host}:{port}"
+
+
+def positional_only(a, b=2, /, c=3):
+    return a + b + c
+
+
+@pytest.mark.parametrize("key_args,args,kwargs,key", [
+    (["username"], ("alice",), {}, "alice"),
+    (["username"], (), {"username": "bob"}, "bob"),
+    ([0], (), {"username": "bob"}, "bob"),
+    (["port"], ("alice",), {}, 3306),
+    (["port"], ("alice", "db", 5432), {}, 5432),
+    (["username", "host"], ("alice", "db"), {}, "alice,db"),
+    ([0, "port"], ("alice",), {"port": 1}, "alice,1"),
+    (["timeout"], ("alice",), {"timeout": 5}, 5),
+    (["timeout"], ("alice",), {}, 1.0),
+    ([4], ("alice", "db", 1, "extra-3", "extra-4"), {}, "extra-4"),
+    (["tenant"], ("alice",), {"tenant": "acme"}, "acme"),
+])
+def test_grl_key_extractor(key_args, args, kwargs, key):
+    assert key_extractor(connect, key_args)(args, kwargs) == key
+
+
+def test_grl_key_extractor_positional_only():
+    assert key_extractor(positional_only, [0, 1, "c"])((1,), {}) == "1,2,3"
+    assert key_extractor(positional_only, ["c"])((1, 2), {"c": 9}) == 9
+    # Only found by position, a keyword `a` is not this parameter
+    assert key_extractor(positional_only, ["a"])((5,), {"a": 1}) == 5
+
+
+def variadic(a, b, *args, **kwargs):
+    return a
+
+
+@pytest.mark.parametrize("func,key_args", [
+    (variadic, []), (variadic, [-1]), (variadic, ["args"]), (variadic, ["kwargs"]),
+    (positional_only, ["missing"]), (positional_only, [3]),
+])
+def test_grl_key_extractor_invalid(func, key_args):
+    with pytest.raises(ValueError):
+        key_extractor(func, key_args)
+
+
+def test_grl_key_extractor_missing_argument():
+    with pytest.raises(TypeError):
+        key_extractor(connect, ["username"])((), {})
+    with pytest.raises(TypeError):
+        key_extractor(connect, [5])(("alice",), {})
+    with pytest.raises(TypeError):
+        key_extractor(connect, ["tenant"])(("alice",), {})
+
+
+def test_grl_key_function():
+    assert key_function(connect)(("alice",), {}) == "connect"
+    assert key_function(connect)((), {"key": "alice"}) == "alice"
+    assert key_function(connect, key_builder=lambda f, *args, **kwargs: f.__name__ + args[0])(("x",), {}) == "connectx"
+    with pytest.raises(ValueError):
+        key_function(connect, key_builder=lambda f: "key", key_args=["username"])
+
+
+def test_grl_decorator_partial():
+    def greet(greeting: str, key: str = None):
+        return greeting
+
+    g = grl.general_rate_limiter(BasicStorage(), max_requests=1, time_window=60, clock=ManualClock())(
+        partial(greet, "hello")
+    )
+    assert g(key="x") == "hello"
+    assert g(key="y") == "hello"
+    with pytest.raises(ExceededRateLimitError):
+        g(key="x")
+    # Without a key, the key is the repr of the partial
+    assert key_function(partial(greet, "hello"))((), {}).startswith("functools.partial(")
+
+
+def test_grl_decorator_key_args():
+    @grl.general_rate_limiter(BasicStorage(), max_requests=2, time_window=60, key_args=["username"], clock=ManualClock())
+    def login(username: str, password: str):
+        return username
+
+    for _ in range(2):
+        assert login("alice", "secret") == "alice"
+        assert login(password="secret", username="bob") == "bob"
+    with pytest.raises(ExceededRateLimitError):
+        login(username="alice", password="other")
+    with pytest.raises(ExceededRateLimitError):
+        login("bob", "other")
+    assert login("charlie", "secret") == "charlie"
@@ -0,0 +1,134 @@
+import urllib.error
+import urllib.request
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ManualClock
+from pygrl.metrics import Metrics, MeteredStorage, LATENCY_BUCKETS_NS, CONTENT_TYPE, render, start_http_server
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+def test_grl_metrics_disabled_by_default():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1)
+    assert rate_limiter.check_limit("key")
+    assert rate_limiter.stats() is None
+    # The fast path is the plain method
+    assert rate_limiter.check_limit.__func__ is grl.check_limit
+
+
+@pytest.mark.parametrize("max_requests,number_of_request", [(3, 5), (10, 10), (1, 4)])
+def test_grl_metrics_allowed_denied(max_requests: int, number_of_request: int):
+    rate_limiter = grl(STORAGE, max_requests=max_requests, time_window=60, metrics=True, clock=ManualClock())
+    for _ in range(number_of_request):
+        rate_limiter.check_limit("key")
+    stats = rate_limiter.stats()
+    assert stats["allowed"] == min(max_requests, number_of_request)
+    assert stats["denied"] == max(0, number_of_request - max_requests)
+    assert stats["storage"]["check_and_increment"]["calls"] == number_of_request
+    assert stats["storage"]["check_and_increment"]["seconds"] > 0
+
+
+def test_grl_metrics_cleanup():
+    clock = ManualClock()
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1, max_capacity=4, cleanup_threshold=10,
+                       clock=clock, metrics=True)
+    for key_index in range(4):
+        rate_limiter(key_index)
+    # Not over capacity yet, the cleanups did not scan the keys
+    assert rate_limiter.stats()["cleanup_runs"] == 0
+    clock.advance(10.5)
+    rate_limiter("new")
+    stats = rate_limiter.stats()
+    assert (stats["allowed"], stats["denied"]) == (5, 0)
+    assert stats["cleanup_runs"] == 1
+    assert stats["evicted"] == 4
+    assert stats["storage"]["keys"]["calls"] == 5
+    assert stats["storage"]["get"]["calls"] == 5
+    assert stats["storage"]["drop"]["calls"] == 4
+    assert STORAGE.keys() == ["new"]
+
+
+def test_grl_metrics_stats_is_a_copy():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1, metrics=True)
+    stats = rate_limiter.stats()
+    rate_limiter.check_limit("key")
+    assert stats["allowed"] == 0
+    assert rate_limiter.stats()["allowed"] == 1
+
+
+def test_grl_metered_storage():
+    metrics = Metrics()
+    storage = MeteredStorage(STORAGE, metrics)
+    storage.set("key", {"start_time": 0.0, "num_requests": 1})
+    assert storage.get("key") == STORAGE.get("key")
+    assert storage.get_many(["key", "missing"]) == [STORAGE.get("key"), None]
+    assert storage.keys() == ["key"]
+    storage.drop("key")
+    assert STORAGE.keys() == []
+    assert {operation: calls for operation, (calls, _) in metrics.storage.items()} == {
+        "set": 1, "get": 1, "get_many": 1, "keys": 1, "drop": 1
+    }
+
+
+@pytest.mark.parametrize("duration_ns,bucket", [
+    (0, 0), (1, 0), (1000, 0), (1001, 1), (2000, 1), (2001, 2), (1_000_000, 10), (10 ** 12, len(LATENCY_BUCKETS_NS))
+])
+def test_grl_metrics_histogram_bucket(duration_ns: int, bucket: int):
+    metrics = Metrics()
+    metrics.observe("get", duration_ns)
+    counts = metrics.histograms["get"]
+    assert counts[bucket] == 1 and sum(counts) == 1
+    if bucket < len(LATENCY_BUCKETS_NS):
+        assert duration_ns <= LATENCY_BUCKETS_NS[bucket]
+    if 0 < bucket:
+        assert duration_ns > LATENCY_BUCKETS_NS[bucket - 1]
+
+
+def test_grl_metrics_render():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, metrics=True, clock=ManualClock())
+    assert rate_limiter.check_limit("key")
+    assert not rate_limiter.check_limit("key")
+    text = render({"api": rate_limiter, 'with "quotes"\n': Metrics(), "disabled": grl(STORAGE, max_requests=1)})
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert "# TYPE pygrl_checks_total counter" in lines
+    assert 'pygrl_checks_total{limiter="api",decision="allowed"} 1' in lines
+    assert 'pygrl_checks_total{limiter="api",decision="denied"} 1' in lines
+    assert 'pygrl_checks_total{limiter="with \\"quotes\\"\\n",decision="denied"} 0' in lines
+    assert not any('limiter="disabled"' in line for line in lines)
+    assert "# TYPE pygrl_storage_call_duration_seconds histogram" in lines
+    prefix = 'pygrl_storage_call_duration_seconds_bucket{limiter="api",operation="check_and_increment",'
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith(prefix)]
+    assert len(buckets) == len(LATENCY_BUCKETS_NS) + 1
+    assert buckets == sorted(buckets) and buckets[-1] == 2
+    assert f'{prefix}le="+Inf"}} 2' in lines
+    assert 'pygrl_storage_call_duration_seconds_count{limiter="api",operation="check_and_increment"} 2' in lines
+    assert rate_limiter.metrics is not None
+
+
+def test_grl_metrics_http_server():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, metrics=True)
+    sources = {"api": rate_limiter}
+    server = start_http_server(sources, port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        rate_limiter.check_limit("key")
+        with urllib.request.urlopen(url + "/metrics") as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert 'pygrl_checks_total{limiter="api",decision="allowed"} 1' in response.read().decode("utf-8")
+        # Read again on every scrape
+        sources["login"] = MeteredStorage(STORAGE)
+        with urllib.request.urlopen(url + "/metrics") as response:
+            assert 'limiter="login"' in response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(url + "/other")
+    finally:
+        server.shutdown()
+        server.server_close()
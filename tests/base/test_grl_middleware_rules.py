@@ -0,0 +1,84 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ManualClock
+from pygrl.middleware import Rule, RouteTable
+from pygrl.middleware.rules import parse_key
+
+
+def test_grl_rule():
+    rule = Rule("/login", 5, 60, methods=["post"])
+    assert rule.methods == frozenset({"POST"})
+    assert rule.name == "POST /login"
+    assert Rule("/api/*", 100).name == "/api/*"
+    assert Rule("/api/*", 100, name="api").name == "api"
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"path": "login", "max_requests": 1},
+    {"path": "/login", "max_requests": -1},
+    {"path": "/login", "max_requests": 1, "key": "cookie"},
+    {"path": "/login", "max_requests": 1, "key": "header:"},
+    {"path": "/login", "max_requests": 1, "key": "ip:x"},
+])
+def test_grl_rule_invalid(kwargs):
+    with pytest.raises(ValueError):
+        Rule(**kwargs)
+
+
+@pytest.mark.parametrize("spec,parsed", [
+    ("ip", ("ip", None)), ("forwarded", ("forwarded", None)), ("header:X-API-Key", ("header", "x-api-key")),
+])
+def test_grl_parse_key(spec, parsed):
+    assert parse_key(spec) == parsed
+
+
+@pytest.mark.parametrize("method,path,expected", [
+    ("POST", "/login", "login-post"),
+    ("GET", "/login", "login"),
+    ("GET", "/api/users/1", "users"),
+    ("GET", "/api/orders", "api"),
+    ("DELETE", "/api/users/1", "api"),
+    ("GET", "/static/logo.png", "default"),
+    ("GET", "/", "default"),
+])
+def test_grl_route_table(method, path, expected):
+    table = RouteTable([
+        (Rule("*", 1000), "default"),
+        (Rule("/api/*", 100), "api"),
+        (Rule("/api/users/*", 10, methods=["GET"]), "users"),
+        (Rule("/login", 5, methods=["POST"]), "login-post"),
+        (Rule("/login", 50), "login"),
+    ])
+    # Twice, the second from the cache
+    assert table.match(method, path) == expected
+    assert table.match(method, path) == expected
+
+
+def test_grl_route_table_no_match():
+    table = RouteTable([(Rule("/api/*", 100, methods=["POST"]), "api")], cache_size=2)
+    assert table.match("GET", "/api/users") is None
+    assert table.match("GET", "/other") is None
+    for index in range(10):
+        assert table.match("POST", f"/api/{index}") == "api"
+
+
+def test_grl_check_limit_state():
+    clock = ManualClock(100.0)
+    rate_limiter = grl(BasicStorage(), max_requests=2, time_window=10, clock=clock)
+    assert rate_limiter.check_limit_state("key") == (True, 1, 10.0)
+    clock.advance(4)
+    assert rate_limiter.check_limit_state("key") == (True, 0, 6.0)
+    assert rate_limiter.check_limit_state("key") == (False, 0, 6.0)
+    clock.advance(6.5)
+    assert rate_limiter.check_limit_state("key") == (True, 1, 10.0)
+
+
+@pytest.mark.parametrize("options", [{"negative_cache": 8}, {"metrics": True}, {"negative_cache": 8, "metrics": True}])
+def test_grl_check_limit_state_options(options):
+    clock = ManualClock(100.0)
+    rate_limiter = grl(BasicStorage(), max_requests=1, time_window=10, clock=clock, **options)
+    assert rate_limiter.check_limit_state("key")[0]
+    clock.advance(3)
+    assert rate_limiter.check_limit_state("key") == (False, 0, 7.0)
+    assert rate_limiter.check_limit_state("key") == (False, 0, 7.0)
+    if "metrics" in options:
+        assert (rate_limiter.stats()["allowed"], rate_limiter.stats()["denied"]) == (1, 2)
@@ -0,0 +1,67 @@
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ManualClock
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+def test_grl_negative_cache_disabled_by_default():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1)
+    assert rate_limiter.check_limit.__func__ is grl.check_limit
+
+
+@pytest.mark.parametrize("max_requests,number_of_request", [(1, 10), (5, 100), (10, 10)])
+def test_grl_negative_cache_skips_storage(counting_storage, max_requests: int, number_of_request: int):
+    storage = counting_storage()
+    clock = ManualClock()
+    rate_limiter = grl(storage, max_requests=max_requests, time_window=10, negative_cache=16, clock=clock)
+    decisions = [rate_limiter.check_limit("key") for _ in range(number_of_request)]
+    assert decisions == [i < max_requests for i in range(number_of_request)]
+    # Only the first denial reaches the storage
+    assert storage.calls == min(number_of_request, max_requests + 1)
+    # Still denied at the end of the window, allowed after it
+    clock.advance(10)
+    assert not rate_limiter.check_limit("key")
+    clock.advance(0.5)
+    assert rate_limiter.check_limit("key")
+
+
+def test_grl_negative_cache_same_decisions():
+    clock = ManualClock()
+    cached = grl(BasicStorage(), max_requests=3, time_window=2, negative_cache=4, clock=clock)
+    plain = grl(BasicStorage(), max_requests=3, time_window=2, clock=clock)
+    for step in range(400):
+        key = f"key-{(step * 7) % 9}"
+        assert cached.check_limit(key) == plain.check_limit(key)
+        clock.advance(0.05)
+
+
+def test_grl_negative_cache_capacity_and_reset(counting_storage):
+    storage = counting_storage()
+    rate_limiter = grl(storage, max_requests=1, time_window=60, negative_cache=2, clock=ManualClock())
+    for key in ["a", "b", "c"]:
+        rate_limiter.check_limit(key)
+        assert not rate_limiter.check_limit(key)
+    # "a" was evicted from the cache, its check goes to the storage and is still denied
+    before = storage.calls
+    assert not rate_limiter.check_limit("a")
+    assert not rate_limiter.check_limit("c")
+    assert storage.calls == before + 1
+    rate_limiter.reset()
+    assert rate_limiter.check_limit("c")
+
+
+def test_grl_negative_cache_with_metrics():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, negative_cache=8, metrics=True, clock=ManualClock())
+    for _ in range(5):
+        rate_limiter.check_limit("key")
+    stats = rate_limiter.stats()
+    assert (stats["allowed"], stats["denied"]) == (1, 4)
+    assert stats["storage"]["check_and_increment"]["calls"] == 2
@@ -0,0 +1,49 @@
+import pickle
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ExceededRateLimitError, ManualClock, rate_limit
+
+
+def test_grl_exceeded_error_lazy_message():
+    error = ExceededRateLimitError(None, "key", 10, 1)
+    assert error.args == ()
+    assert (error.key, error.max_requests, error.time_window) == ("key", 10, 1)
+    assert str(error) == "Rate limit exceeded. `key` was/had called more than 10 requests per 1 seconds."
+    # An explicit message is kept as is
+    assert str(ExceededRateLimitError("Too many requests")) == "Too many requests"
+
+
+@pytest.mark.parametrize("message", [None, "Too many requests"])
+def test_grl_exceeded_error_pickle(message):
+    error = pickle.loads(pickle.dumps(ExceededRateLimitError(message, "key", 10, 1)))
+    assert type(error) is ExceededRateLimitError
+    assert (error.key, error.max_requests, error.time_window) == ("key", 10, 1)
+    assert str(error) == str(ExceededRateLimitError(message, "key", 10, 1))
+    assert repr(error) == "ExceededRateLimitError(key='key', max_requests=10, time_window=1)"
+
+
+def test_grl_decorator_error_fields():
+    @grl.general_rate_limiter(BasicStorage(), max_requests=1, time_window=5, clock=ManualClock())
+    def function(**kwargs):
+        return True
+
+    function(key="alice")
+    with pytest.raises(ExceededRateLimitError) as exc_info:
+        function(key="alice")
+    assert (exc_info.value.key, exc_info.value.max_requests, exc_info.value.time_window) == ("alice", 1, 5)
+    assert "`alice` was/had called more than 1 requests per 5 seconds" in str(exc_info.value)
+
+
+def test_grl_on_limited():
+    calls = []
+
+    def on_limited(key, args, kwargs):
+        calls.append((key, args, kwargs))
+        return "fallback"
+
+    @rate_limit(BasicStorage(), max_requests=2, time_window=60, key_args=["username"], on_limited=on_limited,
+                clock=ManualClock())
+    def login(username: str, key: str = "") -> str:
+        return username
+
+    assert [login("alice", key="k") for _ in range(4)] == ["alice", "alice", "fallback", "fallback"]
+    assert calls == [("alice", ("alice",), {"key": "k"})] * 2
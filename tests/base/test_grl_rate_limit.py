@@ -0,0 +1,50 @@
+import asyncio
+import inspect
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ExceededRateLimitError, ManualClock, rate_limit
+
+
+def test_grl_rate_limit_sync():
+    @rate_limit(BasicStorage(), max_requests=2, time_window=60, key_args=["username"], clock=ManualClock())
+    def login(username: str, password: str = "") -> str:
+        """Logs in."""
+        return username
+
+    assert login("alice") == "alice"
+    assert login(username="alice") == "alice"
+    with pytest.raises(ExceededRateLimitError):
+        login("alice")
+    assert login("bob") == "bob"
+    # The metadata of the original function
+    assert login.__name__ == "login"
+    assert login.__doc__ == "Logs in."
+    assert login.__wrapped__ is not None
+    assert list(inspect.signature(login).parameters) == ["username", "password"]
+    assert not inspect.iscoroutinefunction(login)
+
+
+@pytest.mark.parametrize("decorator", [rate_limit, grl.general_rate_limiter])
+def test_grl_rate_limit_detects_coroutine(decorator):
+    @decorator(BasicStorage(), max_requests=1, time_window=60, clock=ManualClock())
+    async def fetch(url: str) -> str:
+        return url
+
+    assert inspect.iscoroutinefunction(fetch)
+    assert fetch.__name__ == "fetch"
+
+    async def main():
+        assert await fetch("a") == "a"
+        with pytest.raises(ExceededRateLimitError):
+            await fetch("b")
+
+    asyncio.run(main())
+
+
+def test_grl_rate_limit_sync_generator_checked_on_call():
+    @rate_limit(BasicStorage(), max_requests=1, time_window=60, clock=ManualClock())
+    def numbers(n: int):
+        yield from range(n)
+
+    assert list(numbers(3)) == [0, 1, 2]
+    with pytest.raises(ExceededRateLimitError):
+        numbers(3)
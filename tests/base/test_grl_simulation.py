@@ -0,0 +1,109 @@
+import pytest
+from pygrl import (
+    BasicStorage, SQLite3_Storage, LeasedStorage, GeneralRateLimiter, GeneralRateLimiter_with_Lock, Simulation
+)
+from pygrl.simulation import synthetic_trace, read_trace, write_trace
+
+
+def test_grl_simulation_synthetic_trace_is_deterministic():
+    first = list(synthetic_trace(num_keys=100, rate=1000, duration=2, skew=1.1, seed=7))
+    second = list(synthetic_trace(num_keys=100, rate=1000, duration=2, skew=1.1, seed=7))
+    assert first == second
+    assert first != list(synthetic_trace(num_keys=100, rate=1000, duration=2, skew=1.1, seed=8))
+    times = [current_time for current_time, _ in first]
+    assert times == sorted(times) and 0 < times[0] and times[-1] < 2
+    # Roughly `rate * duration` requests
+    assert 1800 < len(first) < 2200
+
+
+def test_grl_simulation_zipf_skew():
+    trace = list(synthetic_trace(num_keys=1000, rate=10000, duration=1, skew=1.2))
+    hottest = sum(key == "key-0" for _, key in trace)
+    coldest = sum(key == "key-999" for _, key in trace)
+    assert hottest > 100 * max(coldest, 1)
+
+
+def test_grl_simulation_trace_round_trip(tmp_path):
+    trace = list(synthetic_trace(num_keys=10, rate=100, duration=1))
+    path = str(tmp_path / "trace.csv")
+    assert write_trace(path, trace) == len(trace)
+    assert list(read_trace(path)) == trace
+
+
+def test_grl_simulation_exact_decisions():
+    simulation = Simulation(BasicStorage(), max_requests=3, time_window=10)
+    trace = [(float(second), "key") for second in range(12)]
+    report = simulation.run(trace)
+    # Window [0, 10] admits 3 of 11, the window starting at 11 admits 1
+    assert (report["requests"], report["admitted"], report["denied"]) == (12, 4, 8)
+    assert report["mismatches"] == 0
+    assert report["storage"]["check_and_increment"] == 12
+
+
+@pytest.mark.parametrize("limiter_class", [GeneralRateLimiter, GeneralRateLimiter_with_Lock])
+def test_grl_simulation_matches_reference(limiter_class):
+    simulation = Simulation(
+        BasicStorage(), max_requests=5, time_window=1, max_capacity=64, cleanup_threshold=2,
+        limiter_class=limiter_class
+    )
+    report = simulation.run(synthetic_trace(num_keys=200, rate=2000, duration=10, skew=1.0))
+    assert report["requests"] == report["admitted"] + report["denied"]
+    assert report["denied"] > 0
+    assert report["mismatches"] == 0
+    assert report["storage"]["drop"] > 0
+
+
+def test_grl_simulation_state_size_and_cleanup():
+    storage = BasicStorage()
+    simulation = Simulation(storage, max_requests=1, time_window=1, max_capacity=100, cleanup_threshold=2)
+    # 1000 keys in the first second, then a single key for 10 seconds
+    trace = [(index / 1000, f"key-{index}") for index in range(1000)]
+    trace += [(1 + second / 10, "key-hot") for second in range(100)]
+    report = simulation.run(trace, sample_interval=1.0)
+    sizes = [sample["keys"] for sample in report["samples"]]
+    assert max(sizes) >= 1000
+    assert sizes[-1] <= 100
+    assert report["storage"]["drop"] >= 900
+    assert report["storage"]["scanned"] > report["storage"]["drop"]
+
+
+def test_grl_simulation_without_cleanup_keeps_every_key():
+    storage = BasicStorage()
+    simulation = Simulation(storage, max_requests=1, time_window=1, max_capacity=10, cleanup_threshold=1)
+    report = simulation.run(synthetic_trace(num_keys=500, rate=500, duration=20), cleanup=False)
+    assert report["storage"]["keys"] == 0
+    assert report["samples"][-1]["keys"] == len(storage.keys()) > 10
+
+
+def test_grl_simulation_sqlite3_storage():
+    storage = SQLite3_Storage("./test_grl_simulation.db", overwrite=True)
+    simulation = Simulation(storage, max_requests=2, time_window=1, max_capacity=1000, start=1e9)
+    report = simulation.run(synthetic_trace(num_keys=20, rate=100, duration=5, start=1e9))
+    assert report["mismatches"] == 0
+    assert report["denied"] > 0
+
+
+def test_grl_simulation_leased_storage_never_over_admits():
+    simulation = Simulation(LeasedStorage(BasicStorage(), lease_size=4), max_requests=10, time_window=1)
+    report = simulation.run(synthetic_trace(num_keys=5, rate=500, duration=5))
+    expected = Simulation(BasicStorage(), max_requests=10, time_window=1).run(
+        synthetic_trace(num_keys=5, rate=500, duration=5)
+    )
+    assert report["admitted"] <= expected["admitted"]
+
+
+def test_grl_simulation_rejects_time_going_backwards():
+    simulation = Simulation(BasicStorage(), max_requests=1)
+    with pytest.raises(ValueError):
+        simulation.run([(2.0, "key"), (1.0, "key")])
+
+
+@pytest.mark.slow
+def test_grl_simulation_million_keys():
+    simulation = Simulation(BasicStorage(), max_requests=1, time_window=60, max_capacity=2_000_000)
+    report = simulation.run(
+        ((index / 1000, f"key-{index}") for index in range(1_000_000)),
+        cleanup=False, sample_interval=100, reference=False
+    )
+    assert report["admitted"] == 1_000_000
+    assert report["samples"][-1]["keys"] == 1_000_000
@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+import pytest
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ManualClock
+from pygrl.tracing import Hooks, TracedStorage
+
+
+STORAGE = BasicStorage()
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    STORAGE.clear()
+    yield
+    STORAGE.clear()
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.events = []
+        self.depth = 0
+
+    @contextmanager
+    def __call__(self, operation, key):
+        self.events.append((self.depth, operation, key))
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+
+
+def test_grl_tracing_disabled_by_default():
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1)
+    assert rate_limiter.check_limit.__func__ is grl.check_limit
+    assert rate_limiter.cleanup.__func__ is grl.cleanup
+
+
+def test_grl_tracing_check_limit():
+    tracer = RecordingTracer()
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, tracer=tracer, clock=ManualClock())
+    assert rate_limiter("key")
+    assert not rate_limiter.check_limit("key")
+    # The storage calls are nested in the limiter spans
+    assert tracer.events == [
+        (0, "check_limit", "key"), (1, "storage.check_and_increment", "key"),
+        (0, "cleanup", None), (1, "storage.keys", None),
+        (0, "check_limit", "key"), (1, "storage.check_and_increment", "key"),
+    ]
+
+
+def test_grl_tracing_cleanup_and_info():
+    tracer = RecordingTracer()
+    clock = ManualClock()
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=1, max_capacity=1, tracer=tracer, clock=clock)
+    rate_limiter.check_limit("a")
+    rate_limiter.check_limit("b")
+    tracer.events.clear()
+    clock.advance(20)
+    rate_limiter.cleanup()
+    assert tracer.events == [
+        (0, "cleanup", None), (1, "storage.keys", None),
+        (1, "storage.get", "a"), (1, "storage.drop", "a"),
+        (1, "storage.get", "b"), (1, "storage.drop", "b"),
+    ]
+    tracer.events.clear()
+    assert rate_limiter.info() == {"keys": [], "values": []}
+    assert list(rate_limiter.iter_info()) == []
+    assert tracer.events == [(0, "storage.keys", None), (0, "storage.scan", None)]
+
+
+def test_grl_tracing_with_metrics():
+    tracer = RecordingTracer()
+    rate_limiter = grl(STORAGE, max_requests=1, time_window=60, metrics=True, tracer=tracer, clock=ManualClock())
+    rate_limiter.check_limit("key")
+    assert rate_limiter.stats()["allowed"] == 1
+    assert rate_limiter.stats()["storage"]["check_and_increment"]["calls"] == 1
+    assert [operation for _, operation, _ in tracer.events] == ["check_limit", "storage.check_and_increment"]
+
+
+def test_grl_tracing_hooks():
+    calls = []
+    hooks = Hooks(
+        before=lambda operation, key: calls.append(("before", operation, key)),
+        after=lambda operation, key, duration_ns, error: calls.append(("after", operation, key, duration_ns >= 0, error)),
+    )
+    storage = TracedStorage(STORAGE, hooks)
+    storage.set("key", {"start_time": 0.0, "num_requests": 1})
+    assert calls == [("before", "storage.set", "key"), ("after", "storage.set", "key", True, None)]
+
+    class FailingStorage(BasicStorage):
+        def get(self, key):
+            raise KeyError(key)
+
+    calls.clear()
+    with pytest.raises(KeyError):
+        TracedStorage(FailingStorage(), Hooks(after=hooks.after)).get("key")
+    assert calls[0][:4] == ("after", "storage.get", "key", True) and isinstance(calls[0][4], KeyError)
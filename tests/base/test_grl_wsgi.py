@@ -0,0 +1,123 @@
+import threading
+import time
+import pytest
+from pygrl import BasicStorage, ManualClock
+from pygrl.middleware import WSGIMiddleware, Rule
+
+calls = []
+
+
+def app(environ, start_response):
+    calls.append(environ["PATH_INFO"])
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [b"ok"]
+
+
+class YieldingStorage(BasicStorage):
+    """
+    Lets the other threads run between the read and the write of a check.
+    """
+    def get(self, key: str):
+        value = super().get(key)
+        time.sleep(0)
+        return value
+
+
+def request(middleware, path="/", method="GET", headers=None, client="10.0.0.1"):
+    responses = []
+
+    def start_response(status, response_headers, exc_info=None):
+        responses.append((int(status.split(" ", 1)[0]), dict(response_headers)))
+
+    environ = {"REQUEST_METHOD": method, "PATH_INFO": path, "REMOTE_ADDR": client, **(headers or {})}
+    body = b"".join(middleware(environ, start_response))
+    return responses[0][0], responses[0][1], body
+
+
+def test_grl_wsgi_limit():
+    clock = ManualClock(100.0)
+    middleware = WSGIMiddleware(app, BasicStorage(), [Rule("/login", 2, 60, methods=["POST"])], clock=clock)
+    status, headers, body = request(middleware, "/login", "POST")
+    assert (status, body) == (200, b"ok")
+    assert headers["Content-Type"] == "text/plain"
+    assert (headers["X-RateLimit-Limit"], headers["X-RateLimit-Remaining"], headers["X-RateLimit-Reset"]) == (
+        "2", "1", "60"
+    )
+    clock.advance(10.5)
+    assert request(middleware, "/login", "POST")[1]["X-RateLimit-Remaining"] == "0"
+    calls.clear()
+    status, headers, body = request(middleware, "/login", "POST")
+    assert (status, body) == (429, b"Rate limit exceeded.")
+    assert headers["Retry-After"] == "50" and headers["X-RateLimit-Reset"] == "50"
+    assert headers["Content-Length"] == str(len(body))
+    # The app is not called
+    assert calls == []
+    # Another client, another method, another path
+    assert request(middleware, "/login", "POST", client="10.0.0.2")[0] == 200
+    assert request(middleware, "/login", "GET")[0] == 200
+    assert "X-RateLimit-Limit" not in request(middleware, "/other")[1]
+    clock.advance(50)
+    assert request(middleware, "/login", "POST")[0] == 200
+
+
+@pytest.mark.parametrize("key,headers,same_client", [
+    ("header:X-API-Key", {"HTTP_X_API_KEY": "token-1"}, {"HTTP_X_API_KEY": "token-1"}),
+    ("header:Content-Type", {"CONTENT_TYPE": "text/csv"}, {"CONTENT_TYPE": "text/csv"}),
+    ("forwarded", {"HTTP_X_FORWARDED_FOR": "1.2.3.4, 10.0.0.9"}, {"HTTP_X_FORWARDED_FOR": "1.2.3.4"}),
+    (lambda environ: "everyone", {}, {}),
+])
+def test_grl_wsgi_keys(key, headers, same_client):
+    middleware = WSGIMiddleware(app, BasicStorage(), [Rule("*", 1, 60, key=key)], clock=ManualClock())
+    assert request(middleware, headers=headers, client="10.0.0.1")[0] == 200
+    # Another address, same key
+    assert request(middleware, headers=same_client, client="10.0.0.2")[0] == 429
+
+
+def test_grl_wsgi_header_fallback_and_passthrough():
+    middleware = WSGIMiddleware(app, BasicStorage(), [Rule("/api/*", 1, 60, key="header:x-api-key")],
+                                headers=False, clock=ManualClock())
+    status, headers, _ = request(middleware, "/api/users")
+    assert status == 200 and "X-RateLimit-Limit" not in headers
+    # Without the header, the key is the client address
+    assert request(middleware, "/api/users", client="10.0.0.2")[0] == 200
+    assert request(middleware, "/api/users")[0] == 429
+    assert request(middleware, "/")[0] == 200
+
+
+def test_grl_wsgi_invalid_stripes():
+    with pytest.raises(ValueError):
+        WSGIMiddleware(app, BasicStorage(), [], stripes=0)
+
+
+def test_grl_wsgi_cleanup_keeps_longer_windows():
+    clock = ManualClock()
+    storage = BasicStorage()
+    middleware = WSGIMiddleware(app, storage, [Rule("/slow", 1, 3600), Rule("*", 100, 1)],
+                                clock=clock, max_capacity=0, cleanup_interval=1)
+    assert request(middleware, "/slow")[0] == 200
+    clock.advance(60)
+    request(middleware, "/fast")
+    assert "/slow:10.0.0.1" in storage.keys()
+    assert request(middleware, "/slow")[0] == 429
+
+
+def test_grl_wsgi_threads():
+    num_threads, num_requests, max_requests = 16, 200, 1000
+    middleware = WSGIMiddleware(app, YieldingStorage(), [Rule("*", max_requests, 60)],
+                                clock=ManualClock(), cleanup_interval=7, max_capacity=0)
+    barrier = threading.Barrier(num_threads)
+    statuses = [[] for _ in range(num_threads)]
+
+    def worker(index: int):
+        barrier.wait()
+        for _ in range(num_requests):
+            statuses[index].append(request(middleware)[0])
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    statuses = [status for thread_statuses in statuses for status in thread_statuses]
+    assert statuses.count(200) == max_requests
+    assert statuses.count(429) == num_threads * num_requests - max_requests
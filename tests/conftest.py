@@ -0,0 +1,54 @@
+from typing import Optional
+import pytest
+from pygrl import BasicStorage, Storage
+
+
+def counting_storage_class(base: type) -> type:
+    """
+    Subclass of `base` counting the calls of `check_and_increment` (`calls`) and the writes (`writes`).
+    """
+    class CountingStorage(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.calls = 0
+            self.writes = 0
+
+        def set(self, key, value):
+            self.writes += 1
+            super().set(key, value)
+
+        def check_and_increment(
+                self, key: str, current_time: float, time_window: float, amount: int = 1, limit: Optional[int] = None
+        ) -> dict:
+            self.calls += 1
+            return super().check_and_increment(key, current_time, time_window, amount, limit)
+
+    return CountingStorage
+
+
+@pytest.fixture
+def counting_storage():
+    """
+    Makes counting storages, a `BasicStorage` by default: counting_storage(SQLite3_Storage, path, table).
+    """
+    def make(base: type = BasicStorage, *args, **kwargs) -> Storage:
+        return counting_storage_class(base)(*args, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def scan_all():
+    """
+    Pages through `storage.scan` until the cursor is None, checking the size of every page: scan_all(storage, count).
+    """
+    def scan(storage: Storage, count: int, prefix: Optional[str] = None) -> list:
+        cursor, items = None, []
+        while True:
+            cursor, page = storage.scan(cursor, count, prefix)
+            assert len(page) <= count
+            items.extend(page)
+            if cursor is None:
+                return items
+
+    return scan
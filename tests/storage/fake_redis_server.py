@@ -0,0 +1,236 @@
+"""
+An in-process server speaking RESP2, enough of Redis for `RedisStorage` to be tested offline.
+
+The scripts known by the server are emulated in Python, by the SHA1 of the script text they emulate: a change
+of the script is refused until the emulation is updated. With `lua=True` (requires `lupa`), the scripts run
+in Lua 5.1 like in Redis, `redis.call` going through the same commands.
+"""
+import hashlib
+import math
+import re
+import socketserver
+import threading
+import time
+
+
+def _check_and_increment(server: "FakeRedisServer", keys: list, args: list):
+    key, (current_time, time_window, amount, limit) = keys[0], args
+    item = server.hash(key)
+    start_time = item.get("start_time")
+    if start_time is None or float(current_time) - float(start_time) > float(time_window):
+        item.clear()
+        item.update({"start_time": current_time, "num_requests": amount})
+        server.expiry[key] = time.monotonic() + math.ceil((float(time_window) + 1) * 1000) / 1000
+        return [current_time, int(amount)]
+    if limit and int(item["num_requests"]) > int(limit):
+        return [start_time, int(item["num_requests"])]
+    item["num_requests"] = str(int(item["num_requests"]) + int(amount))
+    return [start_time, int(item["num_requests"])]
+
+
+# SHA1 of the script text emulated by the function, update both when `RedisStorage` changes the script
+SCRIPTS = {"8369ff3583596ef3dfd74b52b38158d233255853": _check_and_increment}
+
+
+def _lua_argument(value) -> str:
+    # Redis converts the Lua numbers to integers
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _run_lua(server: "FakeRedisServer", script: str, keys: list, args: list):
+    import lupa.lua51 as lupa
+
+    runtime = lupa.LuaRuntime()
+
+    def call(*command):
+        reply = server.run_command([_lua_argument(value) for value in command])
+        if isinstance(reply, list):
+            # A nil bulk string is false in Lua
+            return runtime.table(*[False if value is None else value for value in reply])
+        return reply
+
+    runtime.globals().redis = runtime.table_from({"call": call})
+    runtime.globals().KEYS = runtime.table(*keys)
+    runtime.globals().ARGV = runtime.table(*args)
+    reply = runtime.execute(script)
+    # Lua numbers are returned as integers, tables as arrays
+    values = [reply[index] for index in range(1, len(reply) + 1)]
+    return [int(value) if isinstance(value, (int, float)) else value for value in values]
+
+
+def _glob_to_regex(pattern: str):
+    regex = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\" and index + 1 < len(pattern):
+            index += 1
+            regex.append(re.escape(pattern[index]))
+        elif char == "*":
+            regex.append(".*")
+        elif char == "?":
+            regex.append(".")
+        else:
+            regex.append(re.escape(char))
+        index += 1
+    return re.compile("".join(regex) + r"\Z", re.S)
+
+
+class Error(Exception):
+    pass
+
+
+class FakeRedisServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, lua: bool = False):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lua = lua
+        self.lock = threading.Lock()
+        self.data = {}
+        self.expiry = {}
+        self.scripts = {}
+        self.commands = []  # Names of the commands received, for assertions
+        self.fail_next = None  # Error message replied to the next command
+        self.__thread = None
+
+    @property
+    def address(self):
+        return self.server_address[:2]
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.__thread.join()
+
+    def hash(self, key: str) -> dict:
+        expires = self.expiry.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return self.data.setdefault(key, {})
+
+    def __drop_empty(self):
+        for key in [key for key, item in self.data.items() if not item]:
+            del self.data[key]
+            self.expiry.pop(key, None)
+
+    def execute(self, command: list):
+        name, args = command[0].upper(), command[1:]
+        with self.lock:
+            self.commands.append(name)
+            if self.fail_next is not None:
+                message, self.fail_next = self.fail_next, None
+                raise Error(message)
+            try:
+                return self.__execute(name, args)
+            finally:
+                self.__drop_empty()
+
+    def run_command(self, command: list):
+        """
+        Runs a command from a script, the server lock is already held.
+        """
+        return self.__execute(command[0].upper(), command[1:])
+
+    def __execute(self, name: str, args: list):
+        if name in ("PING",):
+            return "+PONG"
+        if name in ("AUTH", "SELECT"):
+            return "+OK"
+        if name == "HMGET":
+            item = self.hash(args[0])
+            return [item.get(field) for field in args[1:]]
+        if name == "HSET":
+            item = self.hash(args[0])
+            added = sum(field not in item for field in args[1::2])
+            item.update(zip(args[1::2], args[2::2]))
+            return added
+        if name == "HINCRBY":
+            item = self.hash(args[0])
+            item[args[1]] = str(int(item.get(args[1], "0")) + int(args[2]))
+            return int(item[args[1]])
+        if name == "PEXPIRE":
+            self.expiry[args[0]] = time.monotonic() + int(args[1]) / 1000
+            return 1
+        if name in ("DEL", "UNLINK"):
+            removed = 0
+            for key in args:
+                removed += self.data.pop(key, None) is not None
+                self.expiry.pop(key, None)
+            return removed
+        if name == "SCAN":
+            options = dict(zip([arg.upper() for arg in args[1::2]], args[2::2]))
+            regex = _glob_to_regex(options.get("MATCH", "*"))
+            keys = [key for key in list(self.data) if self.hash(key) and regex.match(key)]
+            return ["0", keys]
+        if name == "SCRIPT":
+            if args[0].upper() == "FLUSH":
+                self.scripts.clear()
+                return "+OK"
+            if args[0].upper() == "LOAD":
+                sha = hashlib.sha1(args[1].encode("utf-8")).hexdigest()
+                self.scripts[sha] = args[1]
+                return sha
+        if name == "EVAL":
+            self.scripts[hashlib.sha1(args[0].encode("utf-8")).hexdigest()] = args[0]
+            return self.__run(args[0], args[1:])
+        if name == "EVALSHA":
+            if args[0] not in self.scripts:
+                raise Error("NOSCRIPT No matching script. Please use EVAL.")
+            return self.__run(self.scripts[args[0]], args[1:])
+        if name == "FLUSHALL":
+            self.data.clear()
+            self.expiry.clear()
+            return "+OK"
+        raise Error(f"ERR unknown command '{name}'")
+
+    def __run(self, script: str, args: list):
+        num_keys = int(args[0])
+        keys, argv = args[1:1 + num_keys], args[1 + num_keys:]
+        if self.lua:
+            return _run_lua(self, script, keys, argv)
+        emulation = SCRIPTS.get(hashlib.sha1(script.encode("utf-8")).hexdigest())
+        if emulation is None:
+            raise Error("ERR script not emulated by the fake server")
+        return emulation(self, keys, argv)
+
+
+def _encode(reply) -> bytes:
+    if isinstance(reply, Error):
+        return b"-%s\r\n" % str(reply).encode("utf-8")
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+    if reply.startswith("+"):
+        return reply.encode("utf-8") + b"\r\n"
+    data = reply.encode("utf-8")
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return None
+            command = []
+            for _ in range(int(line[1:-2])):
+                length = int(self.rfile.readline()[1:-2])
+                command.append(self.rfile.read(length + 2)[:-2].decode("utf-8"))
+            try:
+                reply = self.server.execute(command)
+            except Error as e:
+                reply = e
+            self.wfile.write(_encode(reply))
@@ -1,5 +1,5 @@
 import pytest
-from pygrl import BasicStorage
+from pygrl import BasicStorage, GeneralRateLimiter as grl, ManualClock
 from time import time
 
 
@@ -97,3 +97,104 @@ def test_bs_keys(basic_storage, keys: list, values: list, expected: list):
         basic_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
     intersect = set(basic_storage.keys()) & set(expected)
     assert len(intersect) == len(expected)
+
+
+def test_bs_snapshot_restore(basic_storage, tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    values = {"a": (100.5, 1), "b": (201.25, 23), "ключ": (823.0, 12), 1: (123.0, 20)}
+    for k, v in values.items():
+        basic_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    basic_storage.snapshot(path)
+
+    restored = BasicStorage()
+    assert restored.restore(path) == len(values)
+    # Moved to the epoch of the restoring clock, the same one here
+    for k, v in values.items():
+        assert restored.get(k) == {"start_time": pytest.approx(v[0], abs=1e-3), "num_requests": v[1]}
+
+
+def test_bs_restore_skip_expired(basic_storage, tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    basic_storage.set("old", {"start_time": 100, "num_requests": 5})
+    basic_storage.set("new", {"start_time": 195, "num_requests": 2})
+    basic_storage.snapshot(path)
+
+    restored = BasicStorage()
+    assert restored.restore(path, max_age=10, current_time=200) == 1
+    assert restored.get("old") is None
+    assert restored.get("new") == {"start_time": pytest.approx(195, abs=1e-3), "num_requests": 2}
+
+
+def test_bs_restore_invalid_file(basic_storage, tmp_path):
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(b"not a snapshot, definitely")
+    with pytest.raises(ValueError):
+        basic_storage.restore(str(path))
+
+
+def test_bs_periodic_snapshot(basic_storage, tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    basic_storage.start_snapshots(path, interval=0.01)
+    basic_storage.set("key", {"start_time": 100, "num_requests": 1})
+    basic_storage.stop_snapshots()  # Writes a final snapshot
+
+    restored = BasicStorage()
+    restored.restore(path)
+    assert restored.get("key") == {"start_time": pytest.approx(100, abs=1e-3), "num_requests": 1}
+
+
+def test_bs_snapshot_restore_default_clock(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    storage = BasicStorage()
+    rate_limiter = grl(storage, max_requests=3, time_window=10)  # Monotonic clock
+    assert rate_limiter.check_limit("key") and rate_limiter.check_limit("key")
+    storage.snapshot(path)
+
+    restored = BasicStorage()
+    assert restored.restore(path, max_age=10) == 1
+    rate_limiter = grl(restored, max_requests=3, time_window=10)
+    assert rate_limiter.check_limit("key")
+    assert not rate_limiter.check_limit("key")
+
+
+def test_bs_restore_other_clock(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    storage = BasicStorage()
+    storage.set("key", {"start_time": 1000.0, "num_requests": 2})
+    storage.snapshot(path, clock=ManualClock(1005.0))
+    # The clock of another boot: the pair started 5 seconds before the snapshot
+    assert BasicStorage().restore(path, max_age=4, clock=ManualClock(50.0)) == 0
+    restored = BasicStorage()
+    assert restored.restore(path, max_age=10, clock=ManualClock(50.0)) == 1
+    assert restored.get("key")["start_time"] == pytest.approx(45.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("count", [1, 7, 100, 1000])
+def test_bs_scan(basic_storage, scan_all, count):
+    for i in range(100):
+        basic_storage.set(f"user:{i}" if i % 2 else f"ip:{i}", {"start_time": 100, "num_requests": i})
+    items = scan_all(basic_storage, count)
+    assert sorted(items) == sorted((key, basic_storage.get(key)) for key in basic_storage.keys())
+    items = scan_all(basic_storage, count, prefix="user:")
+    assert sorted(key for key, _ in items) == sorted(f"user:{i}" for i in range(1, 100, 2))
+    with pytest.raises(ValueError):
+        basic_storage.scan(None, 0)
+
+
+def test_bs_scan_empty(basic_storage):
+    assert basic_storage.scan() == (None, [])
+
+
+def test_bs_scan_snapshot(basic_storage):
+    for i in range(10):
+        basic_storage.set(f"key:{i}", {"start_time": 100, "num_requests": i})
+    cursor, page = basic_storage.scan(None, 4)
+    assert [key for key, _ in page] == [f"key:{i}" for i in range(4)]
+    # The keys of the snapshot dropped meanwhile are skipped, the keys set meanwhile are not returned
+    basic_storage.drop("key:5")
+    basic_storage.set("late", {"start_time": 100, "num_requests": 1})
+    items = page
+    while cursor is not None:
+        cursor, page = basic_storage.scan(cursor, 4)
+        items.extend(page)
+    assert [key for key, _ in items] == [f"key:{i}" for i in range(10) if i != 5]
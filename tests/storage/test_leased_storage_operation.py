@@ -0,0 +1,50 @@
+import pytest
+from pygrl import LeasedStorage, GeneralRateLimiter as grl
+
+
+@pytest.fixture
+def shared_storage(counting_storage):
+    return counting_storage()
+
+
+@pytest.mark.parametrize("lease_size,checks,expected_calls", [(1, 10, 10), (5, 10, 2), (10, 25, 3)])
+def test_leased_round_trips(shared_storage, lease_size: int, checks: int, expected_calls: int):
+    storage = LeasedStorage(shared_storage, lease_size)
+    values = [storage.check_and_increment("key", 100.0, 5) for _ in range(checks)]
+    assert [value["num_requests"] for value in values] == list(range(1, checks + 1))
+    assert shared_storage.calls == expected_calls
+    # The shared storage counts every reserved request
+    assert shared_storage.get("key")["num_requests"] == expected_calls * lease_size
+
+
+def test_leased_new_window(shared_storage):
+    storage = LeasedStorage(shared_storage, 10)
+    for _ in range(3):
+        storage.check_and_increment("key", 100.0, 5)
+    # The lease expires with the window even though requests are left
+    assert storage.check_and_increment("key", 105.5, 5) == {"start_time": 105.5, "num_requests": 1}
+    assert shared_storage.calls == 2
+
+
+@pytest.mark.parametrize("max_requests,lease_size", [(10, 1), (10, 3), (100, 10), (7, 20)])
+def test_leased_never_over_admits(shared_storage, max_requests: int, lease_size: int):
+    # Several processes sharing one storage, each with its own leases
+    limiters = [grl(LeasedStorage(shared_storage, lease_size), max_requests, time_window=60) for _ in range(4)]
+    admitted = sum(limiters[i % 4].check_limit("key") for i in range(max_requests * 3))
+    assert 0 < admitted <= max_requests
+    # Unused leases make the others hit the limit at most `lease_size - 1` requests earlier each
+    assert admitted >= max_requests - 4 * (lease_size - 1)
+
+
+def test_leased_drop_forgets_lease(shared_storage):
+    storage = LeasedStorage(shared_storage, 10)
+    storage.check_and_increment("key", 100.0, 5)
+    storage.drop("key")
+    assert storage.get("key") is None
+    assert storage.check_and_increment("key", 100.0, 5) == {"start_time": 100.0, "num_requests": 1}
+    assert shared_storage.calls == 2
+
+
+def test_leased_invalid_size(shared_storage):
+    with pytest.raises(ValueError):
+        LeasedStorage(shared_storage, 0)
@@ -0,0 +1,175 @@
+import multiprocessing
+import random
+import pytest
+from pygrl import MmapStorage
+from pygrl.storage.fixed_slot_table import HEADER_SIZE, SLOT, EMPTY
+from time import time
+
+
+@pytest.fixture
+def mmap_storage():
+    storage = MmapStorage("./storage.mmap", capacity=256, stripes=8, overwrite=True)
+    yield storage
+    storage.close()
+
+
+@pytest.mark.parametrize("key", ["key", "client", "temporary", 1, 2, 3])
+def test_mmap_get(mmap_storage, key):
+    assert mmap_storage.get(key) is None
+
+
+@pytest.mark.parametrize("key,num_requests", [
+    ("key", 1),
+    ("client", 10),
+    ("admin", 3)
+])
+def test_mmap_set_single(mmap_storage, key, num_requests):
+    input_value = {"start_time": time(), "num_requests": num_requests}
+    mmap_storage.set(key, input_value)
+    output_value = mmap_storage.get(key)
+    assert input_value == output_value
+
+
+@pytest.mark.parametrize("keys,values,key,value", [
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "a", {"start_time": 100, "num_requests": 1}),
+    (["a", "b", "c", "d", "e"], [(100, 1), (201, 23), (823, 12), (123, 20), (234, 32)], "e", {"start_time": 234, "num_requests": 32}),
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "e", None)
+])
+def test_mmap_get_complex(mmap_storage, keys: list, values: list, key: str, value: dict):
+    for k, v in zip(keys, values):
+        mmap_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+
+    output_value = mmap_storage.get(key)
+    assert output_value == value
+
+
+@pytest.mark.parametrize("keys,values,key", [
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "a"),
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "z")
+])
+def test_mmap_drop(mmap_storage, keys: list, values: list, key: str):
+    for k, v in zip(keys, values):
+        mmap_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    mmap_storage.drop(key)
+    for k in keys:
+        value = mmap_storage.get(k)
+        if k == key:
+            assert value is None
+        else:
+            assert value is not None
+
+
+def test_mmap_clear(mmap_storage):
+    for k in ["a", "b", "c"]:
+        mmap_storage.set(k, {"start_time": 100, "num_requests": 1})
+    mmap_storage.clear()
+    assert mmap_storage.keys() == []
+
+
+@pytest.mark.parametrize("keys,expected", [
+    (["a", "b", "c"], ["a", "b", "c"]),
+    ([10, 5, 8], ["10", "5", "8"])
+])
+def test_mmap_keys(mmap_storage, keys: list, expected: list):
+    for k in keys:
+        mmap_storage.set(k, {"start_time": 100, "num_requests": 1})
+    assert sorted(mmap_storage.keys()) == sorted(expected)
+
+
+def test_mmap_survive_reopen():
+    storage = MmapStorage("./storage-reopen.mmap", capacity=256, stripes=8, overwrite=True)
+    storage.set("persisted", {"start_time": 123.5, "num_requests": 7})
+    storage.close()
+    # The layout of the existing file wins over the arguments
+    reopened = MmapStorage("./storage-reopen.mmap", capacity=16)
+    assert reopened.capacity == 256
+    assert reopened.get("persisted") == {"start_time": 123.5, "num_requests": 7}
+    reopened.close()
+
+
+def test_mmap_torn_record_is_ignored(mmap_storage):
+    mmap_storage.set("torn", {"start_time": 100, "num_requests": 1})
+    mmap_storage.set("intact", {"start_time": 100, "num_requests": 2})
+    mmap_storage.flush()
+    # Corrupt the `num_requests` field of the "torn" record behind the storage's back
+    with open("./storage.mmap", "r+b") as f:
+        data = bytearray(f.read())
+        index = data.index(b"torn")
+        data[index - 8] ^= 0xFF
+        f.seek(0)
+        f.write(data)
+    assert mmap_storage.get("torn") is None
+    assert mmap_storage.get("intact") == {"start_time": 100, "num_requests": 2}
+
+
+def test_mmap_drop_leaves_no_tombstone():
+    # A single stripe, every key probes the same slots
+    storage = MmapStorage("./storage-churn.mmap", capacity=64, stripes=1, max_key_size=16, overwrite=True)
+    try:
+        rng = random.Random(0)
+        live = {}
+        for i in range(20000):
+            if len(live) < 40 and rng.random() < 0.55:
+                live[f"key:{i}"] = i
+                storage.set(f"key:{i}", {"start_time": 0, "num_requests": i})
+            elif live:
+                key = rng.choice(list(live))
+                del live[key]
+                storage.drop(key)
+        assert sorted(storage.keys()) == sorted(live)
+        assert all(storage.get(key) == {"start_time": 0, "num_requests": value} for key, value in live.items())
+        assert storage.get("missing") is None
+        storage.flush()
+        with open("./storage-churn.mmap", "rb") as f:
+            data = f.read()
+        # Only the live keys take a slot, a miss probes no more slots than there are keys
+        states = [data[HEADER_SIZE + slot * (SLOT.size + 16)] for slot in range(64)]
+        assert len(states) - states.count(EMPTY) == len(live)
+    finally:
+        storage.close()
+
+
+def _set(path: str, key: str, num_requests: int):
+    storage = MmapStorage(path)
+    storage.set(key, {"start_time": 0, "num_requests": num_requests})
+    storage.close()
+
+
+def test_mmap_shared_between_processes(mmap_storage):
+    process = multiprocessing.get_context("spawn").Process(target=_set, args=("./storage.mmap", "other", 5))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert mmap_storage.get("other") == {"start_time": 0, "num_requests": 5}
+
+
+def _check(path: str, key: str, times: int, limit: int) -> int:
+    storage = MmapStorage(path)
+    admitted = 0
+    for _ in range(times):
+        if storage.check_and_increment(key, 100.0, 60, limit=limit)["num_requests"] <= limit:
+            admitted += 1
+    storage.close()
+    return admitted
+
+
+def test_mmap_check_and_increment_between_processes(mmap_storage):
+    num_processes, times, limit = 4, 500, 1000
+    with multiprocessing.get_context("spawn").Pool(num_processes) as pool:
+        admitted = pool.starmap(_check, [("./storage.mmap", "hot", times, limit)] * num_processes)
+    # No lost update: exactly `limit` admitted, the count stops at the first denial
+    assert sum(admitted) == limit
+    assert mmap_storage.get("hot") == {"start_time": 100.0, "num_requests": limit + 1}
+
+
+@pytest.mark.parametrize("count", [1, 7, 100, 1000])
+def test_mmap_scan(mmap_storage, scan_all, count):
+    for i in range(100):
+        mmap_storage.set(f"user:{i}" if i % 2 else f"ip:{i}", {"start_time": 100, "num_requests": i})
+    items = scan_all(mmap_storage, count)
+    assert sorted(items) == sorted((key, mmap_storage.get(key)) for key in mmap_storage.keys())
+    items = scan_all(mmap_storage, count, prefix="user:")
+    assert sorted(key for key, _ in items) == sorted(f"user:{i}" for i in range(1, 100, 2))
+    assert scan_all(mmap_storage, count, prefix="none") == []
+    with pytest.raises(ValueError):
+        mmap_storage.scan(None, 0)
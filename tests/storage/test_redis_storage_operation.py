@@ -0,0 +1,200 @@
+import os
+import random
+import socket
+import threading
+import pytest
+from pygrl import RedisStorage, RemoteStorageError, GeneralRateLimiter as grl
+from fake_redis_server import FakeRedisServer, SCRIPTS
+from time import time
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FakeRedisServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def redis_storage(server):
+    storage = RedisStorage(server.address, prefix="test:", pool_size=4)
+    storage.clear()
+    server.commands.clear()
+    yield storage
+    storage.close()
+
+
+@pytest.mark.parametrize("key", ["key", "client", 1, 2])
+def test_redis_get(redis_storage, key):
+    assert redis_storage.get(key) is None
+
+
+@pytest.mark.parametrize("key,num_requests", [
+    ("key", 1),
+    ("client", 10),
+    ("admin", 3)
+])
+def test_redis_set_single(redis_storage, key, num_requests):
+    input_value = {"start_time": time(), "num_requests": num_requests}
+    redis_storage.set(key, input_value)
+    assert redis_storage.get(key) == input_value
+
+
+@pytest.mark.parametrize("keys,values,key", [
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "a"),
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "z")
+])
+def test_redis_drop(redis_storage, keys: list, values: list, key: str):
+    for k, v in zip(keys, values):
+        redis_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    redis_storage.drop(key)
+    for k in keys:
+        value = redis_storage.get(k)
+        if k == key:
+            assert value is None
+        else:
+            assert value is not None
+
+
+@pytest.mark.parametrize("keys,expected", [
+    (["a", "b", "c"], ["a", "b", "c"]),
+    ([10, 5, 8], ["10", "5", "8"]),
+])
+def test_redis_keys_and_clear(server, redis_storage, keys: list, expected: list):
+    other = RedisStorage(server.address, prefix="other*:")
+    other.set("untouched", {"start_time": 1, "num_requests": 1})
+    for k in keys:
+        redis_storage.set(k, {"start_time": 100, "num_requests": 1})
+    assert sorted(redis_storage.keys()) == sorted(expected)
+    redis_storage.clear()
+    assert redis_storage.keys() == []
+    # Keys under another prefix are left alone
+    assert other.keys() == ["untouched"]
+    other.clear()
+    other.close()
+
+
+def test_redis_pipelined_batch(server, redis_storage):
+    items = {f"key:{i}": {"start_time": float(i), "num_requests": i} for i in range(50)}
+    redis_storage.set_many(items)
+    values = redis_storage.get_many(list(items.keys()) + ["missing"])
+    assert values[:-1] == list(items.values())
+    assert values[-1] is None
+
+
+def test_redis_check_and_increment(server, redis_storage):
+    server.execute(["SCRIPT", "FLUSH"])
+    server.commands.clear()
+    # NOSCRIPT on first use, falls back to EVAL
+    assert redis_storage.check_and_increment("key", 100.0, 5) == {"start_time": 100.0, "num_requests": 1}
+    assert server.commands == ["EVALSHA", "EVAL"]
+    server.commands.clear()
+    assert redis_storage.check_and_increment("key", 102.5, 5) == {"start_time": 100.0, "num_requests": 2}
+    assert server.commands == ["EVALSHA"]
+    # The window has passed
+    assert redis_storage.check_and_increment("key", 105.5, 5) == {"start_time": 105.5, "num_requests": 1}
+
+
+def test_redis_check_and_increment_many(server, redis_storage):
+    keys = ["a", "b", "a", "c", "a"]
+    values = redis_storage.check_and_increment_many(keys, 100.0, 5)
+    assert [value["num_requests"] for value in values] == [1, 1, 2, 1, 3]
+    assert server.commands.count("EVALSHA") == len(keys)
+
+
+def test_redis_check_and_increment_is_atomic(redis_storage):
+    rate_limiter = grl(redis_storage, max_requests=100, time_window=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.extend(rate_limiter.check_limit("shared") for _ in range(25)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 100
+    # The denied checks stop counting at the first one
+    assert redis_storage.get("shared")["num_requests"] == 101
+
+
+def test_redis_error(server):
+    storage = RedisStorage(server.address)
+    server.fail_next = "ERR injected"
+    with pytest.raises(RemoteStorageError, match="injected"):
+        storage.get("key")
+    # The connection stays usable after an error reply
+    assert storage.get("key") is None
+    storage.close()
+
+
+def test_redis_scan(redis_storage):
+    for i in range(20):
+        redis_storage.set(f"user:{i}", {"start_time": 100, "num_requests": i})
+    redis_storage.set("user*", {"start_time": 100, "num_requests": 0})
+    redis_storage.set("ip:1", {"start_time": 100, "num_requests": 1})
+    cursor, page = redis_storage.scan(None, 10, prefix="user:")
+    assert cursor is None
+    assert sorted(page) == sorted((f"user:{i}", {"start_time": 100, "num_requests": i}) for i in range(20))
+    # The prefix is escaped, "user*" is not a pattern
+    assert redis_storage.scan(None, 10, prefix="user*") == (None, [("user*", {"start_time": 100, "num_requests": 0})])
+    assert len(redis_storage.scan()[1]) == 22
+
+
+def test_redis_check_and_increment_limit(redis_storage):
+    counts = [redis_storage.check_and_increment("key", 100.0, 5, limit=2)["num_requests"] for _ in range(5)]
+    assert counts == [1, 2, 3, 3, 3]
+    assert redis_storage.check_and_increment("key", 100.0, 5)["num_requests"] == 4
+    assert redis_storage.check_and_increment("key", 105.5, 5, limit=2) == {"start_time": 105.5, "num_requests": 1}
+
+
+def run_checks(storage: RedisStorage) -> list:
+    # New, counted, saturated and expired windows, with and without a limit
+    rng = random.Random(0)
+    values = []
+    for i in range(300):
+        values.append(storage.check_and_increment(
+            f"key:{rng.randrange(5)}", 100.0 + i * 0.25, rng.choice([1, 2.5, 10]), rng.randint(1, 3),
+            rng.choice([None, 0, 2, 5])
+        ))
+    return values
+
+
+def test_redis_emulation_pinned_to_script():
+    assert RedisStorage.CHECK_AND_INCREMENT_SHA in SCRIPTS, "The script changed, update the emulation of the fake server"
+
+
+def test_redis_script_matches_emulation(server):
+    pytest.importorskip("lupa")
+    lua_server = FakeRedisServer(lua=True).start()
+    emulated = RedisStorage(server.address, prefix="emulated:")
+    scripted = RedisStorage(lua_server.address, prefix="emulated:")
+    try:
+        assert run_checks(scripted) == run_checks(emulated)
+        assert lua_server.data == {key: item for key, item in server.data.items() if key.startswith("emulated:")}
+    finally:
+        emulated.clear()
+        emulated.close()
+        scripted.close()
+        lua_server.stop()
+
+
+@pytest.fixture
+def real_redis_storage():
+    address = (os.environ.get("PYGRL_REDIS_HOST", "127.0.0.1"), int(os.environ.get("PYGRL_REDIS_PORT", "6379")))
+    try:
+        socket.create_connection(address, timeout=0.5).close()
+    except OSError:
+        pytest.skip(f"No Redis server at {address}")
+    storage = RedisStorage(address, prefix="pygrl-test:")
+    storage.clear()
+    yield storage
+    storage.clear()
+    storage.close()
+
+
+def test_redis_script_real_server(server, real_redis_storage):
+    emulated = RedisStorage(server.address, prefix="real:")
+    try:
+        assert run_checks(real_redis_storage) == run_checks(emulated)
+    finally:
+        emulated.clear()
+        emulated.close()
@@ -0,0 +1,183 @@
+import io
+import os
+import socket
+import tempfile
+import threading
+import pytest
+from pygrl import BasicStorage, RemoteStorage, RemoteStorageError, GeneralRateLimiter as grl
+from pygrl.server import StorageServer
+from pygrl.storage.remote_storage import STATUS_VALUE, VALUE, _Connection, encode_frame
+from time import time
+
+
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), "pygrl-test.sock")
+BACKEND = BasicStorage()
+
+
+@pytest.fixture(scope="module")
+def unix_server():
+    server = StorageServer(BACKEND, SOCKET_PATH)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="module")
+def tcp_server():
+    server = StorageServer(BACKEND, ("127.0.0.1", 0))
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def remote_storage(request, unix_server, tcp_server):
+    server = unix_server if request.param == "unix" else tcp_server
+    storage = RemoteStorage(server.address, pool_size=4)
+    storage.clear()
+    yield storage
+    storage.close()
+
+
+@pytest.mark.parametrize("key", ["key", "client", 1, 2])
+def test_remote_get(remote_storage, key):
+    assert remote_storage.get(key) is None
+
+
+@pytest.mark.parametrize("key,num_requests", [
+    ("key", 1),
+    ("client", 10),
+    ("admin", 3)
+])
+def test_remote_set_single(remote_storage, key, num_requests):
+    input_value = {"start_time": time(), "num_requests": num_requests}
+    remote_storage.set(key, input_value)
+    assert remote_storage.get(key) == input_value
+    assert BACKEND.get(key) == input_value
+
+
+@pytest.mark.parametrize("keys,values,key", [
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "a"),
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "z")
+])
+def test_remote_drop(remote_storage, keys: list, values: list, key: str):
+    for k, v in zip(keys, values):
+        remote_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    remote_storage.drop(key)
+    for k in keys:
+        value = remote_storage.get(k)
+        if k == key:
+            assert value is None
+        else:
+            assert value is not None
+
+
+@pytest.mark.parametrize("keys,expected", [
+    (["a", "b", "c"], ["a", "b", "c"]),
+    ([10, 5, 8], ["10", "5", "8"]),
+    (["ключ", "键"], ["ключ", "键"]),
+])
+def test_remote_keys_and_clear(remote_storage, keys: list, expected: list):
+    for k in keys:
+        remote_storage.set(k, {"start_time": 100, "num_requests": 1})
+    assert sorted(remote_storage.keys()) == sorted(expected)
+    remote_storage.clear()
+    assert remote_storage.keys() == []
+
+
+def test_remote_pipelined_batch(remote_storage):
+    items = {f"key:{i}": {"start_time": float(i), "num_requests": i} for i in range(100)}
+    remote_storage.set_many(items)
+    values = remote_storage.get_many(list(items.keys()) + ["missing"])
+    assert values[:-1] == list(items.values())
+    assert values[-1] is None
+
+
+def test_remote_check_and_increment(remote_storage):
+    assert remote_storage.check_and_increment("key", 100.0, 5) == {"start_time": 100.0, "num_requests": 1}
+    assert remote_storage.check_and_increment("key", 102.5, 5) == {"start_time": 100.0, "num_requests": 2}
+    # The window has passed
+    assert remote_storage.check_and_increment("key", 105.5, 5) == {"start_time": 105.5, "num_requests": 1}
+
+
+def test_remote_check_and_increment_limit(remote_storage):
+    counts = [remote_storage.check_and_increment("key", 100.0, 5, limit=2)["num_requests"] for _ in range(5)]
+    assert counts == [1, 2, 3, 3, 3]
+    assert remote_storage.check_and_increment("key", 100.0, 5)["num_requests"] == 4
+
+
+@pytest.mark.parametrize("count", [1, 7, 100])
+def test_remote_scan(remote_storage, scan_all, count):
+    for i in range(50):
+        remote_storage.set(f"user:{i}" if i % 2 else f"ip:{i}", {"start_time": 100, "num_requests": i})
+    for prefix, expected in [(None, 50), ("user:", 25), ("none", 0)]:
+        items = scan_all(remote_storage, count, prefix)
+        assert len(items) == expected
+        assert all(value == remote_storage.get(key) for key, value in items)
+    with pytest.raises(ValueError):
+        remote_storage.scan(None, 0)
+
+
+def test_remote_scan_unknown_cursor(remote_storage):
+    with pytest.raises(RemoteStorageError, match="cursor"):
+        remote_storage.scan(123456789, 10)
+
+
+class ReadOnlyStorage(BasicStorage):
+    def set(self, key, value):
+        raise PermissionError("read-only")
+
+
+def test_remote_error():
+    server = StorageServer(ReadOnlyStorage(), ("127.0.0.1", 0))
+    server.start()
+    storage = RemoteStorage(server.address, pool_size=1)
+    try:
+        with pytest.raises(RemoteStorageError, match="read-only"):
+            storage.set("key", {"start_time": 0, "num_requests": 1})
+        # The connection stays usable after an error response
+        assert storage.get("key") is None
+    finally:
+        storage.close()
+        server.stop()
+
+
+def test_remote_shared_by_threads(remote_storage):
+    rate_limiter = grl(remote_storage, max_requests=1000, time_window=60)
+    threads = [threading.Thread(target=lambda: [rate_limiter.check_limit(f"t:{i}") for i in range(50)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(remote_storage.keys()) == 50
+
+
+class ShortReads:
+    """
+    Returns at most `chunk` bytes per read, as a socket may.
+    """
+    def __init__(self, data: bytes, chunk: int = 3):
+        self.buffer = io.BytesIO(data)
+        self.chunk = chunk
+
+    def read(self, size: int) -> bytes:
+        return self.buffer.read(min(size, self.chunk))
+
+
+def test_remote_read_frame_short_reads():
+    frame = encode_frame(STATUS_VALUE, VALUE.pack(100.0, 7))
+    sock, peer = socket.socketpair()
+    try:
+        connection = _Connection(sock)
+        connection.reader = ShortReads(frame)
+        assert connection.read_frame() == (STATUS_VALUE, VALUE.pack(100.0, 7))
+        # Closed in the middle of the payload
+        connection.reader = ShortReads(frame[:-1])
+        with pytest.raises(ConnectionError):
+            connection.read_frame()
+        connection.reader = ShortReads(frame[:2])
+        with pytest.raises(ConnectionError):
+            connection.read_frame()
+    finally:
+        sock.close()
+        peer.close()
@@ -0,0 +1,120 @@
+import pytest
+from pygrl import BasicStorage, ShardedStorage
+
+
+class BatchCountingStorage(BasicStorage):
+    def __init__(self):
+        super().__init__()
+        self.batches = 0
+
+    def get_many(self, keys: list) -> list:
+        self.batches += 1
+        return super().get_many(keys)
+
+
+@pytest.fixture
+def sharded_storage():
+    return ShardedStorage([BatchCountingStorage() for _ in range(4)])
+
+
+@pytest.mark.parametrize("key", ["key", "client", 1, 2])
+def test_sharded_get(sharded_storage, key):
+    assert sharded_storage.get(key) is None
+
+
+@pytest.mark.parametrize("keys,values,key", [
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "a"),
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "z")
+])
+def test_sharded_set_drop(sharded_storage, keys: list, values: list, key: str):
+    for k, v in zip(keys, values):
+        sharded_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    sharded_storage.drop(key)
+    for k, v in zip(keys, values):
+        value = sharded_storage.get(k)
+        if k == key:
+            assert value is None
+        else:
+            assert value == {"start_time": v[0], "num_requests": v[1]}
+
+
+def test_sharded_spread_keys_clear(sharded_storage):
+    keys = [f"key:{i}" for i in range(1000)]
+    for key in keys:
+        sharded_storage.set(key, {"start_time": 0, "num_requests": 1})
+    sizes = [len(storage.keys()) for storage in sharded_storage.shards.values()]
+    assert sum(sizes) == 1000
+    # Virtual nodes keep the shards roughly balanced
+    assert min(sizes) > 150
+    assert sorted(sharded_storage.keys()) == sorted(keys)
+    sharded_storage.clear()
+    assert sharded_storage.keys() == []
+
+
+def test_sharded_routing_is_stable():
+    names = ["east", "west", "north"]
+    a = ShardedStorage([BasicStorage() for _ in names], names)
+    b = ShardedStorage([BasicStorage() for _ in names], list(reversed(names)))
+    assert all(a.shard_name(f"key:{i}") == b.shard_name(f"key:{i}") for i in range(200))
+
+
+def test_sharded_batch_grouped_per_shard(sharded_storage):
+    items = {f"key:{i}": {"start_time": i, "num_requests": i} for i in range(100)}
+    sharded_storage.set_many(items)
+    assert sharded_storage.get_many(list(items) + ["missing"]) == list(items.values()) + [None]
+    assert all(storage.batches == 1 for storage in sharded_storage.shards.values())
+
+
+def test_sharded_add_shard_moves_few_keys(sharded_storage):
+    keys = [f"key:{i}" for i in range(2000)]
+    for key in keys:
+        sharded_storage.set(key, {"start_time": 0, "num_requests": 1})
+    before = {key: sharded_storage.shard_name(key) for key in keys}
+    sharded_storage.add_shard(BasicStorage(), "shard-new")
+    moved = [key for key in keys if sharded_storage.shard_name(key) != before[key]]
+    # Only keys taken over by the new shard move, about 1/5 of them
+    assert all(sharded_storage.shard_name(key) == "shard-new" for key in moved)
+    assert 200 < len(moved) < 600
+    assert sorted(sharded_storage.shards["shard-new"].keys()) == sorted(moved)
+    assert all(sharded_storage.get(key) is not None for key in keys)
+
+
+def test_sharded_remove_shard(sharded_storage):
+    keys = [f"key:{i}" for i in range(500)]
+    for key in keys:
+        sharded_storage.set(key, {"start_time": 0, "num_requests": 1})
+    removed = sharded_storage.remove_shard("shard-1")
+    assert removed.keys() == []
+    assert "shard-1" not in sharded_storage.shards
+    assert all(sharded_storage.get(key) is not None for key in keys)
+    with pytest.raises(KeyError):
+        sharded_storage.remove_shard("shard-1")
+
+
+def test_sharded_check_and_increment(sharded_storage):
+    assert sharded_storage.check_and_increment("key", 100.0, 5)["num_requests"] == 1
+    assert sharded_storage.check_and_increment("key", 101.0, 5)["num_requests"] == 2
+    assert sharded_storage.shard("key").get("key")["num_requests"] == 2
+
+
+class LegacyStorage(BasicStorage):
+    def check_and_increment(self, key, current_time, time_window, amount=1):
+        return super().check_and_increment(key, current_time, time_window, amount)
+
+
+def test_sharded_check_and_increment_legacy_shard():
+    storage = ShardedStorage([LegacyStorage(), BasicStorage()])
+    keys = [f"key:{i}" for i in range(20)]
+    assert {storage.shard_name(key) for key in keys} == {"shard-0", "shard-1"}
+    for key in keys:
+        counts = [storage.check_and_increment(key, 100.0, 5, limit=1)["num_requests"] for _ in range(4)]
+        # The legacy shard counts every request, the other one saturates
+        assert counts == ([1, 2, 3, 4] if storage.shard_name(key) == "shard-0" else [1, 2, 2, 2])
+
+
+def test_sharded_scan(sharded_storage, scan_all):
+    for i in range(50):
+        sharded_storage.set(f"key:{i}", {"start_time": 100, "num_requests": i})
+    sharded_storage.set("other", {"start_time": 100, "num_requests": 0})
+    items = scan_all(sharded_storage, 8, "key:")
+    assert sorted(items) == sorted((f"key:{i}", {"start_time": 100, "num_requests": i}) for i in range(50))
@@ -0,0 +1,147 @@
+import multiprocessing
+import pytest
+from pygrl import SharedMemoryStorage, StorageFullError
+from time import time
+
+
+@pytest.fixture
+def shm_storage():
+    storage = SharedMemoryStorage("pygrl-test", capacity=256, stripes=8, overwrite=True)
+    yield storage
+    storage.close()
+    storage.unlink()
+
+
+@pytest.mark.parametrize("key", ["key", "client", "temporary", 1, 2, 3])
+def test_shm_get(shm_storage, key):
+    assert shm_storage.get(key) is None
+
+
+@pytest.mark.parametrize("key,num_requests", [
+    ("key", 1),
+    ("client", 10),
+    ("admin", 3)
+])
+def test_shm_set_single(shm_storage, key, num_requests):
+    """
+    Test the `get` method.
+
+    Environment:
+    ------------
+    - Pre-load the same item into the storage container.
+    """
+    input_value = {"start_time": time(), "num_requests": num_requests}
+    shm_storage.set(key, input_value)
+    output_value = shm_storage.get(key)
+    assert input_value == output_value
+
+
+@pytest.mark.parametrize("keys,values,key,value", [
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "a", {"start_time": 100, "num_requests": 1}),
+    (["a", "b", "c", "d", "e"], [(100, 1), (201, 23), (823, 12), (123, 20), (234, 32)], "e", {"start_time": 234, "num_requests": 32}),
+    (["a", "b", "c", "d", "e", "f"], [(100, 1), (201, 23), (823, 12), (123, 20), (234, 32), (239, 12)], "c", {"start_time": 823, "num_requests": 12}),
+    (["a", "b", "c", "d", "e", "f"], [(100, 1), (201, 23), (823, 12), (123, 20), (234, 32), (239, 12)], "g", None),
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "e", None)
+])
+def test_shm_get_complex(shm_storage, keys: list, values: list, key: str, value: dict):
+    for k, v in zip(keys, values):
+        shm_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+
+    output_value = shm_storage.get(key)
+    assert output_value == value
+
+
+@pytest.mark.parametrize("keys,values,key", [
+    (["a", "b", "c", "d"], [(100, 1), (201, 23), (823, 12), (123, 20)], "a"),
+    (["a", "b", "c", "d", "e", "f"], [(100, 1), (201, 23), (823, 12), (123, 20), (234, 32), (239, 12)], "c"),
+    (["a", "b", "c", "d", "e", "f"], [(100, 1), (201, 23), (823, 12), (123, 20), (234, 32), (239, 12)], "z")
+])
+def test_shm_drop(shm_storage, keys: list, values: list, key: str):
+    for k, v in zip(keys, values):
+        shm_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    shm_storage.drop(key)
+    for k in keys:
+        value = shm_storage.get(k)
+        if k == key:
+            assert value is None
+        else:
+            assert value is not None
+
+
+@pytest.mark.parametrize("keys,values", [
+    (["a", "b", "c"], [(100, 1), (201, 23), (823, 12)]),
+    (["a", "b", "c", "d", "e", "f"], [(100, 1), (201, 23), (823, 12), (123, 20), (234, 32), (239, 12)])
+])
+def test_shm_clear(shm_storage, keys: list, values: list):
+    for k, v in zip(keys, values):
+        shm_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    shm_storage.clear()
+    for k in keys:
+        assert shm_storage.get(k) is None
+    assert shm_storage.keys() == []
+
+
+@pytest.mark.parametrize("keys,values,expected", [
+    (["a", "b", "c"], [(100, 1), (201, 23), (823, 12)], ["a", "b", "c"]),
+    ([1, 2, 3], [(100, 1), (201, 23), (823, 12)], ["1", "2", "3"]),
+])
+def test_shm_keys(shm_storage, keys: list, values: list, expected: list):
+    for k, v in zip(keys, values):
+        shm_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
+    assert sorted(shm_storage.keys()) == sorted(expected)
+
+
+def test_shm_reuse_slot_after_drop():
+    # A single stripe, otherwise one stripe may fill up before the others
+    storage = SharedMemoryStorage("pygrl-test-full", capacity=16, stripes=1, overwrite=True)
+    try:
+        for i in range(storage.capacity):
+            storage.set(i, {"start_time": 0, "num_requests": i})
+        with pytest.raises(StorageFullError):
+            storage.set("overflow", {"start_time": 0, "num_requests": 1})
+        storage.drop(7)
+        storage.set("overflow", {"start_time": 0, "num_requests": 1})
+        assert storage.get("overflow") == {"start_time": 0, "num_requests": 1}
+        assert storage.get(8) == {"start_time": 0, "num_requests": 8}
+    finally:
+        storage.close()
+        storage.unlink()
+
+
+def test_shm_key_too_long(shm_storage):
+    with pytest.raises(ValueError):
+        shm_storage.set("k" * (shm_storage.max_key_size + 1), {"start_time": 0, "num_requests": 1})
+
+
+def _check(name: str, key: str, times: int, limit: int) -> int:
+    storage = SharedMemoryStorage(name)
+    admitted = 0
+    for _ in range(times):
+        if storage.check_and_increment(key, 100.0, 60, limit=limit)["num_requests"] <= limit:
+            admitted += 1
+    storage.close()
+    return admitted
+
+
+def test_shm_shared_between_processes(shm_storage):
+    num_processes, times, limit = 4, 500, 1000
+    shm_storage.set("shared", {"start_time": 100, "num_requests": 1})
+    with multiprocessing.get_context("spawn").Pool(num_processes) as pool:
+        admitted = pool.starmap(_check, [("pygrl-test", "hot", times, limit)] * num_processes)
+    # No lost update: exactly `limit` admitted, the count stops at the first denial
+    assert sum(admitted) == limit
+    assert shm_storage.get("hot") == {"start_time": 100.0, "num_requests": limit + 1}
+    assert sorted(shm_storage.keys()) == ["hot", "shared"]
+
+
+@pytest.mark.parametrize("count", [1, 7, 100, 1000])
+def test_shm_scan(shm_storage, scan_all, count):
+    for i in range(100):
+        shm_storage.set(f"user:{i}" if i % 2 else f"ip:{i}", {"start_time": 100, "num_requests": i})
+    items = scan_all(shm_storage, count)
+    assert sorted(items) == sorted((key, shm_storage.get(key)) for key in shm_storage.keys())
+    items = scan_all(shm_storage, count, prefix="user:")
+    assert sorted(key for key, _ in items) == sorted(f"user:{i}" for i in range(1, 100, 2))
+    assert scan_all(shm_storage, count, prefix="none") == []
+    with pytest.raises(ValueError):
+        shm_storage.scan(None, 0)
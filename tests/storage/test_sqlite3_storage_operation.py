@@ -1,3 +1,5 @@
+import multiprocessing
+import sqlite3
 import pytest
 from pygrl import SQLite3_Storage
 from time import time
@@ -97,3 +99,117 @@ def test_sqlite3_keys(sqlite3_storage, keys: list, values: list, expected: list)
         sqlite3_storage.set(k, {"start_time": v[0], "num_requests": v[1]})
     intersect = set(sqlite3_storage.keys()) & set(expected)
     assert len(intersect) == len(expected)
+
+
+@pytest.fixture
+def sharded_sqlite3_storage():
+    return SQLite3_Storage("./storage-sharded.db", "storage", overwrite=True, shards=4)
+
+
+def test_sqlite3_sharded_paths(sharded_sqlite3_storage):
+    assert sharded_sqlite3_storage.db_paths == [f"./storage-sharded-{i}.db" for i in range(4)]
+    assert SQLite3_Storage.shard_paths("./storage.db", 1) == ["./storage.db"]
+    with pytest.raises(ValueError):
+        SQLite3_Storage.shard_paths("./storage.db", 0)
+
+
+def test_sqlite3_sharded_operations(sharded_sqlite3_storage):
+    keys = [f"key:{i}" for i in range(40)] + [1, 2, 3]
+    for i, k in enumerate(keys):
+        sharded_sqlite3_storage.set(k, {"start_time": 100, "num_requests": i})
+    for i, k in enumerate(keys):
+        assert sharded_sqlite3_storage.get(k) == {"start_time": 100, "num_requests": i}
+    assert sorted(sharded_sqlite3_storage.keys()) == sorted(map(str, keys))
+    sharded_sqlite3_storage.drop("key:0")
+    assert sharded_sqlite3_storage.get("key:0") is None
+    sharded_sqlite3_storage.clear()
+    assert sharded_sqlite3_storage.keys() == []
+
+
+def test_sqlite3_sharded_spread(sharded_sqlite3_storage):
+    for i in range(100):
+        sharded_sqlite3_storage.set(f"key:{i}", {"start_time": 100, "num_requests": 1})
+    for path in sharded_sqlite3_storage.db_paths:
+        assert len(SQLite3_Storage(path).keys()) > 0
+
+
+@pytest.mark.parametrize("count", [1, 7, 100])
+def test_sqlite3_scan(sqlite3_storage, sharded_sqlite3_storage, scan_all, count):
+    for storage in [sqlite3_storage, sharded_sqlite3_storage]:
+        keys = [f"user:{i}" for i in range(30)] + [f"ip:{i}" for i in range(20)] + ["user%", "user_"]
+        for i, k in enumerate(keys):
+            storage.set(k, {"start_time": 100, "num_requests": i})
+        items = scan_all(storage, count)
+        assert sorted(items) == sorted((k, {"start_time": 100, "num_requests": i}) for i, k in enumerate(keys))
+        # The prefix is matched literally, not as a LIKE pattern
+        items = scan_all(storage, count, prefix="user:")
+        assert sorted(k for k, _ in items) == sorted(f"user:{i}" for i in range(30))
+        assert scan_all(storage, count, prefix="user%") == [("user%", {"start_time": 100, "num_requests": 50})]
+        assert scan_all(storage, count, prefix="none") == []
+
+
+def test_sqlite3_check_and_increment_limit(sqlite3_storage):
+    # Counts the rows written to the table
+    conn = sqlite3.connect("./storage.db")
+    conn.executescript(
+        "CREATE TABLE writes (n INTEGER); INSERT INTO writes VALUES (0);"
+        "CREATE TRIGGER count_writes AFTER INSERT ON storage BEGIN UPDATE writes SET n = n + 1; END;"
+    )
+
+    def writes():
+        return conn.execute("SELECT n FROM writes").fetchone()[0]
+
+    counts = [sqlite3_storage.check_and_increment("key", 100.0, 5, limit=2)["num_requests"] for _ in range(5)]
+    assert counts == [1, 2, 3, 3, 3]
+    # The saturated count is written once, the next denials only read
+    assert writes() == 3
+    assert sqlite3_storage.get("key") == {"start_time": 100.0, "num_requests": 3}
+    assert sqlite3_storage.check_and_increment("key", 105.5, 5, limit=2) == {"start_time": 105.5, "num_requests": 1}
+    assert writes() == 4
+    conn.close()
+
+
+def test_sqlite3_file_replaced():
+    storage = SQLite3_Storage("./storage.db", "storage", overwrite=True)
+    storage.set("a", {"start_time": 100.0, "num_requests": 1})
+    # Another storage recreates the file under the open connection
+    other = SQLite3_Storage("./storage.db", "storage", overwrite=True)
+    assert storage.check_and_increment("b", 100.0, 5) == {"start_time": 100.0, "num_requests": 1}
+    assert other.get("b") == {"start_time": 100.0, "num_requests": 1}
+    assert other.get("a") is None
+    storage.close()
+    other.close()
+
+
+def _check(storage, key: str, times: int, limit: int, admitted):
+    if isinstance(storage, str):
+        storage = SQLite3_Storage(storage, shards=2)
+    count = 0
+    for _ in range(times):
+        if storage.check_and_increment(key, 100.0, 60, limit=limit)["num_requests"] <= limit:
+            count += 1
+    admitted.put(count)
+
+
+@pytest.mark.parametrize("method", ["spawn", "fork"])
+def test_sqlite3_check_and_increment_between_processes(method: str):
+    num_processes, times, limit = 4, 100, 200
+    storage = SQLite3_Storage("./storage-check.db", shards=2, overwrite=True)
+    # The connections are already open when the processes are forked
+    assert storage.get("hot") is None
+    context = multiprocessing.get_context(method)
+    admitted = context.Queue()
+    target = "./storage-check.db" if method == "spawn" else storage
+    processes = [
+        context.Process(target=_check, args=(target, "hot", times, limit, admitted)) for _ in range(num_processes)
+    ]
+    for process in processes:
+        process.start()
+    counts = [admitted.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    # No lost update: exactly `limit` admitted, the count stops at the first denial
+    assert sum(counts) == limit
+    assert storage.get("hot") == {"start_time": 100.0, "num_requests": limit + 1}
+    storage.close()
@@ -0,0 +1,34 @@
+import pytest
+from pygrl import BasicStorage, SQLite3_Storage, StorageWrapper
+
+
+class Recording(StorageWrapper):
+    def __init__(self, storage):
+        super().__init__(storage)
+        self.calls = []
+
+    def check_and_increment(self, key, current_time, time_window, amount=1, limit=None):
+        self.calls.append(key)
+        return super().check_and_increment(key, current_time, time_window, amount, limit)
+
+
+@pytest.mark.parametrize("make_storage,persistent", [
+    (BasicStorage, False), (lambda: SQLite3_Storage("./test_storage_wrapper.db", overwrite=True), True),
+])
+def test_wrapper_forwards(make_storage, persistent):
+    storage = make_storage()
+    wrapper = Recording(storage)
+    assert wrapper.persistent is persistent
+    wrapper.set("a", {"start_time": 100.0, "num_requests": 1})
+    wrapper.set_many({"b": {"start_time": 100.0, "num_requests": 2}})
+    assert wrapper.get("a") == storage.get("a") == {"start_time": 100.0, "num_requests": 1}
+    assert wrapper.get_many(["a", "b", "c"]) == storage.get_many(["a", "b", "c"])
+    assert sorted(wrapper.keys()) == ["a", "b"]
+    assert wrapper.scan(None, 10) == storage.scan(None, 10)
+    assert wrapper.check_and_increment("b", 101.0, 10, limit=1) == {"start_time": 100.0, "num_requests": 2}
+    assert wrapper.check_and_increment("a", 101.0, 10) == {"start_time": 100.0, "num_requests": 2}
+    assert wrapper.calls == ["b", "a"]
+    wrapper.drop("a")
+    assert storage.get("a") is None
+    wrapper.clear()
+    assert storage.keys() == []